@@ -0,0 +1,186 @@
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from types import MappingProxyType
+
+import numpy as np
+import pandas as pd
+
+from task_schema import FLAG_COLUMNS, is_false, normalize_tasks
+
+logger = logging.getLogger(__name__)
+
+# Per-group measures reported in the executor/company breakdowns
+_BREAKDOWN_FLAGS = {
+    'completed': 'is_completed',
+    'in_progress': 'is_in_progress',
+    'high_priority': 'is_high_priority',
+    'reminders_sent': 'reminder_sent',
+    'reminders_read': 'reminder_read',
+    'unread': 'is_unread',
+}
+
+
+@dataclass(frozen=True)
+class TaskAnalytics:
+    """Every dashboard aggregate for one (data version, filter set), computed in a single pass
+
+    Instances are immutable: scalar counts are ints/floats and every mapping is
+    a read-only view, so one object can be shared safely by all tabs and sessions.
+    """
+    total_tasks: int
+    completed_tasks: int
+    in_progress_tasks: int
+    high_priority_tasks: int
+    reminders_sent: int
+    reminders_read: int
+    unread_reminders: int
+    pending_reminders: int
+    pending_actions: int
+    avg_reminder_count: float
+    unique_executors: int
+    unique_companies: int
+    status_distribution: MappingProxyType
+    priority_distribution: MappingProxyType
+    executor_task_count: MappingProxyType
+    company_task_count: MappingProxyType
+    executor_breakdown: MappingProxyType
+    company_breakdown: MappingProxyType
+
+    def task_analytics(self):
+        """Plain dict in the shape returned by EnhancedDataManager.get_task_analytics"""
+        return {
+            'total_tasks': self.total_tasks,
+            'unique_executors': self.unique_executors,
+            'unique_companies': self.unique_companies,
+            'status_distribution': dict(self.status_distribution),
+            'priority_distribution': dict(self.priority_distribution),
+            'executor_task_count': dict(self.executor_task_count),
+            'company_task_count': dict(self.company_task_count),
+            'reminders_sent': self.reminders_sent,
+            'reminders_read': self.reminders_read,
+            'high_priority_tasks': self.high_priority_tasks,
+            'completed_tasks': self.completed_tasks
+        }
+
+    def reminder_insights(self):
+        """Plain dict in the shape returned by EnhancedDataManager.get_reminder_insights"""
+        return {
+            'total_reminders_sent': self.reminders_sent,
+            'total_reminders_read': self.reminders_read,
+            'unread_reminders': self.unread_reminders,
+            'pending_reminders': self.pending_reminders,
+            'avg_reminder_count': self.avg_reminder_count
+        }
+
+
+def compute_analytics(df):
+    """Compute a TaskAnalytics for a task frame
+
+    The frame is normalized first if it does not carry the flag columns yet.
+    Totals are mask sums and every per-column distribution or breakdown is a
+    bincount over category codes, so each column is visited once.
+    """
+    if not all(col in df.columns for col in FLAG_COLUMNS):
+        df = normalize_tasks(df)
+
+    masks = {col: df[col].to_numpy(dtype=bool) for col in FLAG_COLUMNS}
+    not_sent = is_false(df['Reminder Sent']) if 'Reminder Sent' in df.columns else np.zeros(len(df), dtype=bool)
+    not_read = is_false(df['Reminder Read']) if 'Reminder Read' in df.columns else np.zeros(len(df), dtype=bool)
+
+    avg_reminder_count = df['Reminder Count'].mean() if 'Reminder Count' in df.columns else 0
+    executor_counts, executor_breakdown = _group_counts(df, 'Executor', masks)
+    company_counts, company_breakdown = _group_counts(df, 'Company', masks)
+    status_counts, _ = _group_counts(df, 'Status', masks, breakdown=False)
+    priority_counts, _ = _group_counts(df, 'Priority', masks, breakdown=False)
+
+    return TaskAnalytics(
+        total_tasks=len(df),
+        completed_tasks=int(masks['is_completed'].sum()),
+        in_progress_tasks=int(masks['is_in_progress'].sum()),
+        high_priority_tasks=int(masks['is_high_priority'].sum()),
+        reminders_sent=int(masks['reminder_sent'].sum()),
+        reminders_read=int(masks['reminder_read'].sum()),
+        unread_reminders=int(masks['is_unread'].sum()),
+        pending_reminders=int(not_sent.sum()),
+        pending_actions=int((not_sent | not_read).sum()),
+        avg_reminder_count=0.0 if pd.isna(avg_reminder_count) else float(avg_reminder_count),
+        unique_executors=len(executor_counts),
+        unique_companies=len(company_counts),
+        status_distribution=status_counts,
+        priority_distribution=priority_counts,
+        executor_task_count=executor_counts,
+        company_task_count=company_counts,
+        executor_breakdown=executor_breakdown,
+        company_breakdown=company_breakdown
+    )
+
+
+def _group_counts(df, col, masks, breakdown=True):
+    """Row counts per value of `col` (largest first) and, optionally, flag totals per value"""
+    if col not in df.columns:
+        return MappingProxyType({}), MappingProxyType({})
+    series = df[col]
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        series = series.astype('category')
+    codes = series.cat.codes.to_numpy()
+    valid = codes >= 0
+    codes = codes[valid]
+    size = len(series.cat.categories)
+
+    counts = np.bincount(codes, minlength=size)
+    order = [i for i in np.argsort(-counts, kind='stable') if counts[i] > 0]
+    names = series.cat.categories
+    task_counts = MappingProxyType({names[i]: int(counts[i]) for i in order})
+    if not breakdown:
+        return task_counts, MappingProxyType({})
+
+    sums = {
+        measure: np.bincount(codes, weights=masks[flag][valid], minlength=size)
+        for measure, flag in _BREAKDOWN_FLAGS.items()
+    }
+    groups = {}
+    for i in order:
+        row = {'tasks': int(counts[i])}
+        row.update({measure: int(values[i]) for measure, values in sums.items()})
+        groups[names[i]] = MappingProxyType(row)
+    return task_counts, MappingProxyType(groups)
+
+
+class AnalyticsEngine:
+    """Memoizes TaskAnalytics per (data version, filter set) with a small LRU
+
+    `filters` must be hashable, e.g. a tuple of (column, tuple of values) pairs.
+    Results are immutable, so the same object is handed to every caller.
+    """
+
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, df, data_version, filters=()):
+        """Return the analytics for `df`, computing them only on the first request for this key"""
+        key = (data_version, filters)
+        with self._lock:
+            if key in self._results:
+                self._results.move_to_end(key)
+                self.hits += 1
+                return self._results[key]
+
+        result = compute_analytics(df)
+        with self._lock:
+            self.misses += 1
+            self._results[key] = result
+            self._results.move_to_end(key)
+            while len(self._results) > self.max_entries:
+                self._results.popitem(last=False)
+        return result
+
+    def clear(self):
+        """Forget every memoized result"""
+        with self._lock:
+            self._results.clear()
@@ -7,6 +7,20 @@ import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
+from analytics import AnalyticsEngine
+from csv_exporter import EXPORT_FORMATS, ExportCache
+from data_hub import DataHub
+from data_manager import EnhancedDataManager
+from filter_engine import FILTER_COLUMNS, FilterEngine
+from http_transport import shared_transport
+from incremental_refresh import IncrementalTaskLoader
+from reminder_scheduler import ReminderScheduler
+from search_index import SearchEngine
+from snapshot_cache import SnapshotStore
+from task_cards import CARD_PAGE_SIZES, page_bounds, page_count, render_cards_html
+from task_schema import normalize_tasks, without_flags
+from timeseries_rollups import GRANULARITIES, TimeSeriesRollups
+
 # Page configuration
 st.set_page_config(
     page_title="Enhanced Project Management System",
@@ -138,42 +152,137 @@ st.markdown("""
 SHEET_ID = "1NOOKyz9iUzwcsV0EcNJdVNQgQVL9bu3qsn_9wg7e1lE"
 SHEET_NAME = "Tasks"  # The sheet tab name
 CSV_URL = f"https://docs.google.com/spreadsheets/d/{SHEET_ID}/gsheet?tqx=out:csv&sheet={SHEET_NAME}"
+DATA_POLL_SECONDS = 60  # How often the shared poller checks Google Sheets
+AUTO_REFRESH_CHECK_SECONDS = 15  # How often open pages check for a new data version
+
+@st.cache_resource
+def get_snapshot_store():
+    """Process-wide local snapshot store shared by all sessions"""
+    return SnapshotStore()
 
-@st.cache_data(ttl=60)  # Cache for 1 minute
-def load_live_tasks():
-    """Load tasks from Google Sheets live link"""
+@st.cache_resource
+def get_http_transport():
+    """Process-wide pooled HTTP client (the same one EnhancedDataManager uses by default)"""
+    return shared_transport()
+
+@st.cache_resource
+def get_data_manager():
+    """Process-wide manager used for writes; authenticated when a service account is in the secrets"""
+    manager = EnhancedDataManager(SHEET_ID, snapshot_store=get_snapshot_store(), transport=get_http_transport())
     try:
-        df = pd.read_csv(CSV_URL)
-        # Clean column names
-        df.columns = df.columns.str.strip()
-        return df
-    except Exception as e:
-        st.error(f"Error loading live data: {str(e)}")
-        # Fallback to sample data
-        return pd.DataFrame({
-            'Task ID': ['ID1', 'ID2', 'ID3'],
-            'Executor': ['John Doe', 'Jane Smith', 'Bob Wilson'],
-            'Date': ['2025-08-05', '2025-08-06', '2025-08-07'],
-            'Reminder Time': ['09:00', '14:00', '10:30'],
-            'Task Description': ['Sample Task 1', 'Sample Task 2', 'Sample Task 3'],
-            'Object': ['Object 1', 'Object 2', 'Object 3'],
-            'Section': ['Section A', 'Section B', 'Section C'],
-            'Priority': ['High', 'Medium', 'Low'],
-            'Executor ID': ['1001', '1002', '1003'],
-            'Company': ['Company A', 'Company B', 'Company C'],
-            'Reminder Sent': ['Yes', 'No', 'Yes'],
-            'Reminder Sent Date': ['2025-08-05', '', '2025-08-07'],
-            'Reminder Read': ['Yes', 'No', 'No'],
-            'Read Time': ['09:15', '', ''],
-            'Reminder Count': ['1', '0', '2'],
-            'Reminder Interval if No Report': ['24h', '12h', '6h'],
-            'Status': ['In Progress', 'Pending', 'Completed'],
-            'Comment': ['On track', 'Waiting for approval', 'Done'],
-            'Report Date': ['2025-08-05', '', '2025-08-07']
-        })
+        service_account_info = st.secrets.get("gcp_service_account")
+    except Exception:
+        service_account_info = None  # No secrets file configured
+    if service_account_info:
+        manager.setup_gspread_client(dict(service_account_info))
+    return manager
+
+@st.cache_resource
+def get_task_loader():
+    """Process-wide incremental loader for the Tasks CSV export"""
+    return IncrementalTaskLoader(CSV_URL, transport=get_http_transport())
+
+def fetch_live_tasks():
+    """Pull tasks from the Google Sheets live link; None when the sheet is unchanged"""
+    result = get_task_loader().refresh()
+    if not result.changed and get_snapshot_store().age(SHEET_ID, SHEET_NAME) is not None:
+        return None
+    get_snapshot_store().save(SHEET_ID, SHEET_NAME, result.df)
+    return result.df
+
+def load_task_snapshot():
+    """Last good tasks from local disk, published before the first network fetch"""
+    df, _ = get_snapshot_store().load(SHEET_ID, SHEET_NAME)
+    return df
+
+def sample_tasks():
+    """Sample data shown when neither Google Sheets nor a local snapshot is available"""
+    return pd.DataFrame({
+        'Task ID': ['ID1', 'ID2', 'ID3'],
+        'Executor': ['John Doe', 'Jane Smith', 'Bob Wilson'],
+        'Date': ['2025-08-05', '2025-08-06', '2025-08-07'],
+        'Reminder Time': ['09:00', '14:00', '10:30'],
+        'Task Description': ['Sample Task 1', 'Sample Task 2', 'Sample Task 3'],
+        'Object': ['Object 1', 'Object 2', 'Object 3'],
+        'Section': ['Section A', 'Section B', 'Section C'],
+        'Priority': ['High', 'Medium', 'Low'],
+        'Executor ID': ['1001', '1002', '1003'],
+        'Company': ['Company A', 'Company B', 'Company C'],
+        'Reminder Sent': ['Yes', 'No', 'Yes'],
+        'Reminder Sent Date': ['2025-08-05', '', '2025-08-07'],
+        'Reminder Read': ['Yes', 'No', 'No'],
+        'Read Time': ['09:15', '', ''],
+        'Reminder Count': ['1', '0', '2'],
+        'Reminder Interval if No Report': ['24h', '12h', '6h'],
+        'Status': ['In Progress', 'Pending', 'Completed'],
+        'Comment': ['On track', 'Waiting for approval', 'Done'],
+        'Report Date': ['2025-08-05', '', '2025-08-07']
+    })
+
+@st.cache_resource
+def get_data_hub():
+    """Process-wide data hub: one poller thread publishes task snapshots to every session"""
+    hub = DataHub(poll_interval=DATA_POLL_SECONDS)
+    # Typing and flag columns are computed once per published version, not on every rerun
+    hub.register(
+        SHEET_NAME,
+        fetch=fetch_live_tasks,
+        initial=load_task_snapshot,
+        fallback=sample_tasks,
+        transform=normalize_tasks
+    )
+    return hub.start()
+
+@st.cache_resource
+def get_analytics_engine():
+    """Process-wide analytics memo shared by all sessions"""
+    return AnalyticsEngine()
+
+@st.cache_resource
+def get_filter_engine():
+    """Process-wide sidebar filter indexes, built once per data version"""
+    return FilterEngine()
+
+@st.cache_resource
+def get_search_engine():
+    """Process-wide full-text search indexes, built once per data version"""
+    return SearchEngine()
+
+@st.cache_resource
+def get_timeseries_rollups():
+    """Process-wide time-series rollups, updated incrementally as new data versions arrive"""
+    return TimeSeriesRollups()
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def search_timeline(data_version, filters, granularity, _filtered_df):
+    """Timeline of a search result, rolled up from its matching rows"""
+    rollups = TimeSeriesRollups()
+    rollups.update(_filtered_df)
+    return rollups.timeline(granularity)
+
+@st.cache_resource
+def get_export_cache():
+    """Process-wide export artifacts on local disk"""
+    return ExportCache()
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def render_card_page(data_version, filters, page, page_size, _filtered_df):
+    """HTML for one page of task cards, cached per (data version, filters, page, page size)"""
+    start, stop = page_bounds(len(_filtered_df), page, page_size)
+    return render_cards_html(_filtered_df.iloc[start:stop])
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def reminder_schedule(data_version, filters, _filtered_df):
+    """Overdue count and next due reminders, cached per (data version, filters)"""
+    scheduler = ReminderScheduler(manager=None)
+    scheduler.load(_filtered_df)
+    return scheduler.overdue(), scheduler.upcoming(limit=20)
 
 # Load data
-tasks_df = load_live_tasks()
+tasks_snapshot = get_data_hub().get(SHEET_NAME)
+tasks_df, data_version = tasks_snapshot.df, tasks_snapshot.version
+if tasks_snapshot.error:
+    st.error(f"Error loading live data: {tasks_snapshot.error}")
 
 # Sidebar
 st.sidebar.title("🔧 System Controls")
@@ -188,45 +297,38 @@ else:
 
 # Refresh button
 if st.sidebar.button("🔄 Refresh Now"):
-    st.cache_data.clear()
+    # Only the Tasks snapshot is refreshed; concurrent clicks share one fetch
+    get_data_hub().invalidate(SHEET_NAME)
     st.rerun()
 
-# Filters
+# Search and filters
 st.sidebar.markdown("### 🔍 Filters")
-selected_executor = st.sidebar.multiselect(
-    "Executor",
-    options=tasks_df['Executor'].unique() if 'Executor' in tasks_df.columns else [],
-    default=[]
-)
-
-selected_priority = st.sidebar.multiselect(
-    "Priority",
-    options=tasks_df['Priority'].unique() if 'Priority' in tasks_df.columns else [],
-    default=[]
-)
-
-selected_status = st.sidebar.multiselect(
-    "Status",
-    options=tasks_df['Status'].unique() if 'Status' in tasks_df.columns else [],
-    default=[]
-)
-
-selected_company = st.sidebar.multiselect(
-    "Company",
-    options=tasks_df['Company'].unique() if 'Company' in tasks_df.columns else [],
-    default=[]
-)
+search_query = st.sidebar.text_input(
+    "Search tasks",
+    placeholder="Description, comment, object, section, executor...",
+).strip()
+filter_engine = get_filter_engine()
+selected = {}
+for col in FILTER_COLUMNS:
+    selected[col] = st.sidebar.multiselect(
+        col,
+        options=filter_engine.options(tasks_df, data_version, col),
+        default=[]
+    )
 
-# Apply filters
-filtered_df = tasks_df.copy()
-if selected_executor:
-    filtered_df = filtered_df[filtered_df['Executor'].isin(selected_executor)]
-if selected_priority:
-    filtered_df = filtered_df[filtered_df['Priority'].isin(selected_priority)]
-if selected_status:
-    filtered_df = filtered_df[filtered_df['Status'].isin(selected_status)]
-if selected_company:
-    filtered_df = filtered_df[filtered_df['Company'].isin(selected_company)]
+# Apply filters: bitmap intersection over the snapshot's index, no frame copy.
+# A search ranks its hits within the filtered rows through the inverted index.
+# The same key also memoizes every tab's aggregates per (data version, filters, search)
+selections = tuple((col, tuple(selected[col])) for col in FILTER_COLUMNS)
+filter_key = selections + ((('Search', search_query),) if search_query else ())
+if search_query:
+    filter_positions = filter_engine.index(tasks_df, data_version).select(selections)
+    search_hits = get_search_engine().search(tasks_df, data_version, search_query, filter_positions)
+    filtered_df = tasks_df.iloc[search_hits]
+    st.sidebar.caption(f"{len(filtered_df)} matching tasks")
+else:
+    filtered_df = filter_engine.apply(tasks_df, data_version, selections)
+analytics = get_analytics_engine().get(filtered_df, data_version, filter_key)
 
 # Main title
 st.title("📊 Enhanced Project Management System")
@@ -250,7 +352,7 @@ with tab1:
     col1, col2, col3, col4, col5 = st.columns(5)
     
     with col1:
-        total_tasks = len(filtered_df)
+        total_tasks = analytics.total_tasks
         st.markdown(f"""
         <div class="metric-card">
             <h3 style="color: #1976d2; margin: 0;">📝 Total Tasks</h3>
@@ -259,7 +361,7 @@ with tab1:
         """, unsafe_allow_html=True)
     
     with col2:
-        completed_tasks = len(filtered_df[filtered_df['Status'].str.contains('Completed|Done', case=False, na=False)])
+        completed_tasks = analytics.completed_tasks
         st.markdown(f"""
         <div class="metric-card">
             <h3 style="color: #4caf50; margin: 0;">✅ Completed</h3>
@@ -268,7 +370,7 @@ with tab1:
         """, unsafe_allow_html=True)
     
     with col3:
-        in_progress_tasks = len(filtered_df[filtered_df['Status'].str.contains('Progress|Doing', case=False, na=False)])
+        in_progress_tasks = analytics.in_progress_tasks
         st.markdown(f"""
         <div class="metric-card">
             <h3 style="color: #ff9800; margin: 0;">🔄 In Progress</h3>
@@ -277,7 +379,7 @@ with tab1:
         """, unsafe_allow_html=True)
     
     with col4:
-        high_priority = len(filtered_df[filtered_df['Priority'].str.contains('High', case=False, na=False)])
+        high_priority = analytics.high_priority_tasks
         st.markdown(f"""
         <div class="metric-card">
             <h3 style="color: #f44336; margin: 0;">🔥 High Priority</h3>
@@ -286,7 +388,7 @@ with tab1:
         """, unsafe_allow_html=True)
     
     with col5:
-        unique_executors = filtered_df['Executor'].nunique() if 'Executor' in filtered_df.columns else 0
+        unique_executors = analytics.unique_executors
         st.markdown(f"""
         <div class="metric-card">
             <h3 style="color: #9c27b0; margin: 0;">👥 Executors</h3>
@@ -301,8 +403,8 @@ with tab1:
     
     with col1:
         st.subheader("📊 Status Distribution")
-        if 'Status' in filtered_df.columns:
-            status_counts = filtered_df['Status'].value_counts()
+        if 'Status' in filtered_df.columns and analytics.status_distribution:
+            status_counts = pd.Series(analytics.status_distribution)
             fig_status = px.pie(
                 values=status_counts.values,
                 names=status_counts.index,
@@ -316,8 +418,8 @@ with tab1:
     
     with col2:
         st.subheader("🎯 Priority Distribution")
-        if 'Priority' in filtered_df.columns:
-            priority_counts = filtered_df['Priority'].value_counts()
+        if 'Priority' in filtered_df.columns and analytics.priority_distribution:
+            priority_counts = pd.Series(analytics.priority_distribution)
             fig_priority = px.bar(
                 x=priority_counts.index,
                 y=priority_counts.values,
@@ -367,9 +469,40 @@ with tab2:
             
             submitted = st.form_submit_button("Add Task", use_container_width=True)
             
-            if submitted and new_task_id and new_executor:
-                st.success(f"✅ Task '{new_task_id}' would be added to the system!")
-                st.info("💡 Note: This is a demo. In production, this would update the Google Sheet.")
+            if submitted:
+                new_task = {
+                    'Task ID': new_task_id,
+                    'Executor': new_executor,
+                    'Date': str(new_date),
+                    'Reminder Time': new_reminder_time.strftime('%H:%M'),
+                    'Task Description': new_task_description,
+                    'Object': new_object,
+                    'Section': new_section,
+                    'Priority': new_priority,
+                    'Executor ID': new_executor_id,
+                    'Company': new_company,
+                    'Reminder Sent': new_reminder_sent,
+                    'Reminder Sent Date': str(new_reminder_sent_date),
+                    'Reminder Read': new_reminder_read,
+                    'Read Time': new_read_time.strftime('%H:%M'),
+                    'Reminder Count': str(new_reminder_count),
+                    'Reminder Interval if No Report': new_reminder_interval,
+                    'Status': new_status,
+                    'Comment': new_comment,
+                    'Report Date': str(new_report_date)
+                }
+                # add_tasks validates, and skips IDs already in the sheet or waiting to be written
+                report = get_data_manager().add_tasks([new_task])
+                if report['added']:
+                    st.success(f"✅ Task '{new_task_id}' added")
+                    get_data_hub().invalidate(SHEET_NAME)
+                elif report['skipped']:
+                    st.warning(f"⚠️ Task ID '{new_task_id}' already exists, nothing was added")
+                else:
+                    error = report['failed'][0]['error'] if report['failed'] else "Task was not written"
+                    st.error(f"❌ {error}")
+                    if not get_data_manager().storage.is_ready():
+                        st.info("Writing needs a `gcp_service_account` entry in the Streamlit secrets.")
     
     # Task cards view
     st.subheader("📋 Current Tasks")
@@ -378,44 +511,29 @@ with tab2:
     view_mode = st.radio("View Mode", ["Cards", "Table"], horizontal=True)
     
     if view_mode == "Cards":
-        # Display tasks as cards
-        for idx, task in filtered_df.iterrows():
-            priority_class = f"priority-{task.get('Priority', 'medium').lower()}"
-            status_class = f"status-{task.get('Status', 'todo').lower().replace(' ', '')}"
-            
-            st.markdown(f"""
-            <div class="task-card {priority_class} {status_class}">
-                <div style="display: flex; justify-content: between; align-items: center;">
-                    <h4 style="margin: 0; color: #1976d2;">🆔 {task.get('Task ID', 'N/A')} - {task.get('Task Description', 'No description')}</h4>
-                    <span style="background: #e3f2fd; padding: 5px 10px; border-radius: 15px; font-size: 12px; color: #1976d2;">
-                        {task.get('Priority', 'N/A')}
-                    </span>
-                </div>
-                <p style="margin: 10px 0; color: #666;">
-                    <strong>👤 Executor:</strong> {task.get('Executor', 'N/A')} | 
-                    <strong>🏢 Company:</strong> {task.get('Company', 'N/A')} | 
-                    <strong>📅 Date:</strong> {task.get('Date', 'N/A')}
-                </p>
-                <p style="margin: 10px 0; color: #666;">
-                    <strong>📍 Section:</strong> {task.get('Section', 'N/A')} | 
-                    <strong>🎯 Object:</strong> {task.get('Object', 'N/A')} | 
-                    <strong>📊 Status:</strong> {task.get('Status', 'N/A')}
-                </p>
-                <p style="margin: 10px 0; color: #666;">
-                    <strong>⏰ Reminder:</strong> {task.get('Reminder Time', 'N/A')} | 
-                    <strong>📧 Sent:</strong> {task.get('Reminder Sent', 'N/A')} | 
-                    <strong>👁️ Read:</strong> {task.get('Reminder Read', 'N/A')}
-                </p>
-                <p style="margin: 10px 0; color: #666;">
-                    <strong>💬 Comment:</strong> {task.get('Comment', 'No comment')}
-                </p>
-            </div>
-            """, unsafe_allow_html=True)
+        # Only the current page is rendered, as a single HTML block
+        total_tasks = len(filtered_df)
+        col1, col2 = st.columns(2)
+        with col1:
+            page_size = st.selectbox("Cards per page", CARD_PAGE_SIZES, index=1)
+        pages = page_count(total_tasks, page_size)
+        if st.session_state.get('card_page', 1) > pages:
+            st.session_state['card_page'] = pages
+        with col2:
+            page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, step=1, key='card_page')
+        
+        start, stop = page_bounds(total_tasks, page, page_size)
+        if total_tasks:
+            st.caption(f"Showing tasks {start + 1}–{stop} of {total_tasks}")
+        st.markdown(
+            render_card_page(data_version, filter_key, page, page_size, filtered_df),
+            unsafe_allow_html=True
+        )
     
     else:
         # Display as table
         st.dataframe(
-            filtered_df,
+            without_flags(filtered_df),
             use_container_width=True,
             height=600
         )
@@ -427,8 +545,8 @@ with tab3:
     
     with col1:
         st.subheader("👥 Tasks by Executor")
-        if 'Executor' in filtered_df.columns:
-            executor_counts = filtered_df['Executor'].value_counts()
+        if 'Executor' in filtered_df.columns and analytics.executor_task_count:
+            executor_counts = pd.Series(analytics.executor_task_count)
             fig_executor = px.bar(
                 x=executor_counts.values,
                 y=executor_counts.index,
@@ -446,8 +564,8 @@ with tab3:
     
     with col2:
         st.subheader("🏢 Tasks by Company")
-        if 'Company' in filtered_df.columns:
-            company_counts = filtered_df['Company'].value_counts()
+        if 'Company' in filtered_df.columns and analytics.company_task_count:
+            company_counts = pd.Series(analytics.company_task_count)
             fig_company = px.pie(
                 values=company_counts.values,
                 names=company_counts.index,
@@ -459,30 +577,43 @@ with tab3:
             )
             st.plotly_chart(fig_company, use_container_width=True)
     
-    # Timeline analysis
+    # Timeline analysis from the pre-aggregated rollups
     st.subheader("📅 Task Timeline")
-    if 'Date' in filtered_df.columns:
-        try:
-            filtered_df['Date'] = pd.to_datetime(filtered_df['Date'])
-            daily_tasks = filtered_df.groupby(filtered_df['Date'].dt.date).size().reset_index()
-            daily_tasks.columns = ['Date', 'Task Count']
-            
-            fig_timeline = px.line(
-                daily_tasks,
-                x='Date',
-                y='Task Count',
-                markers=True,
-                color_discrete_sequence=['#2196f3']
-            )
-            fig_timeline.update_layout(
-                plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='rgba(0,0,0,0)',
-                xaxis_title="Date",
-                yaxis_title="Number of Tasks"
-            )
-            st.plotly_chart(fig_timeline, use_container_width=True)
-        except:
-            st.info("📅 Date format not recognized for timeline analysis")
+    col1, col2 = st.columns(2)
+    with col1:
+        granularity = st.radio("Granularity", list(GRANULARITIES), format_func=GRANULARITIES.get, horizontal=True)
+    with col2:
+        timeline_series = st.radio(
+            "Series",
+            ["Tasks", "Completion Rate", "Avg Read Latency (h)"],
+            horizontal=True
+        )
+    if search_query:
+        timeline = search_timeline(data_version, filter_key, granularity, filtered_df)
+    else:
+        rollups = get_timeseries_rollups()
+        rollups.update(tasks_df, data_version)
+        timeline = rollups.timeline(granularity, selections)
+    
+    if timeline[timeline_series].notna().any():
+        fig_timeline = px.line(
+            timeline.reset_index(),
+            x='Period',
+            y=timeline_series,
+            markers=True,
+            color_discrete_sequence=['#2196f3']
+        )
+        fig_timeline.update_layout(
+            plot_bgcolor='rgba(0,0,0,0)',
+            paper_bgcolor='rgba(0,0,0,0)',
+            xaxis_title="Date",
+            yaxis_title=timeline_series if timeline_series != "Tasks" else "Number of Tasks"
+        )
+        if timeline_series == "Completion Rate":
+            fig_timeline.update_yaxes(tickformat='.0%')
+        st.plotly_chart(fig_timeline, use_container_width=True)
+    else:
+        st.info(f"📅 No {timeline_series} values to chart for the selected tasks")
 
 with tab4:
     st.header("⏰ Reminder Management")
@@ -491,24 +622,30 @@ with tab4:
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        reminders_sent = len(filtered_df[filtered_df['Reminder Sent'].str.contains('Yes', case=False, na=False)])
+        reminders_sent = analytics.reminders_sent
         st.metric("📧 Reminders Sent", reminders_sent)
     
     with col2:
-        reminders_read = len(filtered_df[filtered_df['Reminder Read'].str.contains('Yes', case=False, na=False)])
+        reminders_read = analytics.reminders_read
         st.metric("👁️ Reminders Read", reminders_read)
     
     with col3:
-        avg_reminder_count = filtered_df['Reminder Count'].astype(str).str.extract('(\d+)').astype(float).mean().iloc[0] if 'Reminder Count' in filtered_df.columns else 0
+        avg_reminder_count = analytics.avg_reminder_count
         st.metric("📊 Avg Reminder Count", f"{avg_reminder_count:.1f}")
     
     with col4:
-        pending_reminders = len(filtered_df[
-            (filtered_df['Reminder Sent'].str.contains('No', case=False, na=False)) |
-            (filtered_df['Reminder Read'].str.contains('No', case=False, na=False))
-        ])
+        pending_reminders = analytics.pending_actions
         st.metric("⏳ Pending Actions", pending_reminders)
     
+    # Upcoming reminders from the reminder schedule
+    st.subheader("🗓️ Upcoming Reminders")
+    overdue_reminders, upcoming_reminders = reminder_schedule(data_version, filter_key, filtered_df)
+    st.metric("🔔 Reminders Due Now", overdue_reminders)
+    if upcoming_reminders.empty:
+        st.info("No reminders scheduled for open tasks")
+    else:
+        st.dataframe(upcoming_reminders, use_container_width=True, hide_index=True)
+    
     # Reminder details table
     st.subheader("📋 Reminder Details")
     reminder_columns = ['Task ID', 'Executor', 'Task Description', 'Reminder Time', 
@@ -531,20 +668,32 @@ with tab5:
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        if st.button("📊 Export to CSV", use_container_width=True):
-            csv = filtered_df.to_csv(index=False)
+        export_format = st.selectbox("Format", list(EXPORT_FORMATS), label_visibility="collapsed")
+    
+    with col2:
+        extension, mime = EXPORT_FORMATS[export_format]
+        
+        # The file is only built on request, once per (data version, filters, format)
+        export_key = (data_version, filter_key, export_format)
+        if st.session_state.get('export_key') != export_key:
+            st.session_state.pop('export_bytes', None)
+        
+        if 'export_bytes' not in st.session_state:
+            if st.button(f"📦 Prepare {export_format}", use_container_width=True):
+                export_path = get_export_cache().get(filtered_df, data_version, filter_key, export_format)
+                with open(export_path, 'rb') as export_file:
+                    st.session_state.export_bytes = export_file.read()
+                st.session_state.export_key = export_key
+                st.rerun()
+        else:
             st.download_button(
-                label="⬇️ Download CSV",
-                data=csv,
-                file_name=f"tasks_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                mime="text/csv",
+                label=f"⬇️ Download {export_format}",
+                data=st.session_state.export_bytes,
+                file_name=f"tasks_export_{datetime.now().strftime('%Y%m%d')}.{extension}",
+                mime=mime,
                 use_container_width=True
             )
     
-    with col2:
-        if st.button("📋 Export to Excel", use_container_width=True):
-            st.info("📋 Excel export would be available in production version")
-    
     with col3:
         if st.button("📄 Generate Report", use_container_width=True):
             st.info("📄 PDF report generation would be available in production version")
@@ -564,13 +713,13 @@ with tab5:
                 "Reminders Read"
             ],
             "Value": [
-                len(filtered_df),
-                filtered_df['Executor'].nunique() if 'Executor' in filtered_df.columns else 0,
-                filtered_df['Company'].nunique() if 'Company' in filtered_df.columns else 0,
-                len(filtered_df[filtered_df['Priority'].str.contains('High', case=False, na=False)]),
-                len(filtered_df[filtered_df['Status'].str.contains('Completed|Done', case=False, na=False)]),
-                len(filtered_df[filtered_df['Reminder Sent'].str.contains('Yes', case=False, na=False)]),
-                len(filtered_df[filtered_df['Reminder Read'].str.contains('Yes', case=False, na=False)])
+                analytics.total_tasks,
+                analytics.unique_executors,
+                analytics.unique_companies,
+                analytics.high_priority_tasks,
+                analytics.completed_tasks,
+                analytics.reminders_sent,
+                analytics.reminders_read
             ]
         }
         
@@ -586,20 +735,38 @@ with tab6:
     st.info(f"🔗 **CSV URL:** {CSV_URL}")
     
     st.subheader("🔄 Refresh Settings")
-    st.info("⏱️ **Cache TTL:** 60 seconds")
-    st.info("🔄 **Auto-refresh:** Enabled in sidebar")
+    st.info(f"⏱️ **Poll interval:** {DATA_POLL_SECONDS} seconds")
+    snapshot_age = get_snapshot_store().age(SHEET_ID, SHEET_NAME)
+    if snapshot_age is not None:
+        st.info(f"💾 **Local snapshot age:** {snapshot_age:.0f} seconds")
+    st.info(f"🔄 **Auto-refresh:** Enabled in sidebar, checks for new data every {AUTO_REFRESH_CHECK_SECONDS} seconds")
+    
+    st.subheader("🌐 Network")
+    transport_stats = get_http_transport().stats()
+    st.info(
+        f"📡 **Requests:** {transport_stats['requests']} "
+        f"({transport_stats['failures']} failed, {transport_stats['retries']} retries), "
+        f"{transport_stats['bytes'] / 1e6:.2f} MB downloaded"
+    )
+    if transport_stats['p50_seconds'] is not None:
+        st.info(
+            f"⏱️ **Response time:** p50 {transport_stats['p50_seconds'] * 1000:.0f} ms, "
+            f"p95 {transport_stats['p95_seconds'] * 1000:.0f} ms"
+        )
     
     st.subheader("📊 Data Quality")
     if not tasks_df.empty:
         st.success(f"✅ **Data loaded successfully:** {len(tasks_df)} records")
-        st.info(f"📅 **Last updated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        st.info(f"📅 **Last updated:** {datetime.fromtimestamp(tasks_snapshot.loaded_at).strftime('%Y-%m-%d %H:%M:%S')}")
+        st.info(f"🔖 **Data version:** {data_version[:12]}")
         
         # Show column information
         st.subheader("📋 Available Columns")
+        source_df = without_flags(tasks_df)
         cols_info = pd.DataFrame({
-            'Column': tasks_df.columns,
-            'Type': [str(dtype) for dtype in tasks_df.dtypes],
-            'Non-null Count': [tasks_df[col].count() for col in tasks_df.columns]
+            'Column': source_df.columns,
+            'Type': [str(dtype) for dtype in source_df.dtypes],
+            'Non-null Count': [source_df[col].count() for col in source_df.columns]
         })
         st.dataframe(cols_info, use_container_width=True, hide_index=True)
     else:
@@ -615,9 +782,16 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
-# Auto-refresh functionality
+# Auto-refresh functionality: a timer-driven fragment polls the shared data version
+# and only reruns the page when it moved, so idle sessions hold no script thread
+st.session_state['rendered_data_version'] = data_version
+
+@st.fragment(run_every=AUTO_REFRESH_CHECK_SECONDS)
+def watch_for_new_data():
+    """Rerun the whole page once the shared data version differs from the one on screen"""
+    if get_data_hub().version(SHEET_NAME) != st.session_state.get('rendered_data_version'):
+        st.rerun()
+
 if auto_refresh:
-    import time
-    time.sleep(60)
-    st.rerun()
+    watch_for_new_data()
 
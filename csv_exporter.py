@@ -1,6 +1,186 @@
-import pandas as pd
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+import time
+
+from task_schema import to_sheet_text
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EXPORT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".exports")
+DEFAULT_CHUNK_SIZE = 10_000
+
+# Format name -> (file extension, MIME type)
+EXPORT_FORMATS = {
+    'CSV': ('csv', 'text/csv'),
+    'Excel': ('xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+    'Parquet': ('parquet', 'application/vnd.apache.parquet'),
+}
+
+
+def iter_chunks(dataframe, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield consecutive row slices of a frame (an empty frame yields itself once, for the header)"""
+    if dataframe.empty:
+        yield dataframe
+        return
+    for start in range(0, len(dataframe), chunk_size):
+        yield dataframe.iloc[start:start + chunk_size]
+
+
+def write_csv(chunks, path):
+    """Write a stream of frames to one CSV file, header taken from the first chunk"""
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        header = True
+        for chunk in chunks:
+            chunk.to_csv(f, index=False, header=header)
+            header = False
+
+
+def write_xlsx(chunks, path, sheet_name='Tasks'):
+    """Write a stream of frames to an XLSX file with openpyxl's write-only (streaming) workbook"""
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title=sheet_name)
+    header = True
+    for chunk in chunks:
+        if header:
+            sheet.append([str(col) for col in chunk.columns])
+            header = False
+        # Object dtype lets missing values of every kind become None (an empty cell)
+        values = chunk.astype(object).where(chunk.notna(), None)
+        for row in values.itertuples(index=False, name=None):
+            sheet.append(row)
+    workbook.save(path)
+
+
+def write_parquet(chunks, path):
+    """Write a stream of frames to one Parquet file, one row group per chunk"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            else:
+                table = table.cast(writer.schema)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+_WRITERS = {
+    'CSV': write_csv,
+    'Excel': write_xlsx,
+    'Parquet': write_parquet,
+}
+
+
+def export_frame(dataframe, path, fmt='CSV', chunk_size=DEFAULT_CHUNK_SIZE):
+    """Stream a frame to `path` in the given format; at most one chunk is converted at a time
+
+    Typed task columns are rendered back to the sheet's text (Yes/No,
+    YYYY-MM-DD, the original Reminder Count text) so exports round-trip.
+    """
+    if fmt not in _WRITERS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    _WRITERS[fmt]((to_sheet_text(chunk) for chunk in iter_chunks(dataframe, chunk_size)), path)
+
 
 def export_to_csv(dataframe, filename):
-    dataframe.to_csv(filename, index=False)
+    export_frame(dataframe, filename, 'CSV')
+
+
+class ExportCache:
+    """Export artifacts on local disk, one file per (data version, filters, format)
+
+    The first request for a key streams the frame to a temporary file and
+    renames it into place; later requests, from any session or process,
+    reuse the file. After each new artifact the directory is pruned:
+    artifacts unused for `max_age` seconds go first, then the least recently
+    used ones until at most `max_entries` files and `max_bytes` bytes remain.
+    """
+
+    def __init__(self, directory=DEFAULT_EXPORT_DIR, max_entries=16, max_bytes=512 * 1024 * 1024,
+                 max_age=24 * 3600, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.chunk_size = chunk_size
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def path(self, data_version, filters, fmt):
+        """File that holds (or will hold) the artifact for a key"""
+        extension, _ = EXPORT_FORMATS[fmt]
+        digest = hashlib.sha1(repr((data_version, filters, fmt)).encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, f"tasks_{digest}.{extension}")
+
+    def get(self, dataframe, data_version, filters, fmt):
+        """Path of the artifact for a key, writing it first if it does not exist yet"""
+        path = self.path(data_version, filters, fmt)
+        with self._lock:
+            key_lock = self._locks.setdefault(path, threading.Lock())
+        # Concurrent requests for the same artifact wait for one writer
+        with key_lock:
+            if os.path.exists(path):
+                os.utime(path)  # Recently used, so pruning keeps it
+                return path
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=f"{os.path.basename(path)}.", suffix=".tmp")
+            os.close(fd)
+            try:
+                export_frame(dataframe, tmp_path, fmt, self.chunk_size)
+                os.replace(tmp_path, path)
+            except Exception as e:
+                logger.error(f"Failed to export {fmt}: {str(e)}")
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+            logger.info(f"Exported {len(dataframe)} rows to {path}")
+        self.prune(keep=path)
+        return path
+
+    def prune(self, keep=None):
+        """Delete expired and least recently used artifacts beyond the entry and size caps"""
+        now = time.time()
+        artifacts = []
+        for name in os.listdir(self.directory):
+            if not name.startswith('tasks_'):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if name.endswith('.tmp'):
+                if now - stat.st_mtime > self.max_age:
+                    _remove(path)  # Left behind by a writer that died
+                continue
+            artifacts.append((stat.st_mtime, stat.st_size, path))
+
+        kept, kept_bytes = 0, 0
+        for used_at, size, path in sorted(artifacts, reverse=True):
+            fits = (now - used_at <= self.max_age and kept < self.max_entries
+                    and kept_bytes + size <= self.max_bytes)
+            if fits or path == keep:
+                kept += 1
+                kept_bytes += size
+            else:
+                _remove(path)
+                with self._lock:
+                    self._locks.pop(path, None)
 
 
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
@@ -0,0 +1,168 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass, replace
+
+import pandas as pd
+
+from task_schema import frame_version
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class DataSnapshot:
+    """One published, versioned view of an entity
+
+    `version` is the content hash of the raw data, so it only changes when the
+    data does. `df` is shared by every session and must be treated as read-only.
+    """
+    name: str
+    version: str
+    df: pd.DataFrame
+    loaded_at: float
+    checked_at: float
+    error: str = None
+
+
+@dataclass
+class _Source:
+    fetch: object
+    initial: object = None
+    fallback: object = None
+    transform: object = None
+
+
+class DataHub:
+    """Process-wide data hub: one background poller feeding immutable snapshots to all sessions
+
+    Each registered entity has a `fetch()` callable returning a raw DataFrame,
+    or None when the source reports it unchanged. The poller refreshes every
+    entity each `poll_interval` seconds; concurrent refresh requests for the
+    same entity are collapsed into the one already running (single-flight), and
+    invalidating one entity never touches the others.
+    """
+
+    def __init__(self, poll_interval=60):
+        self.poll_interval = poll_interval
+        self._sources = {}
+        self._snapshots = {}
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def register(self, name, fetch, initial=None, fallback=None, transform=None):
+        """Add an entity
+
+        `initial()` may return a locally cached frame to publish before the
+        first network fetch; `fallback()` supplies data when nothing else is
+        available; `transform(df)` turns raw data into what sessions consume.
+        """
+        self._sources[name] = _Source(fetch, initial, fallback, transform)
+
+    def start(self):
+        """Start the background poller (idempotent)"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._poll, name="data-hub-poller", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=5):
+        """Stop the background poller"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def get(self, name):
+        """Latest snapshot of an entity, loading it synchronously only on first use"""
+        snapshot = self._snapshots.get(name)
+        if snapshot is not None:
+            return snapshot
+        source = self._sources[name]
+        if source.initial is not None:
+            try:
+                df = source.initial()
+                if df is not None:
+                    with self._lock:
+                        if name not in self._snapshots:
+                            self._publish(name, df, error=None)
+                    return self._snapshots[name]
+            except Exception as e:
+                logger.warning(f"Could not read local copy of {name}: {str(e)}")
+        return self.refresh(name)
+
+    def version(self, name):
+        """Version of the latest published snapshot, or None before the first load"""
+        snapshot = self._snapshots.get(name)
+        return snapshot.version if snapshot is not None else None
+
+    def refresh(self, name):
+        """Fetch an entity now; if a fetch is already running, wait for it instead of starting another"""
+        with self._lock:
+            running = self._inflight.get(name)
+            if running is None:
+                done = threading.Event()
+                self._inflight[name] = done
+        if running is not None:
+            running.wait()
+            return self._snapshots.get(name)
+
+        try:
+            self._load(name)
+        finally:
+            with self._lock:
+                del self._inflight[name]
+            done.set()
+        return self._snapshots.get(name)
+
+    def invalidate(self, name):
+        """Force a refresh of a single entity, leaving every other snapshot untouched"""
+        return self.refresh(name)
+
+    def _load(self, name):
+        source = self._sources[name]
+        current = self._snapshots.get(name)
+        try:
+            raw = source.fetch()
+        except Exception as e:
+            logger.error(f"Failed to refresh {name}: {str(e)}")
+            with self._lock:
+                if current is not None:
+                    # Keep serving the last good data, flagged with the error
+                    self._snapshots[name] = replace(current, checked_at=time.time(), error=str(e))
+                    return
+                raw = source.fallback() if source.fallback is not None else pd.DataFrame()
+                self._publish(name, raw, error=str(e))
+            return
+
+        with self._lock:
+            if raw is None and current is not None:
+                self._snapshots[name] = replace(current, checked_at=time.time(), error=None)
+                return
+            self._publish(name, raw if raw is not None else pd.DataFrame(), error=None)
+
+    def _publish(self, name, raw, error):
+        """Swap in a new snapshot unless the content is unchanged (caller holds the lock)"""
+        now = time.time()
+        version = frame_version(raw)
+        current = self._snapshots.get(name)
+        if current is not None and current.version == version:
+            self._snapshots[name] = replace(current, checked_at=now, error=error)
+            return
+        source = self._sources[name]
+        df = source.transform(raw) if source.transform is not None else raw
+        self._snapshots[name] = DataSnapshot(name, version, df, loaded_at=now, checked_at=now, error=error)
+        logger.info(f"Published {name} snapshot {version[:12]} ({len(df)} rows)")
+
+    def _poll(self):
+        while not self._stop.is_set():
+            for name in list(self._sources):
+                if self._stop.is_set():
+                    return
+                try:
+                    self.refresh(name)
+                except Exception as e:
+                    logger.error(f"Data hub poll of {name} failed: {str(e)}")
+            self._stop.wait(self.poll_interval)
@@ -1,15 +1,190 @@
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
 import pandas as pd
 
+from http_transport import shared_transport
+from task_schema import apply_task_schema
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+@dataclass(frozen=True)
+class EntitySpec:
+    """Where an entity lives and how its columns are typed"""
+    name: str
+    filename: str
+    ttl: float
+    categories: list = field(default_factory=list)
+    dates: list = field(default_factory=list)
+
+
+ENTITIES = {
+    'Projects': EntitySpec('Projects', 'projects.csv', ttl=300,
+                           categories=['Status', 'Assigned To', 'Client Name'], dates=['Due Date']),
+    # tasks.csv and the Tasks worksheet differ in layout; relations.TASK_LAYOUTS maps both
+    'Tasks': EntitySpec('Tasks', 'tasks.csv', ttl=60,
+                        categories=['Project Name', 'Status', 'Assigned To'], dates=['Due Date']),
+    'Clients': EntitySpec('Clients', 'clients.csv', ttl=3600,
+                          categories=['Company']),
+    'Teams': EntitySpec('Teams', 'teams.csv', ttl=3600,
+                        categories=['Role', 'Department', 'Status']),
+}
+
+
+def apply_entity_schema(df, spec):
+    """Return a copy of a raw entity frame with trimmed headers and typed columns"""
+    typed = df.copy()
+    typed.columns = typed.columns.astype(str).str.strip()
+    if spec.name == 'Tasks':
+        typed = apply_task_schema(typed)
+    for col in spec.categories:
+        if col in typed.columns and not isinstance(typed[col].dtype, pd.CategoricalDtype):
+            typed[col] = typed[col].astype('category')
+    for col in spec.dates:
+        if col in typed.columns and not pd.api.types.is_datetime64_any_dtype(typed[col]):
+            typed[col] = pd.to_datetime(typed[col], errors='coerce', format='mixed')
+    return typed
+
+
+class EntityLoader:
+    """Loads Projects, Tasks, Clients and Teams together, each cached with its own TTL
+
+    `source` is 'csv' for the CSV files next to this module (or in
+    `data_dir`) or 'sheets' for the worksheets of `sheet_id`. With an
+    authenticated gspread `client` every stale worksheet is read in a single
+    batch request; without one the public CSV export links are fetched
+    concurrently over one pooled HTTP session. Local files are likewise read
+    in parallel, so a cold start costs about one round-trip, not four.
+    """
+
+    def __init__(self, source='csv', data_dir=DATA_DIR, sheet_id=None, client=None,
+                 transport=None, entities=None, max_workers=4):
+        self.source = source
+        self.data_dir = data_dir
+        self.sheet_id = sheet_id
+        self.client = client
+        self.transport = transport or shared_transport()
+        self.entities = entities or ENTITIES
+        self.max_workers = max_workers
+        self.errors = {}
+        self._spreadsheet = None
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def set_client(self, client, spreadsheet=None):
+        """Share an authenticated gspread client (and optionally its opened spreadsheet)"""
+        with self._lock:
+            self.client = client
+            self._spreadsheet = spreadsheet
+
+    def load(self, name, force=False):
+        """One entity as a typed frame, fetched only when its cached copy is older than its TTL"""
+        return self.load_all([name], force=force)[name]
+
+    def load_all(self, names=None, force=False):
+        """Typed frames for several entities (all by default), fetching every stale one at once"""
+        names = list(names or self.entities)
+        now = time.time()
+        with self._lock:
+            stale = [name for name in names if force or not self._is_fresh(name, now)]
+
+        if stale:
+            for name, df, error in self._fetch(stale):
+                if error is not None:
+                    logger.error(f"Failed to load {name}: {error}")
+                    with self._lock:
+                        self.errors[name] = error
+                    continue
+                typed = apply_entity_schema(df, self.entities[name])
+                with self._lock:
+                    self._cache[name] = (typed, time.time())
+                    self.errors.pop(name, None)
+
+        with self._lock:
+            # Entities that failed keep serving their last good copy, or an empty frame
+            return {name: self._cache.get(name, (pd.DataFrame(), None))[0] for name in names}
+
+    def age(self, name):
+        """Seconds since an entity was loaded, or None if it never was"""
+        entry = self._cache.get(name)
+        return None if entry is None else time.time() - entry[1]
+
+    def invalidate(self, name=None):
+        """Drop one cached entity, or all of them"""
+        with self._lock:
+            if name is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(name, None)
+
+    def _is_fresh(self, name, now):
+        entry = self._cache.get(name)
+        return entry is not None and now - entry[1] < self.entities[name].ttl
+
+    def _fetch(self, names):
+        """Yield (name, raw frame, error message) for each requested entity"""
+        if self.source == 'sheets' and self.client is not None:
+            yield from self._fetch_batch(names)
+            return
+        fetch_one = self._fetch_export if self.source == 'sheets' else self._read_csv
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(names))) as pool:
+            futures = {name: pool.submit(fetch_one, self.entities[name]) for name in names}
+            for name, future in futures.items():
+                try:
+                    yield name, future.result(), None
+                except Exception as e:
+                    yield name, None, str(e)
+
+    def _read_csv(self, spec):
+        return pd.read_csv(os.path.join(self.data_dir, spec.filename))
+
+    def _fetch_export(self, spec):
+        url = f"https://docs.google.com/spreadsheets/d/{self.sheet_id}/gsheet?tqx=out:csv&sheet={spec.name}"
+        return self.transport.read_csv(url)
+
+    def _fetch_batch(self, names):
+        """Read several worksheets with one values.batchGet request"""
+        try:
+            with self._lock:
+                if self._spreadsheet is None:
+                    self._spreadsheet = self.client.open_by_key(self.sheet_id)
+                spreadsheet = self._spreadsheet
+            ranges = [f"'{self.entities[name].name}'" for name in names]
+            response = spreadsheet.values_batch_get(ranges)
+        except Exception as e:
+            for name in names:
+                yield name, None, str(e)
+            return
+
+        for name, value_range in zip(names, response.get('valueRanges', [])):
+            values = value_range.get('values', [])
+            if not values:
+                yield name, pd.DataFrame(), None
+                continue
+            header, rows = values[0], values[1:]
+            # The API trims trailing empty cells, so pad every row to the header width
+            rows = [row[:len(header)] + [''] * (len(header) - len(row)) for row in rows]
+            yield name, pd.DataFrame(rows, columns=header), None
+
+
+_local_loader = EntityLoader()
+
+
 def load_projects():
-    return pd.read_csv('projects.csv')
+    return _local_loader.load('Projects')
 
 def load_tasks():
-    return pd.read_csv('tasks.csv')
+    return _local_loader.load('Tasks')
 
 def load_clients():
-    return pd.read_csv('clients.csv')
+    return _local_loader.load('Clients')
 
 def load_teams():
-    return pd.read_csv('teams.csv')
-
-
+    return _local_loader.load('Teams')
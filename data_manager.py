@@ -3,19 +3,58 @@ import requests
 import gspread
 from google.oauth2.service_account import Credentials
 import json
+import os
+import random
+import sqlite3
+import threading
+import time
+from collections import deque
 from datetime import datetime, timedelta
 import logging
 
+from analytics import AnalyticsEngine
+from data_loader import EntityLoader
+from http_transport import shared_transport
+from incremental_refresh import IncrementalTaskLoader
+from relations import RelationIndex
+from reminder_scheduler import ReminderScheduler
+from sheet_index import TaskRowIndex, WorksheetSchema
+from snapshot_cache import SnapshotStore
+from storage_backends import GoogleSheetsBackend
+from task_schema import DEFAULT_TASK_COLUMNS, apply_task_schema, frame_version
+from webhook_dispatcher import WebhookDispatcher
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Why an update reports False: no row has the Task ID, or the sheet has none of the changed columns
+UPDATE_NOT_WRITTEN = "Task not found or none of its columns exist"
+
 class EnhancedDataManager:
-    def __init__(self, sheet_id="1NOOKyz9iUzwcsV0EcNJdVNQgQVL9bu3qsn_9wg7e1lE"):
+    def __init__(self, sheet_id="1NOOKyz9iUzwcsV0EcNJdVNQgQVL9bu3qsn_9wg7e1lE", index_dir=None, snapshot_store=None, transport=None,
+                 storage=None):
         self.sheet_id = sheet_id
         self.csv_url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gsheet?tqx=out:csv&sheet=Tasks"
         self.gc = None
         self.sheet = None
+        self.index_dir = index_dir  # Optional directory for persisting Task ID -> row indexes
+        self.snapshots = snapshot_store or SnapshotStore()
+        self.transport = transport or shared_transport()  # Pooled HTTP client shared with the app
+        self.task_loader = IncrementalTaskLoader(self.csv_url, change_token=self._sheet_revision,
+                                                 transport=self.transport)
+        self.analytics = AnalyticsEngine()
+        self.entities = EntityLoader(source="sheets", sheet_id=sheet_id, transport=self.transport)
+        self.relations = RelationIndex()
+        # Where task rows are read and written; Google Sheets unless another StorageBackend is given
+        self.storage = storage or GoogleSheetsBackend(self)
+        self._row_indexes = {}
+        self._schemas = {}
+        self._worksheets = {}
+        self._write_queues = {}
+        self._reminder_schedulers = {}
+        self.webhooks = None  # Optional WebhookDispatcher notified of every task mutation
+        self._write_lock = threading.RLock()
         
     def setup_gspread_client(self, service_account_info):
         """Setup gspread client with service account credentials"""
@@ -32,6 +71,8 @@ class EnhancedDataManager:
             
             self.gc = gspread.authorize(credentials)
             self.sheet = self.gc.open_by_key(self.sheet_id)
+            self._worksheets = {}
+            self.entities.set_client(self.gc, self.sheet)
             logger.info("Successfully connected to Google Sheets")
             return True
             
@@ -42,146 +83,425 @@ class EnhancedDataManager:
     def load_tasks_from_csv_url(self):
         """Load tasks from Google Sheets CSV export URL"""
         try:
-            df = pd.read_csv(self.csv_url)
-            df.columns = df.columns.str.strip()
-            logger.info(f"Successfully loaded {len(df)} tasks from CSV URL")
-            return df
+            df = self._fetch_tasks_csv()
+            self.snapshots.save(self.sheet_id, "Tasks", df)
+            return apply_task_schema(df)
+            
+        except Exception as e:
+            logger.error(f"Failed to load from CSV URL: {str(e)}")
+            return apply_task_schema(self._get_fallback_data("Tasks"))
+    
+    def load_tasks_cached(self, max_age=60):
+        """Load tasks from the local snapshot, refreshing it from the CSV URL in the background"""
+        try:
+            df = self.snapshots.read_through(self.sheet_id, "Tasks", self._fetch_tasks_csv, max_age=max_age)
             
         except Exception as e:
             logger.error(f"Failed to load from CSV URL: {str(e)}")
-            return self._get_sample_data()
+            df = self._get_sample_data()
+        return apply_task_schema(df)
+    
+    def refresh_tasks_incremental(self):
+        """Refresh tasks from the CSV export only if the sheet changed; returns a RefreshResult"""
+        return self.task_loader.refresh()
+    
+    def _fetch_tasks_csv(self):
+        """Fetch the Tasks CSV export, skipping the download when the sheet is unchanged (raises on failure)"""
+        df = self.task_loader.refresh().df
+        logger.info(f"Successfully loaded {len(df)} tasks from CSV URL")
+        return df
+    
+    def _sheet_revision(self):
+        """Drive last-update time of the spreadsheet, used as a cheap change signal"""
+        if not self.sheet:
+            return None  # No authenticated client; the loader falls back to conditional GETs
+        return self.sheet.get_lastUpdateTime()
+    
+    def load_entities(self, names=None, force=False):
+        """Load Projects, Tasks, Clients and Teams (or `names`) as typed frames in one go"""
+        try:
+            return self.entities.load_all(names, force=force)
+        except Exception as e:
+            logger.error(f"Failed to load entities: {str(e)}")
+            return {}
+    
+    def get_relational_model(self, frames=None):
+        """Cross-entity joins and rollups, rebuilt only when one of the entity frames changes"""
+        try:
+            return self.relations.get(frames if frames is not None else self.load_entities())
+        except Exception as e:
+            logger.error(f"Failed to build relational model: {str(e)}")
+            return None
+    
+    def load_tasks(self, worksheet_name="Tasks"):
+        """Load tasks from the storage backend (raises on failure)"""
+        df = self.storage.load_tasks(worksheet_name)
+        self.snapshots.save(self.sheet_id, worksheet_name, df)
+        logger.info(f"Successfully loaded {len(df)} tasks from {self.storage.name}")
+        return apply_task_schema(df)
     
     def load_tasks_from_gspread(self, worksheet_name="Tasks"):
         """Load tasks using gspread API"""
         try:
-            if not self.gc or not self.sheet:
-                logger.warning("gspread client not initialized")
+            if not self.storage.is_ready():
+                logger.warning(f"{self.storage.name} storage not ready")
                 return self.load_tasks_from_csv_url()
             
-            worksheet = self.sheet.worksheet(worksheet_name)
-            data = worksheet.get_all_records()
-            df = pd.DataFrame(data)
-            
-            logger.info(f"Successfully loaded {len(df)} tasks from gspread")
-            return df
+            return self.load_tasks(worksheet_name)
             
         except Exception as e:
-            logger.error(f"Failed to load from gspread: {str(e)}")
+            logger.error(f"Failed to load from {self.storage.name}: {str(e)}")
             return self.load_tasks_from_csv_url()
     
+    def query_tasks(self, filters=None, worksheet_name="Tasks"):
+        """Tasks matching {column: allowed values}, filtered by the backend (indexed on SQLite)"""
+        try:
+            return apply_task_schema(self.storage.query_tasks(worksheet_name, filters))
+            
+        except Exception as e:
+            logger.error(f"Failed to query tasks: {str(e)}")
+            return pd.DataFrame()
+    
     def add_task(self, task_data, worksheet_name="Tasks"):
         """Add a new task to the Google Sheet"""
         try:
-            if not self.gc or not self.sheet:
-                logger.warning("gspread client not initialized, cannot add task")
+            if not self.storage.is_ready():
+                logger.warning(f"{self.storage.name} storage not ready, cannot add task")
                 return False
             
-            worksheet = self.sheet.worksheet(worksheet_name)
-            
-            # Prepare row data in the correct order
-            row_data = [
-                task_data.get('Task ID', ''),
-                task_data.get('Executor', ''),
-                task_data.get('Date', ''),
-                task_data.get('Reminder Time', ''),
-                task_data.get('Task Description', ''),
-                task_data.get('Object', ''),
-                task_data.get('Section', ''),
-                task_data.get('Priority', ''),
-                task_data.get('Executor ID', ''),
-                task_data.get('Company', ''),
-                task_data.get('Reminder Sent', ''),
-                task_data.get('Reminder Sent Date', ''),
-                task_data.get('Reminder Read', ''),
-                task_data.get('Read Time', ''),
-                task_data.get('Reminder Count', ''),
-                task_data.get('Reminder Interval if No Report', ''),
-                task_data.get('Status', ''),
-                task_data.get('Comment', ''),
-                task_data.get('Report Date', '')
-            ]
-            
-            worksheet.append_row(row_data)
-            logger.info(f"Successfully added task: {task_data.get('Task ID', 'Unknown')}")
+            queue = self._write_queues.get(worksheet_name)
+            if queue is not None:
+                queue.submit_add(task_data)  # Webhook events are sent once the queue has written it
+            else:
+                self.storage.append_tasks(worksheet_name, [task_data])
+                logger.info(f"Successfully added task: {task_data.get('Task ID', 'Unknown')}")
+                self._notify('add', {task_data.get('Task ID'): task_data})
             return True
             
         except Exception as e:
             logger.error(f"Failed to add task: {str(e)}")
             return False
     
+    def add_tasks(self, tasks, worksheet_name="Tasks", chunk_size=500, max_retries=3):
+        """Bulk-add tasks with append_rows, skipping Task IDs that already exist
+        
+        Each task is validated with validate_task_data and normalized with
+        format_task_data, then written `chunk_size` rows per request. Re-running an
+        import is safe: IDs already in the sheet (or repeated in the input) are
+        skipped. Returns a report dict where 'added' and 'skipped' list Task IDs and
+        'failed' lists {'row', 'task_id', 'error'} entries, `row` being the
+        0-based position in the input.
+        """
+        report = {'added': [], 'skipped': [], 'failed': []}
+        tasks = iter(tasks)
+        try:
+            if not self.storage.is_ready():
+                raise RuntimeError(f"{self.storage.name} storage not ready, cannot add tasks")
+            
+            queue = self._write_queues.get(worksheet_name)
+            # Queued adds first: once flushed they are in the backend by the time it is read
+            pending = queue.pending_add_ids() if queue is not None else set()
+            existing = self.storage.existing_task_ids(worksheet_name) | pending  # Fresh view of existing Task IDs
+            
+        except Exception as e:
+            logger.error(f"Failed to add tasks: {str(e)}")
+            for position, task_data in enumerate(tasks):
+                report['failed'].append({'row': position, 'task_id': task_data.get('Task ID'), 'error': str(e)})
+            return report
+        
+        seen = set()
+        chunk = []
+        records = {}  # Only kept for webhook events
+        for position, task_data in enumerate(tasks):
+            valid, message = validate_task_data(task_data)
+            if not valid:
+                report['failed'].append({'row': position, 'task_id': task_data.get('Task ID'), 'error': message})
+                continue
+            
+            record = format_task_data(task_data)
+            task_id = str(record['Task ID'])
+            if task_id in seen or task_id in existing:
+                report['skipped'].append(task_id)
+                continue
+            seen.add(task_id)
+            if self.webhooks is not None:
+                records[task_id] = record
+            
+            chunk.append((position, record))
+            if len(chunk) >= chunk_size:
+                self._append_chunk(worksheet_name, chunk, report, max_retries)
+                chunk = []
+        
+        if chunk:
+            self._append_chunk(worksheet_name, chunk, report, max_retries)
+        
+        if report['added'] and self.webhooks is not None:
+            added = set(report['added'])
+            self._notify('add', {task_id: record for task_id, record in records.items() if task_id in added})
+        
+        logger.info(
+            f"Bulk add finished: {len(report['added'])} added, "
+            f"{len(report['skipped'])} skipped, {len(report['failed'])} failed"
+        )
+        return report
+    
     def update_task(self, task_id, updated_data, worksheet_name="Tasks"):
         """Update an existing task in the Google Sheet"""
+        results = self.bulk_update_tasks({task_id: updated_data}, worksheet_name)
+        return results.get(task_id, False)
+    
+    def bulk_update_tasks(self, updates, worksheet_name="Tasks"):
+        """Update many tasks at once, writing every changed cell in a single batch request
+        
+        `updates` maps Task ID -> {column name: new value}. Returns a dict mapping
+        each Task ID to True if its row was found and written, False otherwise
+        (also when none of its columns exist; unknown columns are logged).
+        With write-behind enabled every edit is accepted and reported as True;
+        edits the queue later cannot write show up in its dead letters.
+        """
+        results = {task_id: False for task_id in updates}
         try:
-            if not self.gc or not self.sheet:
-                logger.warning("gspread client not initialized, cannot update task")
-                return False
+            if not self.storage.is_ready():
+                logger.warning(f"{self.storage.name} storage not ready, cannot update task")
+                return results
             
-            worksheet = self.sheet.worksheet(worksheet_name)
-            
-            # Find the row with the matching Task ID
-            task_id_col = worksheet.col_values(1)  # Assuming Task ID is in column A
-            
-            for i, cell_value in enumerate(task_id_col[1:], start=2):  # Skip header row
-                if cell_value == task_id:
-                    # Update the row
-                    for col_name, new_value in updated_data.items():
-                        col_index = self._get_column_index(worksheet, col_name)
-                        if col_index:
-                            worksheet.update_cell(i, col_index, new_value)
-                    
-                    logger.info(f"Successfully updated task: {task_id}")
-                    return True
-            
-            logger.warning(f"Task ID {task_id} not found")
-            return False
+            queue = self._write_queues.get(worksheet_name)
+            if queue is not None:
+                for task_id, changes in updates.items():
+                    queue.submit_update(task_id, changes)
+                results = {task_id: True for task_id in updates}
+            else:
+                results = self.storage.update_tasks(worksheet_name, updates)
+                self._notify('update', {task_id: updates[task_id] for task_id, ok in results.items() if ok})
+            return results
             
         except Exception as e:
             logger.error(f"Failed to update task: {str(e)}")
-            return False
+            return {task_id: False for task_id in updates}
     
     def delete_task(self, task_id, worksheet_name="Tasks"):
         """Delete a task from the Google Sheet"""
         try:
-            if not self.gc or not self.sheet:
-                logger.warning("gspread client not initialized, cannot delete task")
+            if not self.storage.is_ready():
+                logger.warning(f"{self.storage.name} storage not ready, cannot delete task")
                 return False
             
-            worksheet = self.sheet.worksheet(worksheet_name)
-            
-            # Find the row with the matching Task ID
-            task_id_col = worksheet.col_values(1)
+            queue = self._write_queues.get(worksheet_name)
+            if queue is not None:
+                queue.submit_delete(task_id)
+                return True
             
-            for i, cell_value in enumerate(task_id_col[1:], start=2):
-                if cell_value == task_id:
-                    worksheet.delete_rows(i)
-                    logger.info(f"Successfully deleted task: {task_id}")
-                    return True
-            
-            logger.warning(f"Task ID {task_id} not found")
-            return False
+            deleted = self.storage.delete_task(worksheet_name, task_id)
+            if deleted:
+                self._notify('delete', {task_id: None})
+            return deleted
             
         except Exception as e:
             logger.error(f"Failed to delete task: {str(e)}")
             return False
     
+    def enable_write_behind(self, worksheet_name="Tasks", **queue_options):
+        """Route add/update/delete for a worksheet through a background WriteBehindQueue
+        
+        Mutations then return as soon as they are queued; see WriteBehindQueue for
+        the available options (flush_interval, max_batch, max_retries, ...).
+        """
+        queue = self._write_queues.get(worksheet_name)
+        if queue is None:
+            queue = WriteBehindQueue(self, worksheet_name, **queue_options)
+            self._write_queues[worksheet_name] = queue
+        return queue
+    
+    def disable_write_behind(self, worksheet_name="Tasks", timeout=30):
+        """Flush and stop the write-behind queue for a worksheet"""
+        queue = self._write_queues.pop(worksheet_name, None)
+        if queue is None:
+            return True
+        drained = queue.close(timeout)
+        index = self._row_indexes.get(worksheet_name)
+        if index is not None:
+            index.flush(force=True)
+        return drained
+    
+    def enable_reminders(self, worksheet_name="Tasks", notifier=None, poll_interval=60, **scheduler_options):
+        """Start a background ReminderScheduler for a worksheet, scheduled from its current tasks
+        
+        Delivered reminders are recorded with bulk_update_tasks, so they go
+        through the write-behind queue when one is enabled.
+        """
+        scheduler = self._reminder_schedulers.get(worksheet_name)
+        if scheduler is None:
+            scheduler = ReminderScheduler(self, notifier, worksheet_name, **scheduler_options)
+            self._reminder_schedulers[worksheet_name] = scheduler
+        scheduler.load(self.load_tasks(worksheet_name))
+        scheduler.start(poll_interval)
+        return scheduler
+    
+    def disable_reminders(self, worksheet_name="Tasks", timeout=10):
+        """Stop the reminder scheduler for a worksheet"""
+        scheduler = self._reminder_schedulers.pop(worksheet_name, None)
+        if scheduler is not None:
+            scheduler.stop(timeout)
+    
+    def enable_webhooks(self, url=None, **dispatcher_options):
+        """Send task.created/updated/status_changed/assigned/deleted events to an n8n webhook
+        
+        Events are queued and sent in batches by a background WebhookDispatcher,
+        so task writes never wait on the endpoint.
+        """
+        if self.webhooks is None:
+            if url:
+                dispatcher_options['url'] = url
+            self.webhooks = WebhookDispatcher(transport=self.transport, **dispatcher_options)
+        return self.webhooks
+    
+    def disable_webhooks(self, timeout=30):
+        """Send queued events and stop the webhook dispatcher"""
+        dispatcher, self.webhooks = self.webhooks, None
+        if dispatcher is None:
+            return True
+        return dispatcher.close(timeout)
+    
+    def _notify(self, kind, tasks):
+        """Queue webhook events for {task_id: data}; never raises"""
+        if self.webhooks is None:
+            return
+        try:
+            for task_id, data in tasks.items():
+                self.webhooks.publish_task(kind, task_id, data)
+        except Exception as e:
+            logger.error(f"Failed to queue webhook events: {str(e)}")
+    
+    def _read_worksheet(self, worksheet_name):
+        """Download a whole worksheet as an all-text DataFrame (raises on API errors)"""
+        worksheet = self._get_worksheet(worksheet_name)
+        values = worksheet.get_all_values()
+        schema = self._get_schema(worksheet, worksheet_name, header=values[0] if values else [])
+        rows = [row[:len(schema.headers)] for row in values[1:]]
+        return pd.DataFrame(rows, columns=schema.headers)
+    
+    def _existing_task_ids(self, worksheet_name):
+        """Task IDs currently in a worksheet, rebuilding its row index from column A"""
+        with self._write_lock:
+            worksheet = self._get_worksheet(worksheet_name)
+            index = self._get_row_index(worksheet_name)
+            index.build(worksheet.col_values(1))
+            return set(index.rows)
+    
+    def _append_task_rows(self, worksheet_name, records):
+        """Append task records in one append_rows request (raises on API errors)"""
+        with self._write_lock:
+            worksheet = self._get_worksheet(worksheet_name)
+            
+            # Lay rows out by header name so reordered columns stay correct
+            schema = self._get_schema(worksheet, worksheet_name, fresh_since=time.monotonic())
+            if schema.headers:
+                unknown = sorted({name for record in records for name in record if name not in schema.columns})
+                if unknown:
+                    logger.warning(f"Ignoring fields not present in sheet header: {unknown}")
+                rows = [schema.row_for(record) for record in records]
+            else:
+                rows = [[record.get(name, '') for name in DEFAULT_TASK_COLUMNS] for record in records]
+            
+            worksheet.append_rows(rows)
+            index = self._row_indexes.get(worksheet_name)
+            if index is not None and index.built:
+                for record in records:
+                    index.append(record.get('Task ID', ''))
+                index.flush()
+    
+    def _append_chunk(self, worksheet_name, chunk, report, max_retries):
+        """Append one chunk of (position, record) pairs for add_tasks, retrying transient errors
+        
+        A failed request may still have landed in storage, so before each retry
+        the stored Task IDs are re-read and rows that are already present are
+        counted as added rather than written twice.
+        """
+        for attempt in range(max_retries + 1):
+            try:
+                if attempt:
+                    present = self.storage.existing_task_ids(worksheet_name)
+                    landed = [(position, record) for position, record in chunk
+                              if str(record['Task ID']) in present]
+                    report['added'].extend(str(record['Task ID']) for _, record in landed)
+                    landed_positions = {position for position, _ in landed}
+                    chunk = [item for item in chunk if item[0] not in landed_positions]
+                    if not chunk:
+                        return
+                
+                self.storage.append_tasks(worksheet_name, [record for _, record in chunk])
+                report['added'].extend(str(record['Task ID']) for _, record in chunk)
+                return
+                
+            except Exception as e:
+                if not _is_retryable(e) or attempt == max_retries:
+                    logger.error(f"Failed to append {len(chunk)} task row(s): {str(e)}")
+                    for position, record in chunk:
+                        report['failed'].append({'row': position, 'task_id': record['Task ID'], 'error': str(e)})
+                    return
+                delay = _backoff_delay(attempt)
+                logger.warning(f"Retrying task append in {delay:.2f}s: {str(e)}")
+                time.sleep(delay)
+    
+    def _write_updates(self, worksheet_name, updates):
+        """Write {task_id: changes} in one batch_update request (raises on API errors)"""
+        with self._write_lock:
+            worksheet = self._get_worksheet(worksheet_name)
+            results = {task_id: False for task_id in updates}
+            
+            # Resolve rows and header once for the whole batch
+            started = time.monotonic()
+            row_lookup = self._resolve_rows(worksheet, worksheet_name, list(updates))
+            schema = self._get_schema(worksheet, worksheet_name, fresh_since=started)
+            
+            batch = []
+            for task_id, changes in updates.items():
+                row = row_lookup.get(task_id)
+                if row is None:
+                    logger.warning(f"Task ID {task_id} not found")
+                    continue
+                unknown = [col_name for col_name in changes if not schema.index(col_name)]
+                if unknown:
+                    logger.warning(f"Task ID {task_id}: columns not in sheet header: {unknown}")
+                    if len(unknown) == len(changes):
+                        continue  # Nothing of this edit can be written
+                for col_name, new_value in changes.items():
+                    col_index = schema.index(col_name)
+                    if col_index:
+                        batch.append({
+                            'range': gspread.utils.rowcol_to_a1(row, col_index),
+                            'values': [[new_value]]
+                        })
+                results[task_id] = True
+            
+            if batch:
+                worksheet.batch_update(batch, value_input_option='USER_ENTERED')
+            
+            updated = [task_id for task_id, ok in results.items() if ok]
+            logger.info(f"Successfully updated {len(updated)} task(s) with {len(batch)} cell(s) in one request")
+            return results
+    
+    def _delete_task_row(self, worksheet_name, task_id):
+        """Delete the row holding a Task ID; returns False if it does not exist (raises on API errors)"""
+        with self._write_lock:
+            worksheet = self._get_worksheet(worksheet_name)
+            
+            row = self._resolve_rows(worksheet, worksheet_name, [task_id]).get(task_id)
+            if row is None:
+                logger.warning(f"Task ID {task_id} not found")
+                return False
+            
+            worksheet.delete_rows(row)
+            index = self._row_indexes[worksheet_name]
+            index.remove(task_id)
+            index.flush()
+            logger.info(f"Successfully deleted task: {task_id}")
+            return True
+    
     def get_task_analytics(self, df):
         """Generate analytics from task data"""
         try:
-            analytics = {
-                'total_tasks': len(df),
-                'unique_executors': df['Executor'].nunique() if 'Executor' in df.columns else 0,
-                'unique_companies': df['Company'].nunique() if 'Company' in df.columns else 0,
-                'status_distribution': df['Status'].value_counts().to_dict() if 'Status' in df.columns else {},
-                'priority_distribution': df['Priority'].value_counts().to_dict() if 'Priority' in df.columns else {},
-                'executor_task_count': df['Executor'].value_counts().to_dict() if 'Executor' in df.columns else {},
-                'company_task_count': df['Company'].value_counts().to_dict() if 'Company' in df.columns else {},
-                'reminders_sent': len(df[df['Reminder Sent'].str.contains('Yes', case=False, na=False)]) if 'Reminder Sent' in df.columns else 0,
-                'reminders_read': len(df[df['Reminder Read'].str.contains('Yes', case=False, na=False)]) if 'Reminder Read' in df.columns else 0,
-                'high_priority_tasks': len(df[df['Priority'].str.contains('High', case=False, na=False)]) if 'Priority' in df.columns else 0,
-                'completed_tasks': len(df[df['Status'].str.contains('Completed|Done', case=False, na=False)]) if 'Status' in df.columns else 0
-            }
-            
-            return analytics
+            return self.analytics.get(df, frame_version(df)).task_analytics()
             
         except Exception as e:
             logger.error(f"Failed to generate analytics: {str(e)}")
@@ -190,30 +510,104 @@ class EnhancedDataManager:
     def get_reminder_insights(self, df):
         """Generate reminder-specific insights"""
         try:
-            insights = {
-                'total_reminders_sent': len(df[df['Reminder Sent'].str.contains('Yes', case=False, na=False)]) if 'Reminder Sent' in df.columns else 0,
-                'total_reminders_read': len(df[df['Reminder Read'].str.contains('Yes', case=False, na=False)]) if 'Reminder Read' in df.columns else 0,
-                'unread_reminders': len(df[
-                    (df['Reminder Sent'].str.contains('Yes', case=False, na=False)) & 
-                    (df['Reminder Read'].str.contains('No', case=False, na=False))
-                ]) if all(col in df.columns for col in ['Reminder Sent', 'Reminder Read']) else 0,
-                'pending_reminders': len(df[df['Reminder Sent'].str.contains('No', case=False, na=False)]) if 'Reminder Sent' in df.columns else 0,
-                'avg_reminder_count': df['Reminder Count'].astype(str).str.extract('(\d+)').astype(float).mean().iloc[0] if 'Reminder Count' in df.columns else 0
-            }
-            
-            return insights
+            return self.analytics.get(df, frame_version(df)).reminder_insights()
             
         except Exception as e:
             logger.error(f"Failed to generate reminder insights: {str(e)}")
             return {}
     
-    def _get_column_index(self, worksheet, column_name):
-        """Get the column index for a given column name"""
+    def get_storage_analytics(self, worksheet_name="Tasks"):
+        """Task analytics straight from the storage backend (SQL on SQLite), else from loaded tasks"""
         try:
-            headers = worksheet.row_values(1)
-            return headers.index(column_name) + 1
-        except ValueError:
-            return None
+            result = self.storage.task_analytics(worksheet_name)
+            if result is not None:
+                return result
+            return self.get_task_analytics(self.load_tasks(worksheet_name))
+            
+        except Exception as e:
+            logger.error(f"Failed to generate storage analytics: {str(e)}")
+            return {}
+    
+    def _get_worksheet(self, worksheet_name):
+        """Return a cached worksheet handle, opening it on first use"""
+        worksheet = self._worksheets.get(worksheet_name)
+        if worksheet is None:
+            worksheet = self.sheet.worksheet(worksheet_name)
+            self._worksheets[worksheet_name] = worksheet
+        return worksheet
+    
+    def _get_row_index(self, worksheet_name):
+        """Return the Task ID -> row index for a worksheet, loading it from disk if configured"""
+        index = self._row_indexes.get(worksheet_name)
+        if index is None:
+            path = None
+            if self.index_dir:
+                path = os.path.join(self.index_dir, f"{self.sheet_id}_{worksheet_name}_rows.json")
+            index = TaskRowIndex(path)
+            index.load()
+            self._row_indexes[worksheet_name] = index
+        return index
+    
+    def _resolve_rows(self, worksheet, worksheet_name, task_ids):
+        """Map Task IDs to sheet rows, rebuilding the index when the sheet has drifted
+        
+        A cached index is verified by reading back only the Task ID cells of the
+        resolved rows in one batch_get, so a healthy index never downloads the
+        whole column. Unknown IDs or mismatched cells trigger a single rebuild.
+        """
+        index = self._get_row_index(worksheet_name)
+        schema = self._schemas.setdefault(worksheet_name, WorksheetSchema())
+        if not index.built:
+            index.build(worksheet.col_values(1))  # Assuming Task ID is in column A
+            return {task_id: index.get(task_id) for task_id in task_ids}
+        
+        rows = {task_id: index.get(task_id) for task_id in task_ids}
+        known = [(task_id, row) for task_id, row in rows.items() if row is not None]
+        drifted = len(known) < len(rows)
+        if known and not drifted:
+            # The header row rides along in the same request to keep the schema current
+            observed = worksheet.batch_get(["1:1"] + [f"A{row}" for _, row in known])
+            header_range = observed[0]
+            schema.observe(header_range[0] if header_range else [])
+            for (task_id, row), value_range in zip(known, observed[1:]):
+                cell_value = value_range[0][0] if value_range and value_range[0] else ''
+                if not index.matches(row, cell_value):
+                    drifted = True
+                    break
+        
+        if drifted:
+            logger.info(f"Task row index for '{worksheet_name}' is stale, rebuilding")
+            index.build(worksheet.col_values(1))
+            rows = {task_id: index.get(task_id) for task_id in task_ids}
+        return rows
+    
+    def _get_schema(self, worksheet, worksheet_name, header=None, fresh_since=None):
+        """Return the cached header schema for a worksheet, reading row 1 only when not loaded
+        
+        Pass `header` when the caller already holds a fresh header row so the
+        schema is refreshed without another request. Writers pass `fresh_since`
+        (a time.monotonic() value): unless the header was read after it, row 1
+        is re-read so cells never land in columns that moved since it was cached.
+        """
+        schema = self._schemas.setdefault(worksheet_name, WorksheetSchema())
+        if header is not None:
+            schema.observe(header)
+        elif not schema.loaded:
+            schema.observe(worksheet.row_values(1))
+        elif fresh_since is not None and schema.observed_at < fresh_since:
+            version = schema.version
+            schema.observe(worksheet.row_values(1))
+            if schema.version != version:
+                logger.warning(f"Header of '{worksheet_name}' changed since it was cached, writing by the new layout")
+        return schema
+    
+    def _get_fallback_data(self, worksheet_name):
+        """Last good snapshot of a worksheet, or sample data when none exists"""
+        df, saved_at = self.snapshots.load(self.sheet_id, worksheet_name)
+        if df is not None:
+            logger.warning(f"Serving {worksheet_name} from local snapshot saved at {datetime.fromtimestamp(saved_at)}")
+            return df
+        return self._get_sample_data()
     
     def _get_sample_data(self):
         """Return sample data when live data is not available"""
@@ -245,6 +639,323 @@ class EnhancedDataManager:
             'Report Date': ['2025-08-05', '', '2025-08-07', '2025-08-08', '']
         })
 
+def _is_retryable(error):
+    """True for rate-limit (429), server-side (5xx), transient network and SQLite lock errors"""
+    if isinstance(error, gspread.exceptions.APIError):
+        status = getattr(error.response, 'status_code', None)
+        return status == 429 or (status is not None and status >= 500)
+    if isinstance(error, sqlite3.OperationalError):
+        return 'locked' in str(error) or 'busy' in str(error)
+    return isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+
+
+def _backoff_delay(attempt, base=0.5, cap=30.0):
+    """Jittered exponential backoff delay in seconds for a 0-based retry attempt"""
+    return min(cap, base * (2 ** attempt)) * random.uniform(0.5, 1.0)
+
+
+def _coalesce(existing, new):
+    """Merge a newly submitted mutation into the one already pending for the same Task ID
+    
+    Mutations are (kind, payload) tuples with kind in add/update/delete/replace,
+    where replace means "delete the row, then append payload". Returns None when
+    the two cancel out (a task added and deleted before it ever reached the sheet).
+    """
+    if existing is None:
+        return new
+    kind, payload = existing
+    new_kind, new_payload = new
+    if new_kind == 'delete':
+        return None if kind == 'add' else ('delete', None)
+    if new_kind == 'update':
+        if kind == 'delete':
+            logger.warning("Ignoring update queued after delete of the same task")
+            return existing
+        return (kind, {**payload, **new_payload})
+    # new_kind == 'add'
+    if kind == 'delete':
+        return ('replace', new_payload)
+    if kind == 'update':
+        return ('update', {**payload, **new_payload})
+    return (kind, {**payload, **new_payload})
+
+
+class WriteBehindQueue:
+    """Background writer that coalesces and batches task mutations for one worksheet
+    
+    Mutations are accepted immediately and keyed by Task ID, so repeated edits to
+    the same task collapse into one write. A daemon thread flushes the queue every
+    `flush_interval` seconds (or sooner once `max_batch` tasks are pending) using
+    one batch_update for all edits, one append_rows for all new tasks and a row
+    delete per removed task. Rate-limit and server errors are retried with
+    exponential backoff; mutations still failing after `max_retries` are put back
+    in the queue for the next flush. When a batched write is rejected outright
+    the rows are retried one by one, and every mutation that still cannot be
+    written (including updates to a Task ID that is not in the sheet) is
+    dead-lettered: counted in `dropped` and kept, most recent
+    `max_dead_letters`, in `stats()['dead_letters']`. Webhook events are
+    published after each flush and only for the mutations it wrote.
+    """
+    
+    def __init__(self, manager, worksheet_name="Tasks", flush_interval=1.0, max_batch=500,
+                 max_retries=5, backoff_base=0.5, backoff_max=30.0, max_dead_letters=1000):
+        self.manager = manager
+        self.worksheet_name = worksheet_name
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        
+        self._pending = {}
+        self._anonymous = 0
+        self._in_flight = {}
+        self._flush_requested = False
+        self._closed = False
+        self._cond = threading.Condition()
+        
+        self.flushes = 0
+        self.retries = 0
+        self.dropped = 0
+        self.dead_letters = deque(maxlen=max_dead_letters)
+        self.last_flush_latency = 0.0
+        self._total_flush_latency = 0.0
+        
+        self._thread = threading.Thread(target=self._run, name=f"write-behind-{worksheet_name}", daemon=True)
+        self._thread.start()
+    
+    def submit_add(self, task_data):
+        """Queue a new task row"""
+        task_id = task_data.get('Task ID')
+        if not task_id:
+            # Rows without an ID cannot be coalesced; give each its own slot
+            with self._cond:
+                self._anonymous += 1
+                task_id = ('anonymous', self._anonymous)
+        self._submit(task_id, ('add', dict(task_data)))
+    
+    def submit_update(self, task_id, changes):
+        """Queue field changes for an existing task"""
+        self._submit(task_id, ('update', dict(changes)))
+    
+    def submit_delete(self, task_id):
+        """Queue removal of a task row"""
+        self._submit(task_id, ('delete', None))
+    
+    @property
+    def depth(self):
+        """Number of tasks waiting to be written, including the batch being flushed"""
+        with self._cond:
+            return len(self._pending) + len(self._in_flight)
+    
+    def pending_add_ids(self):
+        """Task IDs of queued (or in-flight) new rows that are not written yet"""
+        with self._cond:
+            mutations = list(self._pending.items()) + list(self._in_flight.items())
+        return {str(task_id) for task_id, (kind, _) in mutations
+                if kind in ('add', 'replace') and not isinstance(task_id, tuple)}
+    
+    def stats(self):
+        """Queue depth and flush latency figures for monitoring"""
+        with self._cond:
+            return {
+                'queue_depth': len(self._pending),
+                'in_flight': len(self._in_flight),
+                'flushes': self.flushes,
+                'retries': self.retries,
+                'dropped': self.dropped,
+                'dead_letters': list(self.dead_letters),
+                'last_flush_latency': self.last_flush_latency,
+                'avg_flush_latency': self._total_flush_latency / self.flushes if self.flushes else 0.0
+            }
+    
+    def flush(self, timeout=30):
+        """Ask for an immediate flush and wait until the queue drains; returns True if it did"""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            self._flush_requested = True
+            self._cond.notify_all()
+            while self._pending or self._in_flight:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._thread.is_alive():
+                    return False
+                self._cond.wait(remaining)
+            return True
+    
+    def close(self, timeout=30):
+        """Flush outstanding mutations and stop the background thread"""
+        drained = self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+        return drained
+    
+    def _submit(self, task_id, mutation):
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("write-behind queue is closed")
+            merged = _coalesce(self._pending.pop(task_id, None), mutation)
+            if merged is not None:
+                self._pending[task_id] = merged
+            self._cond.notify_all()
+    
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if self._closed and not self._pending:
+                    return
+                
+                # Give further edits a moment to coalesce before writing
+                deadline = time.monotonic() + self.flush_interval
+                while (not self._closed and not self._flush_requested
+                       and len(self._pending) < self.max_batch):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                
+                batch = dict(list(self._pending.items())[:self.max_batch])
+                for task_id in batch:
+                    del self._pending[task_id]
+                self._in_flight = batch
+                if not self._pending:
+                    self._flush_requested = False
+            
+            started = time.monotonic()
+            leftovers, written = self._flush_batch(batch)
+            latency = time.monotonic() - started
+            
+            with self._cond:
+                for task_id, mutation in leftovers.items():
+                    newer = self._pending.pop(task_id, None)
+                    merged = mutation if newer is None else _coalesce(mutation, newer)
+                    if merged is not None:
+                        self._pending[task_id] = merged
+                self._in_flight = {}
+                self.flushes += 1
+                self.last_flush_latency = latency
+                self._total_flush_latency += latency
+                self._cond.notify_all()
+            logger.info(f"Flushed {len(written)} queued task mutation(s) in {latency:.3f}s")
+            self._publish(written)
+    
+    def _flush_batch(self, batch):
+        """Write one batch; returns (mutations still to be written, mutations written)"""
+        storage = self.manager.storage
+        remaining = dict(batch)
+        written = {}
+        
+        updates = {task_id: payload for task_id, (kind, payload) in batch.items() if kind == 'update'}
+        if updates:
+            requeued = False
+            for task_id, (outcome, result) in self._write_rows(storage.update_tasks, updates, dict).items():
+                if outcome == _REQUEUE:
+                    requeued = True
+                    continue
+                mutation = remaining.pop(task_id)
+                if outcome == _FAILED:
+                    self._dead_letter(task_id, mutation, result)
+                elif not result.get(task_id, False):
+                    self._dead_letter(task_id, mutation, UPDATE_NOT_WRITTEN)
+                else:
+                    written[task_id] = mutation
+            if requeued:
+                return remaining, written
+        
+        for task_id, (kind, payload) in batch.items():
+            if kind not in ('delete', 'replace'):
+                continue
+            outcome, result = self._call(storage.delete_task, self.worksheet_name, task_id)
+            if outcome == _REQUEUE:
+                return remaining, written
+            if outcome == _FAILED:
+                self._dead_letter(task_id, remaining.pop(task_id), result)
+            elif kind == 'delete':
+                del remaining[task_id]
+                if result:
+                    written[task_id] = ('delete', None)
+                else:
+                    logger.warning(f"Queued delete of task {task_id} found no row")
+            else:
+                remaining[task_id] = ('add', payload)
+        
+        adds = {task_id: payload for task_id, (kind, payload) in remaining.items() if kind == 'add'}
+        if adds:
+            for task_id, (outcome, result) in self._write_rows(storage.append_tasks, adds, _row_list).items():
+                if outcome == _REQUEUE:
+                    continue
+                mutation = remaining.pop(task_id)
+                if outcome == _FAILED:
+                    self._dead_letter(task_id, mutation, result)
+                else:
+                    written[task_id] = mutation
+        
+        return remaining, written
+    
+    def _publish(self, written):
+        """Send webhook events for mutations that are now durable in the backend"""
+        by_kind = {}
+        for task_id, (kind, payload) in written.items():
+            if isinstance(task_id, tuple):
+                task_id = payload.get('Task ID')
+            by_kind.setdefault(kind, {})[task_id] = payload
+        for kind, tasks in by_kind.items():
+            self.manager._notify(kind, tasks)
+    
+    def _write_rows(self, func, rows, pack):
+        """Write {task_id: payload} with one func(worksheet, pack(rows)) call; returns {task_id: (outcome, result)}
+        
+        If the whole batch is rejected with a non-retryable error, each row is
+        written on its own so one bad row does not take the others down with it.
+        """
+        outcome, result = self._call(func, self.worksheet_name, pack(rows))
+        if outcome != _FAILED or len(rows) == 1:
+            return {task_id: (outcome, result) for task_id in rows}
+        logger.warning(f"Batch of {len(rows)} queued write(s) rejected, writing them one by one: {str(result)}")
+        return {task_id: self._call(func, self.worksheet_name, pack({task_id: payload}))
+                for task_id, payload in rows.items()}
+    
+    def _call(self, func, *args):
+        """Run one write with retry/backoff; returns (outcome, func result or the last error)"""
+        for attempt in range(self.max_retries + 1):
+            try:
+                return _WRITTEN, func(*args)
+            except Exception as e:
+                if not _is_retryable(e):
+                    return _FAILED, e
+                if attempt == self.max_retries:
+                    logger.error(f"Write still failing after {self.max_retries} retries, re-queueing: {str(e)}")
+                    return _REQUEUE, e
+                delay = _backoff_delay(attempt, self.backoff_base, self.backoff_max)
+                with self._cond:
+                    self.retries += 1
+                logger.warning(f"Retrying queued write in {delay:.2f}s: {str(e)}")
+                time.sleep(delay)
+        return _REQUEUE, None
+    
+    def _dead_letter(self, task_id, mutation, error):
+        kind, payload = mutation
+        logger.error(f"Dropping queued {kind} of task {task_id}: {str(error)}")
+        with self._cond:
+            self.dropped += 1
+            self.dead_letters.append({
+                'task_id': None if isinstance(task_id, tuple) else task_id,
+                'kind': kind,
+                'data': payload,
+                'error': str(error),
+            })
+
+
+# Outcomes of one queued write attempt
+_WRITTEN, _REQUEUE, _FAILED = 'written', 'requeue', 'failed'
+
+
+def _row_list(rows):
+    return list(rows.values())
+
 # Utility functions for data validation
 def validate_task_data(task_data):
     """Validate task data before adding/updating"""
@@ -0,0 +1,116 @@
+import logging
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Columns offered as sidebar multiselect filters
+FILTER_COLUMNS = ['Executor', 'Priority', 'Status', 'Company']
+
+
+class FilterIndex:
+    """Bitmap indexes over the filter columns of one immutable task snapshot
+
+    For every column the distinct values are numbered (category codes) and
+    each value gets a packed bitmap of the rows holding it. A selection ORs the
+    bitmaps of the chosen values within a column and ANDs the result across
+    columns, so filtering never scans the values or copies the frame; only the
+    matching rows are materialized at the end.
+    """
+
+    def __init__(self, df, columns=FILTER_COLUMNS):
+        self.row_count = len(df)
+        self._options = {}
+        self._bitmaps = {}
+        for col in columns:
+            if col in df.columns:
+                self._index_column(col, df[col])
+
+    def _index_column(self, col, series):
+        if not isinstance(series.dtype, pd.CategoricalDtype):
+            series = series.astype('category')
+        codes = series.cat.codes.to_numpy()
+        categories = series.cat.categories
+
+        # Group row positions by code once; each value's rows are one contiguous slice
+        order = np.argsort(codes, kind='stable')
+        bounds = np.searchsorted(codes[order], np.arange(len(categories) + 1))
+        bitmaps = {}
+        for i, value in enumerate(categories):
+            rows = order[bounds[i]:bounds[i + 1]]
+            if not len(rows):
+                continue  # Category with no rows in this snapshot
+            mask = np.zeros(self.row_count, dtype=bool)
+            mask[rows] = True
+            bitmaps[value] = np.packbits(mask)
+        self._bitmaps[col] = bitmaps
+        self._options[col] = list(bitmaps)
+
+    def options(self, col):
+        """Distinct values present in a column, for a multiselect's options"""
+        return self._options.get(col, [])
+
+    def select(self, selections):
+        """Row positions matching every non-empty (column, values) selection, or None for 'all rows'"""
+        combined = None
+        for col, values in selections:
+            if not values:
+                continue
+            bitmaps = self._bitmaps.get(col, {})
+            column_bits = np.zeros((self.row_count + 7) // 8, dtype=np.uint8)
+            for value in values:
+                bits = bitmaps.get(value)
+                if bits is not None:
+                    np.bitwise_or(column_bits, bits, out=column_bits)
+            combined = column_bits if combined is None else np.bitwise_and(combined, column_bits, out=combined)
+        if combined is None:
+            return None
+        return np.flatnonzero(np.unpackbits(combined, count=self.row_count))
+
+    def apply(self, df, selections):
+        """The rows of `df` matching `selections`; `df` itself when nothing is selected"""
+        positions = self.select(selections)
+        if positions is None:
+            return df
+        return df.iloc[positions]
+
+
+class FilterEngine:
+    """Keeps one FilterIndex per data version (small LRU) and answers sidebar filter queries
+
+    `selections` is a hashable tuple of (column, tuple of values) pairs — the
+    same filter key the analytics memo uses.
+    """
+
+    def __init__(self, columns=FILTER_COLUMNS, max_versions=2):
+        self.columns = columns
+        self.max_versions = max_versions
+        self._indexes = OrderedDict()
+        self._lock = threading.Lock()
+
+    def index(self, df, data_version):
+        """FilterIndex for a snapshot, built on first use of its data version"""
+        with self._lock:
+            if data_version in self._indexes:
+                self._indexes.move_to_end(data_version)
+                return self._indexes[data_version]
+
+        index = FilterIndex(df, self.columns)
+        logger.info(f"Built filter index for {data_version[:12]} ({len(df)} rows)")
+        with self._lock:
+            self._indexes[data_version] = index
+            self._indexes.move_to_end(data_version)
+            while len(self._indexes) > self.max_versions:
+                self._indexes.popitem(last=False)
+        return index
+
+    def options(self, df, data_version, col):
+        """Cached option list for one filter column"""
+        return self.index(df, data_version).options(col)
+
+    def apply(self, df, data_version, selections):
+        """Filtered view of a snapshot; the snapshot itself when no filter is active"""
+        return self.index(df, data_version).apply(df, selections)
@@ -0,0 +1,171 @@
+import logging
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+@dataclass
+class RequestMetric:
+    """Timing and size of one HTTP request"""
+    url: str
+    status: int
+    attempts: int
+    wait_seconds: float  # Until response headers arrived
+    total_seconds: float  # Including reading (and parsing) the body
+    bytes_read: int
+
+
+class _CountingReader:
+    """File-like wrapper over a streamed response body that counts the bytes handed to the parser"""
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        chunk = self.raw.read(size if size is not None and size >= 0 else None)
+        self.bytes_read += len(chunk)
+        return chunk
+
+
+class HttpTransport:
+    """One pooled, keep-alive HTTP client shared by everything that downloads sheet exports
+
+    Requests get separate connect/read timeouts, ask for gzip, and are
+    retried with jittered exponential backoff on connection errors, timeouts
+    and 429/5xx responses. `read_csv` streams the (decompressed) body
+    straight into the CSV parser instead of buffering it first. Every
+    request is recorded for `stats()`.
+    """
+
+    def __init__(self, connect_timeout=5, read_timeout=30, max_retries=3,
+                 backoff_base=0.5, backoff_max=10.0, pool_size=10, history=200):
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers["Accept-Encoding"] = "gzip, deflate"
+        self._history = deque(maxlen=history)
+        self._totals = {"requests": 0, "failures": 0, "retries": 0, "bytes": 0}
+        self._lock = threading.Lock()
+
+    def get(self, url, headers=None, stream=False):
+        """GET with retries; returns the final response (non-retryable statuses are not raised)"""
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                response = self.session.get(url, headers=headers, timeout=self.timeout, stream=stream)
+                if response.status_code not in RETRYABLE_STATUS or attempt > self.max_retries:
+                    response.attempts = attempt
+                    response.started = started
+                    if not stream:
+                        self._record(url, response, len(response.content), started)
+                    elif response.status_code != 200:
+                        self._record(url, response, 0, started)  # No body will be parsed
+                    return response
+                error = f"HTTP {response.status_code}"
+                self.release(response)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                if attempt > self.max_retries:
+                    self._record_failure(url, attempt, started)
+                    raise
+                error = str(e)
+            delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** (attempt - 1))))
+            logger.warning(f"GET {url} failed ({error}), retry {attempt}/{self.max_retries} in {delay:.2f}s")
+            with self._lock:
+                self._totals["retries"] += 1
+            time.sleep(delay)
+
+    def read_csv(self, url, headers=None, **read_csv_options):
+        """Download a CSV and parse it as it streams in (raises on HTTP errors)"""
+        response = self.get(url, headers=headers, stream=True)
+        if response.status_code >= 400:
+            self.release(response)
+        response.raise_for_status()
+        return self.parse_csv(response, **read_csv_options)
+
+    def parse_csv(self, response, **read_csv_options):
+        """Parse a streamed response body as CSV, recording its size and total time"""
+        reader = _CountingReader(response.raw)
+        response.raw.decode_content = True  # Undo gzip/deflate transparently
+        try:
+            df = pd.read_csv(reader, **read_csv_options)
+            response.raw.read()  # Reach the end of the body so the connection goes back to the pool
+            response.raw.release_conn()
+        except Exception:
+            response.close()
+            raise
+        finally:
+            self._record(response.url, response, reader.bytes_read, getattr(response, "started", time.monotonic()))
+        df.columns = df.columns.str.strip()
+        return df
+
+    def release(self, response):
+        """Discard an unread response body, returning its connection to the pool"""
+        try:
+            response.content
+        except Exception:
+            response.close()
+
+    def stats(self):
+        """Request totals plus latency percentiles over the recent history"""
+        with self._lock:
+            history = list(self._history)
+            totals = dict(self._totals)
+        waits = pd.Series([m.wait_seconds for m in history], dtype=float)
+        totals.update({
+            "p50_seconds": float(waits.quantile(0.5)) if len(waits) else None,
+            "p95_seconds": float(waits.quantile(0.95)) if len(waits) else None,
+            "last": history[-1] if history else None,
+        })
+        return totals
+
+    def close(self):
+        """Close pooled connections"""
+        self.session.close()
+
+    def _record(self, url, response, bytes_read, started):
+        metric = RequestMetric(url, response.status_code, getattr(response, "attempts", 1),
+                               response.elapsed.total_seconds(), time.monotonic() - started, bytes_read)
+        with self._lock:
+            self._history.append(metric)
+            self._totals["requests"] += 1
+            self._totals["bytes"] += bytes_read
+            if response.status_code >= 400:
+                self._totals["failures"] += 1
+
+    def _record_failure(self, url, attempts, started):
+        metric = RequestMetric(url, 0, attempts, 0.0, time.monotonic() - started, 0)
+        with self._lock:
+            self._history.append(metric)
+            self._totals["requests"] += 1
+            self._totals["failures"] += 1
+
+
+_shared_transport = None
+_shared_lock = threading.Lock()
+
+
+def shared_transport():
+    """Process-wide HttpTransport, created on first use"""
+    global _shared_transport
+    with _shared_lock:
+        if _shared_transport is None:
+            _shared_transport = HttpTransport()
+        return _shared_transport
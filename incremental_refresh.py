@@ -0,0 +1,175 @@
+import hashlib
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+from http_transport import shared_transport
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RefreshResult:
+    """Outcome of one incremental refresh"""
+    df: pd.DataFrame
+    changed: bool
+    downloaded: bool
+    added: list = field(default_factory=list)
+    updated: list = field(default_factory=list)
+    removed: list = field(default_factory=list)
+    seconds: float = 0.0
+
+
+class IncrementalTaskLoader:
+    """Keeps a cached task DataFrame in step with a CSV export URL without re-pulling unchanged data
+
+    Each refresh first checks a cheap change signal, in order of preference:
+      1. `change_token()` — any callable returning a revision marker, e.g. the
+         Drive modifiedTime of the spreadsheet (None means "not available");
+      2. an HTTP conditional GET using the ETag / Last-Modified validators the
+         server returned last time;
+      3. a hash of the body of `probe_url`, a small range of the sheet.
+    Only when the signal moved is the full CSV downloaded, as text (typing
+    is left to apply_task_schema). Rows are then diffed by content hash per
+    `key_column`, and only added/changed/removed rows are applied to the
+    cached frame, so downstream consumers can work from the reported delta
+    instead of the whole sheet.
+    """
+
+    def __init__(self, url, key_column="Task ID", probe_url=None, change_token=None,
+                 transport=None):
+        self.url = url
+        self.key_column = key_column
+        self.probe_url = probe_url
+        self.change_token = change_token
+        self.transport = transport or shared_transport()
+
+        self.df = None
+        self._row_hashes = None
+        self._etag = None
+        self._last_modified = None
+        self._probe_hash = None
+        self._token = None
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        """Bring the cached frame up to date and return a RefreshResult"""
+        with self._lock:
+            return self._refresh()
+
+    def _refresh(self):
+        started = time.monotonic()
+        # Always sample the signal so the first download also records a baseline
+        changed, marker = self._has_changed()
+        if self.df is not None and not changed:
+            return RefreshResult(self.df, changed=False, downloaded=False,
+                                 seconds=time.monotonic() - started)
+
+        response = self.transport.get(self.url, headers=self._validators(), stream=True)
+        if response.status_code == 304 and self.df is not None:
+            self.transport.release(response)
+            self._commit_marker(marker)
+            return RefreshResult(self.df, changed=False, downloaded=False,
+                                 seconds=time.monotonic() - started)
+        if response.status_code >= 400:
+            self.transport.release(response)
+        response.raise_for_status()
+        self._etag = response.headers.get("ETag")
+        self._last_modified = response.headers.get("Last-Modified")
+
+        # All text, like the sheet itself: guessed types would change with single cells
+        # ('3' -> '3 times', one cleared int) and break both the merge and the row hashes
+        fresh = self.transport.parse_csv(response, dtype=str, keep_default_na=False)
+        result = self._merge(fresh)
+        # Only now is the cached frame as new as the signal; a failed download must not mark it seen
+        self._commit_marker(marker)
+        result.seconds = time.monotonic() - started
+        logger.info(
+            f"Incremental refresh: {len(result.added)} added, {len(result.updated)} updated, "
+            f"{len(result.removed)} removed in {result.seconds:.3f}s"
+        )
+        return result
+
+    def _validators(self):
+        headers = {}
+        if self.df is not None:
+            if self._etag:
+                headers["If-None-Match"] = self._etag
+            if self._last_modified:
+                headers["If-Modified-Since"] = self._last_modified
+        return headers
+
+    def _has_changed(self):
+        """Check the cheapest available change signal
+
+        Returns (changed, marker): `changed` is True when a download is needed
+        and `marker` is the signal value to record once the cached frame has
+        caught up with it (see `_commit_marker`).
+        """
+        try:
+            token = self.change_token() if self.change_token is not None else None
+            if token is not None:
+                return token != self._token, ('token', token)
+
+            if self.probe_url:
+                response = self.transport.get(self.probe_url)
+                response.raise_for_status()
+                probe_hash = hashlib.sha1(response.content).hexdigest()
+                return probe_hash != self._probe_hash, ('probe', probe_hash)
+
+        except Exception as e:
+            logger.warning(f"Change check failed, doing a full refresh: {str(e)}")
+        # No cheap signal (or it failed): fall through to a conditional GET
+        return True, None
+
+    def _commit_marker(self, marker):
+        if marker is None:
+            return
+        kind, value = marker
+        if kind == 'token':
+            self._token = value
+        else:
+            self._probe_hash = value
+
+    def _merge(self, fresh):
+        """Apply the row-level delta between the cached frame and a fresh download"""
+        if self.key_column not in fresh.columns or fresh[self.key_column].duplicated().any():
+            # Without a unique key there is nothing to diff against; take the new frame as-is
+            self.df = fresh
+            self._row_hashes = None
+            return RefreshResult(fresh, changed=True, downloaded=True)
+
+        keys = fresh[self.key_column].astype(str)
+        hashes = pd.Series(pd.util.hash_pandas_object(fresh, index=False).values, index=keys.values)
+
+        if (self.df is None or self._row_hashes is None
+                or list(self.df.columns) != list(fresh.columns)):
+            self.df = fresh.reset_index(drop=True)
+            self._row_hashes = hashes
+            return RefreshResult(self.df, changed=True, downloaded=True, added=list(keys))
+
+        old_hashes = self._row_hashes
+        added = hashes.index.difference(old_hashes.index)
+        removed = old_hashes.index.difference(hashes.index)
+        common = hashes.index.intersection(old_hashes.index)
+        updated = common[hashes.loc[common].values != old_hashes.loc[common].values]
+
+        if not len(added) and not len(removed) and not len(updated):
+            return RefreshResult(self.df, changed=False, downloaded=True)
+
+        cached = self.df.set_index(self.df[self.key_column].astype(str))
+        incoming = fresh.set_index(keys)
+        if len(removed):
+            cached = cached.drop(index=removed)
+        if len(updated):
+            cached.loc[updated] = incoming.loc[updated]
+        if len(added):
+            cached = pd.concat([cached, incoming.loc[added]])
+        # Follow the sheet's row order
+        self.df = cached.reindex(keys.values).reset_index(drop=True)
+        self._row_hashes = hashes
+        return RefreshResult(self.df, changed=True, downloaded=True,
+                             added=list(added), updated=list(updated), removed=list(removed))
@@ -0,0 +1,363 @@
+import json
+import logging
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from data_manager import UPDATE_NOT_WRITTEN, format_task_data, validate_task_data
+from task_schema import DEFAULT_TASK_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+# Receipt states
+QUEUED = "queued"
+WRITTEN = "written"
+SKIPPED = "skipped"  # Create for a Task ID that already exists
+FAILED = "failed"
+
+MAX_BODY_BYTES = 1 << 20
+
+
+class CommandRejected(ValueError):
+    """A command that failed validation; answered with 422"""
+
+
+class BodyTooLarge(Exception):
+    """A request body over MAX_BODY_BYTES; answered with 413"""
+
+
+def parse_command(command):
+    """Validate and normalize one create/update command into (action, task_id, data)"""
+    if not isinstance(command, dict):
+        raise CommandRejected("Command must be a JSON object")
+    action = command.get('action', 'create')
+    if action == 'create':
+        task = command.get('task')
+        if not isinstance(task, dict):
+            raise CommandRejected("Create command needs a 'task' object")
+        valid, message = validate_task_data(task)
+        if not valid:
+            raise CommandRejected(message)
+        record = format_task_data(task)
+        return action, str(record['Task ID']), record
+    if action == 'update':
+        task_id = command.get('task_id')
+        changes = command.get('changes')
+        if not task_id:
+            raise CommandRejected("Update command needs a 'task_id'")
+        if not isinstance(changes, dict) or not changes:
+            raise CommandRejected("Update command needs a non-empty 'changes' object")
+        if 'Task ID' in changes and str(changes['Task ID']) != str(task_id):
+            raise CommandRejected("Task ID cannot be changed")
+        unknown = [str(col) for col in changes if col not in DEFAULT_TASK_COLUMNS]
+        if unknown:
+            raise CommandRejected(f"Unknown column(s): {', '.join(unknown)}")
+        return action, str(task_id), format_task_data(changes)
+    raise CommandRejected(f"Unknown action: {action}")
+
+
+class IngestionService:
+    """Accepts task commands and writes them to the sheet in micro-batches
+
+    `submit()` validates a command, queues it and returns a receipt ID at
+    once. A background thread waits up to `batch_window` seconds for more
+    commands (or until `max_batch` are queued) and then writes the batch:
+    creates go through one `add_tasks` call, and updates are merged per Task ID
+    into one `bulk_update_tasks` call. Receipt states can be looked up with
+    `receipt()`; the most recent `max_receipts` are kept.
+    """
+
+    def __init__(self, manager, worksheet_name="Tasks", batch_window=0.05, max_batch=500,
+                 max_queue=10000, max_receipts=100000):
+        self.manager = manager
+        self.worksheet_name = worksheet_name
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.max_receipts = max_receipts
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._receipts = OrderedDict()
+        self._lock = threading.Lock()
+        self._admit_lock = threading.Lock()  # Serializes puts so a list's room check holds until it is queued
+        self._stopped = threading.Event()
+
+        self.accepted = 0
+        self.batches = 0
+        self.last_batch_size = 0
+        self.last_batch_seconds = 0.0
+
+        self._thread = threading.Thread(target=self._run, name="ingestion-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, command):
+        """Validate and queue one command; returns its receipt ID
+
+        Raises CommandRejected for invalid commands and queue.Full when the
+        service is saturated.
+        """
+        action, task_id, data = parse_command(command)
+        with self._admit_lock:
+            if self._queue.full():
+                raise queue.Full
+            return self._enqueue(action, task_id, data)
+
+    def submit_many(self, commands):
+        """Validate a list of commands and queue all the valid ones, or none of them
+
+        Returns (receipt IDs, errors): receipt IDs line up with `commands`
+        (None where a command was rejected) and errors are {'index', 'error'}
+        entries. Raises queue.Full, with nothing queued, when the valid
+        commands do not all fit.
+        """
+        parsed, errors = [], []
+        for position, command in enumerate(commands):
+            try:
+                parsed.append(parse_command(command))
+            except CommandRejected as e:
+                parsed.append(None)
+                errors.append({'index': position, 'error': str(e)})
+        wanted = sum(entry is not None for entry in parsed)
+        with self._admit_lock:
+            # Only admissions add to the queue, so the room seen here cannot shrink before the puts
+            if self._queue.maxsize > 0 and self._queue.maxsize - self._queue.qsize() < wanted:
+                raise queue.Full
+            receipts = [self._enqueue(*entry) if entry is not None else None for entry in parsed]
+        return receipts, errors
+
+    def receipt(self, receipt_id):
+        """State of a receipt, or None if it is unknown or expired"""
+        with self._lock:
+            entry = self._receipts.get(receipt_id)
+            return dict(entry) if entry is not None else None
+
+    def stats(self):
+        with self._lock:
+            return {
+                'queue_depth': self._queue.qsize(),
+                'accepted': self.accepted,
+                'batches': self.batches,
+                'last_batch_size': self.last_batch_size,
+                'last_batch_seconds': self.last_batch_seconds,
+            }
+
+    def flush(self, timeout=30):
+        """Wait until every queued command has been written; returns True if it drained"""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if time.monotonic() >= deadline or not self._thread.is_alive():
+                return False
+            time.sleep(0.01)
+        return True
+
+    def close(self, timeout=30):
+        drained = self.flush(timeout)
+        self._stopped.set()
+        self._thread.join(timeout)
+        return drained
+
+    def _enqueue(self, action, task_id, data):
+        """Queue one parsed command; the caller holds _admit_lock and has checked for room"""
+        receipt_id = uuid.uuid4().hex
+        self._set_receipt(receipt_id, {'status': QUEUED, 'action': action, 'task_id': task_id})
+        self._queue.put_nowait((receipt_id, action, task_id, data))
+        with self._lock:
+            self.accepted += 1
+        return receipt_id
+
+    def _set_receipt(self, receipt_id, entry):
+        with self._lock:
+            self._receipts[receipt_id] = entry
+            while len(self._receipts) > self.max_receipts:
+                self._receipts.popitem(last=False)
+
+    def _finish(self, receipt_id, status, error=None):
+        with self._lock:
+            entry = self._receipts.get(receipt_id)
+            if entry is not None:
+                entry['status'] = status
+                if error:
+                    entry['error'] = error
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                first = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            batch = [first]
+            deadline = time.monotonic() + self.batch_window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            started = time.monotonic()
+            try:
+                self._write(batch)
+            except Exception as e:
+                logger.error(f"Failed to write ingestion batch: {str(e)}")
+                for receipt_id, *_ in batch:
+                    self._finish(receipt_id, FAILED, str(e))
+            finally:
+                with self._lock:
+                    self.batches += 1
+                    self.last_batch_size = len(batch)
+                    self.last_batch_seconds = time.monotonic() - started
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write(self, batch):
+        creates = [(receipt_id, data) for receipt_id, action, _, data in batch if action == 'create']
+        updates = {}  # task_id -> merged changes, in arrival order
+        update_receipts = {}
+        for receipt_id, action, task_id, data in batch:
+            if action == 'update':
+                updates.setdefault(task_id, {}).update(data)
+                update_receipts.setdefault(task_id, []).append(receipt_id)
+
+        if creates:
+            report = self.manager.add_tasks([data for _, data in creates], self.worksheet_name)
+            added, skipped = set(report['added']), set(report['skipped'])
+            failed = {entry['row']: entry['error'] for entry in report['failed']}
+            for position, (receipt_id, data) in enumerate(creates):
+                task_id = str(data['Task ID'])
+                if position in failed:
+                    self._finish(receipt_id, FAILED, failed[position])
+                elif task_id in added:
+                    self._finish(receipt_id, WRITTEN)
+                    added.discard(task_id)  # Repeats of the ID later in the batch were skipped
+                elif task_id in skipped:
+                    self._finish(receipt_id, SKIPPED, "Task ID already exists")
+                else:
+                    self._finish(receipt_id, FAILED, "Not written")
+
+        if updates:
+            results = self.manager.bulk_update_tasks(updates, self.worksheet_name)
+            for task_id, receipt_ids in update_receipts.items():
+                ok = results.get(task_id, False)
+                for receipt_id in receipt_ids:
+                    self._finish(receipt_id, WRITTEN if ok else FAILED, None if ok else UPDATE_NOT_WRITTEN)
+
+
+class IngestionApp:
+    """Minimal ASGI app in front of an IngestionService
+
+    Routes:
+      POST /tasks             one command or a list of commands -> 202 with receipt IDs
+                              (a list is queued whole or not at all: 503 when it does not fit)
+      GET  /receipts/{id}     receipt state
+      GET  /health            service counters
+
+    A command is {"action": "create", "task": {...}} or
+    {"action": "update", "task_id": "...", "changes": {...}}.
+    """
+
+    def __init__(self, service):
+        self.service = service
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            return
+        method, path = scope['method'], scope['path'].rstrip('/')
+        if method == 'POST' and path == '/tasks':
+            status, body = await self._post_tasks(receive)
+        elif method == 'GET' and path.startswith('/receipts/'):
+            entry = self.service.receipt(path[len('/receipts/'):])
+            status, body = (200, entry) if entry is not None else (404, {'error': 'Unknown receipt'})
+        elif method == 'GET' and path == '/health':
+            status, body = 200, {'status': 'ok', **self.service.stats()}
+        else:
+            status, body = 404, {'error': 'Not found'}
+        await _respond(send, status, body)
+
+    async def _post_tasks(self, receive):
+        try:
+            payload = json.loads(await _read_body(receive))
+        except BodyTooLarge as e:
+            return 413, {'error': str(e)}
+        except ValueError as e:
+            return 400, {'error': f"Invalid JSON: {str(e)}"}
+        commands = payload if isinstance(payload, list) else [payload]
+        try:
+            receipts, errors = self.service.submit_many(commands)
+        except queue.Full:
+            return 503, {'error': 'Ingestion queue is full, nothing was queued, retry later'}
+        if not any(receipts):
+            return 422, {'errors': errors}
+        body = {'receipt_ids': receipts, 'errors': errors}
+        if not isinstance(payload, list):
+            body = {'receipt_id': receipts[0]}
+        return 202, body
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.service.close()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+
+async def _read_body(receive):
+    chunks, size = [], 0
+    while True:
+        message = await receive()
+        chunk = message.get('body', b'')
+        size += len(chunk)
+        if size > MAX_BODY_BYTES:
+            raise BodyTooLarge(f"Request body over {MAX_BODY_BYTES} bytes")
+        chunks.append(chunk)
+        if not message.get('more_body'):
+            return b''.join(chunks)
+
+
+async def _respond(send, status, body):
+    data = json.dumps(body, default=str).encode('utf-8')
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', b'application/json'), (b'content-length', str(len(data)).encode())],
+    })
+    await send({'type': 'http.response.body', 'body': data})
+
+
+def create_app(manager, **service_options):
+    """ASGI app that writes task commands through an EnhancedDataManager"""
+    return IngestionApp(IngestionService(manager, **service_options))
+
+
+if __name__ == '__main__':
+    import argparse
+
+    import uvicorn
+
+    from data_manager import EnhancedDataManager
+    from storage_backends import SQLiteBackend
+
+    parser = argparse.ArgumentParser(description="Task command ingestion API")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8502)
+    parser.add_argument('--service-account', help="Service account JSON file for Google Sheets")
+    parser.add_argument('--sqlite', help="Write to a local SQLite file instead of Google Sheets")
+    args = parser.parse_args()
+    if not args.sqlite and not args.service_account:
+        parser.error("either --service-account or --sqlite is required")
+
+    logging.basicConfig(level=logging.INFO)
+    if args.sqlite:
+        data_manager = EnhancedDataManager(storage=SQLiteBackend(args.sqlite))
+    else:
+        data_manager = EnhancedDataManager()
+        with open(args.service_account, encoding='utf-8') as f:
+            data_manager.setup_gspread_client(json.load(f))
+    uvicorn.run(create_app(data_manager), host=args.host, port=args.port)
@@ -0,0 +1,311 @@
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from types import MappingProxyType
+
+import numpy as np
+import pandas as pd
+
+from task_schema import add_task_flags, frame_version
+
+logger = logging.getLogger(__name__)
+
+# Natural key of each entity (Tasks depends on its layout, see TASK_LAYOUTS)
+PRIMARY_KEYS = {
+    'Projects': 'Project Name',
+    'Tasks': 'Task Name',
+    'Clients': 'Client Name',
+    'Teams': 'Team Member Name',
+}
+
+# Tasks come in two layouts: the local tasks.csv and the Tasks worksheet
+# (DEFAULT_TASK_COLUMNS). Each maps the roles the model needs to its own
+# columns; the worksheet has no project column, so its tasks only link to
+# team members (through Executor) and never count as dangling project refs.
+TASK_LAYOUTS = {
+    'csv': {'key': 'Task Name', 'project': 'Project Name', 'assignee': 'Assigned To', 'due': 'Due Date'},
+    'sheet': {'key': 'Task ID', 'project': None, 'assignee': 'Executor', 'due': 'Date'},
+}
+
+
+@dataclass(frozen=True)
+class Relation:
+    """A foreign key: `entity.column` refers to the primary key of `target`"""
+    entity: str
+    column: str
+    target: str
+
+
+RELATIONS = [
+    Relation('Tasks', 'Project Name', 'Projects'),
+    Relation('Tasks', 'Assigned To', 'Teams'),
+    Relation('Projects', 'Client Name', 'Clients'),
+    Relation('Projects', 'Assigned To', 'Teams'),
+]
+
+
+def task_layout(tasks):
+    """Name of the TASK_LAYOUTS entry a Tasks frame follows ('sheet' when it has a Task ID column)"""
+    return 'sheet' if 'Task ID' in tasks.columns else 'csv'
+
+
+def layout_relations(layout):
+    """Primary keys and relations with the Tasks columns of one layout"""
+    columns = TASK_LAYOUTS[layout]
+    keys = {**PRIMARY_KEYS, 'Tasks': columns['key']}
+    relations = []
+    for relation in RELATIONS:
+        if relation.entity != 'Tasks':
+            relations.append(relation)
+            continue
+        role = 'project' if relation.target == 'Projects' else 'assignee'
+        if columns[role] is not None:
+            relations.append(Relation('Tasks', columns[role], relation.target))
+    return keys, relations
+
+
+class RelationalModel:
+    """Key indexes, join views and rollups across Projects, Tasks, Clients and Teams
+
+    Everything is built once from one set of entity frames (as returned by
+    EntityLoader.load_all) and is read-only afterwards. Tasks columns are
+    looked up through the layout of the Tasks frame (see TASK_LAYOUTS):
+      - `positions(entity, key)`: row position of a key, a dict lookup;
+      - `task_view`: tasks with their project and client columns attached;
+      - `workload`: one row per team member with task and project counts;
+      - `project(name)`, `member(name)`, `client(name)`: rollups as mappings;
+      - `violations`: referential-integrity problems found while building.
+    """
+
+    def __init__(self, frames, version=None):
+        self.frames = {name: frames.get(name, pd.DataFrame()) for name in PRIMARY_KEYS}
+        self.version = version or model_version(self.frames)
+        self.layout = task_layout(self.frames['Tasks'])
+        self.task_columns = TASK_LAYOUTS[self.layout]
+        self.primary_keys, self.relations = layout_relations(self.layout)
+        self._keys = {}
+        problems = []
+        for entity, key in self.primary_keys.items():
+            self._keys[entity] = self._index_keys(entity, key, problems)
+        self._refs = {}
+        for relation in self.relations:
+            self._refs[(relation.entity, relation.column)] = self._resolve(relation, problems)
+        self.violations = pd.DataFrame(problems, columns=['Entity', 'Row', 'Column', 'Value', 'Problem'])
+
+        self.task_view = self._build_task_view()
+        self._projects = self._project_rollups()
+        self._members = self._member_rollups()
+        self._clients = self._client_rollups()
+        self.workload = pd.DataFrame.from_dict(
+            {name: dict(rollup) for name, rollup in self._members.items()}, orient='index'
+        ).rename_axis('Team Member Name')
+        if not self.violations.empty:
+            logger.warning(f"{len(self.violations)} referential-integrity problems in model {self.version[:12]}")
+
+    def positions(self, entity, key):
+        """Row position of `key` in an entity frame, or None if there is no such row"""
+        return self._keys[entity].get(key)
+
+    def row(self, entity, key):
+        """The row for a key as a Series, or None"""
+        position = self.positions(entity, key)
+        return None if position is None else self.frames[entity].iloc[position]
+
+    def project(self, name):
+        """Rollup for one project, or None"""
+        return self._projects.get(name)
+
+    def member(self, name):
+        """Workload rollup for one team member, or None"""
+        return self._members.get(name)
+
+    def client(self, name):
+        """Rollup for one client, or None"""
+        return self._clients.get(name)
+
+    def integrity_report(self):
+        """Violation counts per entity, column and problem"""
+        if self.violations.empty:
+            return pd.DataFrame(columns=['Entity', 'Column', 'Problem', 'Count'])
+        return (self.violations.groupby(['Entity', 'Column', 'Problem'], observed=True)
+                .size().reset_index(name='Count'))
+
+    def _index_keys(self, entity, key, problems):
+        """Map each key value to its first row position, recording missing and duplicate keys"""
+        df = self.frames[entity]
+        if key not in df.columns:
+            return {}
+        values = df[key].astype(object).to_numpy()
+        index = {}
+        for position, value in enumerate(values):
+            if pd.isna(value) or value == '':
+                problems.append((entity, position, key, None, 'missing key'))
+            elif value in index:
+                problems.append((entity, position, key, value, 'duplicate key'))
+            else:
+                index[value] = position
+        return index
+
+    def _resolve(self, relation, problems):
+        """Target row position for every source row (-1 where the reference is empty or dangling)"""
+        source = self.frames[relation.entity]
+        if relation.column not in source.columns:
+            return np.full(len(source), -1)
+        keys = self._keys[relation.target]
+        values = source[relation.column].astype(object).to_numpy()
+        targets = np.fromiter((keys.get(value, -1) for value in values), dtype=np.int64, count=len(values))
+        for position in np.flatnonzero(targets < 0):
+            value = values[position]
+            if not (pd.isna(value) or value == ''):
+                problems.append((relation.entity, int(position), relation.column, value,
+                                 f"no matching row in {relation.target}"))
+        return targets
+
+    def _task_refs(self, role):
+        """Resolved target positions of a Tasks role column (all -1 when the layout lacks it)"""
+        column = self.task_columns[role]
+        if column is None:
+            return np.full(len(self.frames['Tasks']), -1)
+        return self._refs[('Tasks', column)]
+
+    def _attach(self, df, positions, target, prefix):
+        """Columns of `target` aligned to `df` by row positions (-1 gives missing values)"""
+        attached = self.frames[target].reset_index(drop=True).reindex(positions)
+        attached.columns = [f"{prefix}{col}" for col in attached.columns]
+        attached.index = df.index
+        return attached
+
+    def _build_task_view(self):
+        """Denormalized task -> project -> client frame"""
+        tasks = self.frames['Tasks']
+        project_positions = self._task_refs('project')
+        client_of_project = self._refs[('Projects', 'Client Name')]
+        client_positions = np.full(len(tasks), -1)
+        has_project = project_positions >= 0
+        if len(client_of_project):
+            client_positions[has_project] = client_of_project[project_positions[has_project]]
+        projects = self._attach(tasks, project_positions, 'Projects', 'Project ')
+        clients = self._attach(tasks, client_positions, 'Clients', 'Client ')
+        projects = projects.drop(columns=['Project Project Name'], errors='ignore')
+        clients = clients.drop(columns=['Client Client Name'], errors='ignore')
+        return pd.concat([tasks, projects, clients], axis=1)
+
+    def _task_done(self):
+        return add_task_flags(self.frames['Tasks'])['is_completed'].to_numpy(dtype=bool)
+
+    def _project_rollups(self):
+        projects = self.frames['Projects']
+        tasks = self.frames['Tasks']
+        done = self._task_done()
+        positions = self._task_refs('project')
+        counts = np.bincount(positions[positions >= 0], minlength=len(projects))
+        completed = np.bincount(positions[positions >= 0], weights=done[positions >= 0], minlength=len(projects))
+        assignees = {}
+        assignee = self.task_columns['assignee']
+        if assignee in tasks.columns:
+            for position, member in zip(positions, tasks[assignee].astype(object)):
+                if position >= 0 and not pd.isna(member):
+                    assignees.setdefault(position, set()).add(member)
+
+        rollups = {}
+        for name, position in self._keys['Projects'].items():
+            row = projects.iloc[position]
+            rollups[name] = MappingProxyType({
+                'client': row.get('Client Name'),
+                'owner': row.get('Assigned To'),
+                'status': row.get('Status'),
+                'tasks': int(counts[position]),
+                'completed_tasks': int(completed[position]),
+                'open_tasks': int(counts[position] - completed[position]),
+                'assignees': tuple(sorted(assignees.get(position, ()))),
+            })
+        return MappingProxyType(rollups)
+
+    def _member_rollups(self):
+        teams = self.frames['Teams']
+        tasks = self.frames['Tasks']
+        done = self._task_done()
+        task_members = self._task_refs('assignee')
+        project_members = self._refs[('Projects', 'Assigned To')]
+        size = len(teams)
+        task_counts = np.bincount(task_members[task_members >= 0], minlength=size)
+        completed = np.bincount(task_members[task_members >= 0], weights=done[task_members >= 0], minlength=size)
+        projects_led = np.bincount(project_members[project_members >= 0], minlength=size)
+
+        next_due = {}
+        due_column = self.task_columns['due']
+        if due_column in tasks.columns:
+            due = pd.to_datetime(tasks[due_column], errors='coerce')
+            for member, is_done, date in zip(task_members, done, due):
+                if member >= 0 and not is_done and not pd.isna(date):
+                    if member not in next_due or date < next_due[member]:
+                        next_due[member] = date
+
+        rollups = {}
+        for name, position in self._keys['Teams'].items():
+            row = teams.iloc[position]
+            rollups[name] = MappingProxyType({
+                'role': row.get('Role'),
+                'department': row.get('Department'),
+                'tasks': int(task_counts[position]),
+                'completed_tasks': int(completed[position]),
+                'open_tasks': int(task_counts[position] - completed[position]),
+                'projects_led': int(projects_led[position]),
+                'next_due': next_due.get(position),
+            })
+        return MappingProxyType(rollups)
+
+    def _client_rollups(self):
+        projects = self.frames['Projects']
+        project_clients = self._refs[('Projects', 'Client Name')]
+        rollups = {}
+        by_client = {}
+        for project_position, client_position in enumerate(project_clients):
+            if client_position >= 0:
+                by_client.setdefault(client_position, []).append(project_position)
+        names = projects['Project Name'].tolist() if 'Project Name' in projects.columns else []
+        for name, position in self._keys['Clients'].items():
+            project_names = [names[p] for p in by_client.get(position, [])]
+            rollups[name] = MappingProxyType({
+                'projects': tuple(project_names),
+                'tasks': sum(self._projects[p]['tasks'] for p in project_names if p in self._projects),
+                'open_tasks': sum(self._projects[p]['open_tasks'] for p in project_names if p in self._projects),
+            })
+        return MappingProxyType(rollups)
+
+
+def model_version(frames):
+    """Combined content hash of the entity frames a model is built from"""
+    digest = hashlib.sha1()
+    for name in PRIMARY_KEYS:
+        df = frames.get(name)
+        digest.update(name.encode('utf-8'))
+        digest.update(frame_version(df).encode('utf-8') if df is not None else b'-')
+    return digest.hexdigest()
+
+
+class RelationIndex:
+    """Keeps the RelationalModel of the most recent data versions (small LRU)"""
+
+    def __init__(self, max_versions=2):
+        self.max_versions = max_versions
+        self._models = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, frames, data_version=None):
+        """Model for a set of entity frames, built only on the first request for its data version"""
+        version = data_version or model_version(frames)
+        with self._lock:
+            if version in self._models:
+                self._models.move_to_end(version)
+                return self._models[version]
+
+        model = RelationalModel(frames, version)
+        with self._lock:
+            self._models[version] = model
+            self._models.move_to_end(version)
+            while len(self._models) > self.max_versions:
+                self._models.popitem(last=False)
+        return model
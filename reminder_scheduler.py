@@ -0,0 +1,345 @@
+import heapq
+import itertools
+import logging
+import re
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from http_transport import shared_transport
+from task_schema import is_true, normalize_tasks
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WEBHOOK_URL = "http://localhost:5678/webhook/task-reminders"  # Local n8n webhook
+SENT_DATE_FORMAT = "%Y-%m-%d"  # Same as format_task_data; the sheet keeps dates only
+
+_INTERVAL_PATTERN = re.compile(r'(\d+(?:\.\d+)?)\s*([a-z]*)')
+_INTERVAL_UNITS = {
+    '': 3600, 'h': 3600, 'hr': 3600, 'hrs': 3600, 'hour': 3600, 'hours': 3600,
+    'm': 60, 'min': 60, 'mins': 60, 'minute': 60, 'minutes': 60,
+    'd': 86400, 'day': 86400, 'days': 86400,
+    'w': 604800, 'week': 604800, 'weeks': 604800,
+}
+
+
+@lru_cache(maxsize=256)
+def parse_interval(text):
+    """Seconds in an interval such as '24h', '30m', '2d' or '1h 30m' (bare numbers are hours), or None"""
+    text = str(text).strip().lower()
+    if not text or text in ('nan', 'none', '<na>'):
+        return None
+    total = 0.0
+    matched = False
+    for amount, unit in _INTERVAL_PATTERN.findall(text):
+        if unit not in _INTERVAL_UNITS:
+            return None
+        total += float(amount) * _INTERVAL_UNITS[unit]
+        matched = True
+    return total if matched and total > 0 else None
+
+
+@dataclass
+class Reminder:
+    """One reminder handed to a notifier"""
+    task_id: str
+    executor: str
+    executor_id: str
+    description: str
+    due_at: datetime
+    count: int  # Reminder Count after this reminder is sent
+
+    def payload(self):
+        data = asdict(self)
+        data['due_at'] = self.due_at.isoformat(sep=' ', timespec='seconds')
+        return data
+
+
+class Notifier(ABC):
+    """Delivers batches of reminders; returns the Task IDs that were delivered"""
+
+    @abstractmethod
+    def notify(self, reminders):
+        """Send a batch of Reminder objects"""
+
+
+class LogNotifier(Notifier):
+    """Writes reminders to the log, for local runs without a webhook"""
+
+    def notify(self, reminders):
+        for reminder in reminders:
+            logger.info(f"Reminder #{reminder.count} for task {reminder.task_id} to {reminder.executor}")
+        return [reminder.task_id for reminder in reminders]
+
+
+class WebhookNotifier(Notifier):
+    """POSTs each batch of reminders as one JSON request (e.g. to an n8n webhook)"""
+
+    def __init__(self, url=DEFAULT_WEBHOOK_URL, transport=None):
+        self.url = url
+        self.transport = transport or shared_transport()
+
+    def notify(self, reminders):
+        try:
+            response = self.transport.session.post(
+                self.url, json={'reminders': [reminder.payload() for reminder in reminders]},
+                timeout=self.transport.timeout,
+            )
+            response.raise_for_status()
+            return [reminder.task_id for reminder in reminders]
+        except Exception as e:
+            logger.error(f"Failed to deliver {len(reminders)} reminders to {self.url}: {str(e)}")
+            return []
+
+
+class ReminderScheduler:
+    """Sends task reminders when they fall due, driven by the reminder columns of the Tasks sheet
+
+    A task's first reminder is due at its Date + Reminder Time. While the task
+    stays open (not completed and without a Report Date) a new reminder is due
+    every "Reminder Interval if No Report" after the last one was sent.
+
+    `load()` parses every task once and heapifies the next due times; after
+    that `tick()` only pops the entries that are due, so each tick costs
+    O(log n) per due task rather than a scan of the table. Due reminders go to
+    the notifier in batches of up to `max_batch`, and Reminder Sent, Reminder
+    Sent Date and Reminder Count of every delivered task are written back in
+    one bulk update through the manager. Failed deliveries are retried after
+    `retry_delay` seconds.
+    """
+
+    def __init__(self, manager, notifier=None, worksheet_name="Tasks", max_batch=100, retry_delay=300):
+        self.manager = manager
+        self.notifier = notifier or LogNotifier()
+        self.worksheet_name = worksheet_name
+        self.max_batch = max_batch
+        self.retry_delay = retry_delay
+
+        self._heap = []  # (due time, sequence, task id)
+        self._due = {}  # task_id -> current due time; heap entries that disagree are stale
+        self._tasks = {}  # task_id -> (interval seconds, count, executor, executor id, description)
+        self._sent = {}  # task_id -> (count, sent at) for reminders this scheduler sent
+        self._sequence = itertools.count()
+        self._lock = threading.RLock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+
+        self.sent = 0
+        self.failed = 0
+        self.ticks = 0
+
+    def load(self, df):
+        """(Re)build the schedule from a task frame (raw or typed)"""
+        schedule, tasks = self._parse(df)
+        with self._lock:
+            self._tasks = tasks
+            self._due = schedule
+            self._heap = [(due, next(self._sequence), task_id) for task_id, due in schedule.items()]
+            heapq.heapify(self._heap)
+        logger.info(f"Scheduled reminders for {len(schedule)} of {len(df)} tasks")
+        self._wake.set()
+
+    def unschedule(self, task_id):
+        """Stop reminding about a task, e.g. once it is reported or deleted"""
+        with self._lock:
+            self._due.pop(str(task_id), None)  # Its heap entry becomes stale and is skipped
+
+    def next_due(self):
+        """Earliest pending due time, or None"""
+        with self._lock:
+            self._drop_stale()
+            return self._heap[0][0] if self._heap else None
+
+    def upcoming(self, limit=20):
+        """The next `limit` reminders as a DataFrame, without sending anything"""
+        with self._lock:
+            entries = heapq.nsmallest(limit, (entry for entry in self._heap if self._due.get(entry[2]) == entry[0]))
+            rows = [(task_id, due, self._tasks[task_id][2], self._tasks[task_id][1] + 1)
+                    for due, _, task_id in entries]
+        return pd.DataFrame(rows, columns=['Task ID', 'Due', 'Executor', 'Reminder #'])
+
+    def overdue(self, now=None):
+        """Number of reminders already due"""
+        now = now or datetime.now()
+        with self._lock:
+            return sum(1 for due in self._due.values() if due <= now)
+
+    def tick(self, now=None):
+        """Send every reminder due by `now` and write the results back; returns the Task IDs sent"""
+        now = now or datetime.now()
+        delivered_all = []
+        while True:
+            batch = self._pop_due(now)
+            if not batch:
+                break
+            delivered = set(self._deliver(batch))
+            delivered_all.extend(reminder.task_id for reminder in batch if reminder.task_id in delivered)
+            self._write_back([reminder for reminder in batch if reminder.task_id in delivered], now)
+            self._reschedule(batch, delivered, now)
+            if len(batch) < self.max_batch:
+                break
+        with self._lock:
+            self.ticks += 1
+        return delivered_all
+
+    def start(self, poll_interval=60):
+        """Run `tick()` on a daemon thread, waking at the next due time (or every `poll_interval` seconds)"""
+        if self._thread is not None and self._thread.is_alive():
+            return self._thread
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, args=(poll_interval,),
+                                        name=f"reminders-{self.worksheet_name}", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self, timeout=10):
+        """Stop the background thread"""
+        self._stopped.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def stats(self):
+        """Schedule size and delivery counters"""
+        with self._lock:
+            return {
+                'scheduled': len(self._due),
+                'heap_size': len(self._heap),
+                'next_due': self.next_due(),
+                'sent': self.sent,
+                'failed': self.failed,
+                'ticks': self.ticks,
+            }
+
+    def _run(self, poll_interval):
+        while not self._stopped.is_set():
+            try:
+                self.tick()
+            except Exception as e:
+                logger.error(f"Reminder tick failed: {str(e)}")
+            next_due = self.next_due()
+            wait = poll_interval if next_due is None else (next_due - datetime.now()).total_seconds()
+            self._wake.clear()
+            self._wake.wait(min(max(wait, 0.0), poll_interval))
+
+    def _parse(self, df):
+        """Next due time and reminder details of every open task, parsed column-wise"""
+        typed = normalize_tasks(df)
+        n = len(typed)
+        if n == 0 or 'Task ID' not in typed.columns:
+            return {}, {}
+
+        def text(col):
+            if col not in typed.columns:
+                return np.full(n, '', dtype=object)
+            return typed[col].astype(object).where(typed[col].notna(), '').astype(str).to_numpy(dtype=object)
+
+        def dates(col):
+            if col not in typed.columns:
+                return pd.Series(pd.NaT, index=typed.index)
+            return typed[col]
+
+        open_tasks = ~typed['is_completed'].to_numpy(dtype=bool) & dates('Report Date').isna().to_numpy()
+
+        clock = pd.to_datetime(pd.Series(text('Reminder Time'), index=typed.index), errors='coerce', format='mixed')
+        time_of_day = (clock - clock.dt.normalize()).fillna(pd.Timedelta(0))
+        first_due = dates('Date').dt.normalize() + time_of_day
+        sent = is_true(typed['Reminder Sent']) if 'Reminder Sent' in typed.columns else np.zeros(n, dtype=bool)
+        # Sent Date holds the day only; assume the reminder went out at its Reminder Time that day
+        sent_at = dates('Reminder Sent Date')
+        sent_at = sent_at.where(sent_at.ne(sent_at.dt.normalize()), sent_at + time_of_day)
+        counts = (typed['Reminder Count'].fillna(0).astype(int).to_numpy(copy=True)
+                  if 'Reminder Count' in typed.columns else np.zeros(n, dtype=int))
+        intervals = [parse_interval(value) for value in text('Reminder Interval if No Report')]
+
+        interval_seconds = pd.Series([np.nan if value is None else value for value in intervals], index=typed.index)
+        task_ids = text('Task ID')
+        executors, executor_ids, descriptions = text('Executor'), text('Executor ID'), text('Task Description')
+
+        # Reminders sent by us that the frame does not show yet (e.g. write-behind still pending)
+        if self._sent:
+            recorded = list(self._sent.items())
+            positions = pd.Index(task_ids).get_indexer([task_id for task_id, _ in recorded])
+            for position, (_, (count, last_sent)) in zip(positions, recorded):
+                if position >= 0 and count >= counts[position]:
+                    counts[position], sent[position] = count, True
+                    sent_at.iat[position] = last_sent
+
+        repeat_due = sent_at + pd.to_timedelta(interval_seconds, unit='s')
+        due = first_due.where(~sent, repeat_due)
+        keep = open_tasks & (task_ids != '') & due.notna().to_numpy()
+
+        schedule, tasks = {}, {}
+        positions = np.flatnonzero(keep)
+        due_times = due.iloc[positions].dt.to_pydatetime()
+        for position, due_at in zip(positions, due_times):
+            task_id = task_ids[position]
+            schedule[task_id] = due_at
+            tasks[task_id] = (intervals[position], int(counts[position]), executors[position],
+                              executor_ids[position], descriptions[position])
+        return schedule, tasks
+
+    def _drop_stale(self):
+        while self._heap and self._due.get(self._heap[0][2]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+
+    def _pop_due(self, now):
+        batch = []
+        with self._lock:
+            while len(batch) < self.max_batch:
+                self._drop_stale()
+                if not self._heap or self._heap[0][0] > now:
+                    break
+                due, _, task_id = heapq.heappop(self._heap)
+                del self._due[task_id]
+                _, count, executor, executor_id, description = self._tasks[task_id]
+                batch.append(Reminder(task_id, executor, executor_id, description, due, count + 1))
+        return batch
+
+    def _deliver(self, batch):
+        try:
+            return self.notifier.notify(batch) or []
+        except Exception as e:
+            logger.error(f"Notifier failed for {len(batch)} reminders: {str(e)}")
+            return []
+
+    def _write_back(self, delivered, now):
+        if not delivered:
+            return
+        sent_date = now.strftime(SENT_DATE_FORMAT)
+        updates = {
+            reminder.task_id: {
+                'Reminder Sent': 'Yes',
+                'Reminder Sent Date': sent_date,
+                'Reminder Count': str(reminder.count),
+            }
+            for reminder in delivered
+        }
+        results = self.manager.bulk_update_tasks(updates, self.worksheet_name)
+        failed = [task_id for task_id, ok in results.items() if not ok]
+        if failed:
+            logger.warning(f"Could not record {len(failed)} sent reminders: {failed[:10]}")
+
+    def _reschedule(self, batch, delivered, now):
+        with self._lock:
+            for reminder in batch:
+                task_id = reminder.task_id
+                interval, count, executor, executor_id, description = self._tasks[task_id]
+                if task_id in delivered:
+                    self.sent += 1
+                    self._sent[task_id] = (reminder.count, now)
+                    self._tasks[task_id] = (interval, reminder.count, executor, executor_id, description)
+                    if interval is None:
+                        continue  # One-off reminder
+                    due = now + timedelta(seconds=interval)
+                else:
+                    self.failed += 1
+                    due = now + timedelta(seconds=self.retry_delay)
+                self._due[task_id] = due
+                heapq.heappush(self._heap, (due, next(self._sequence), task_id))
@@ -0,0 +1,239 @@
+import bisect
+import logging
+import re
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Searchable columns and how much a term found in each counts towards a row's score
+SEARCH_COLUMNS = {
+    'Task Description': 2.0,
+    'Object': 1.5,
+    'Executor': 1.5,
+    'Section': 1.0,
+    'Comment': 1.0,
+}
+
+# Expansions are scored with the query token's IDF and scaled so they stay below any exact hit
+PREFIX_WEIGHT = 0.8  # Term extends a query token ("rep" -> "report")
+FUZZY_WEIGHT = 0.5  # Term is one edit away from a query token
+MIN_PREFIX_LENGTH = 2
+MIN_FUZZY_LENGTH = 4
+MAX_EXPANSIONS = 64  # Most frequent prefix/fuzzy terms used per query token
+_K1 = 1.2
+
+_TOKEN_PATTERN = re.compile(r'\w+')
+
+
+def tokenize(text):
+    """Lower-cased word tokens of a cell value"""
+    return _TOKEN_PATTERN.findall(str(text).lower())
+
+
+class SearchIndex:
+    """Inverted index over the text columns of one immutable task snapshot
+
+    Every term maps to the rows containing it (its postings) with a
+    column-weighted term frequency. A query looks up each of its tokens as
+    an exact term, as a prefix of longer terms and, when the exact term is
+    unknown, as terms one edit away. It scores rows BM25-style from the
+    postings alone, so it never touches the frame. Prefix and fuzzy terms
+    are scored with the IDF of the query token itself (not of the rarer
+    term they expand to) and scaled below the lowest exact-hit score, so a
+    row containing the exact token always outranks one that only contains
+    an expansion of it. Rows must match every query token; results are
+    ranked by score, then by row order.
+    """
+
+    def __init__(self, df, columns=SEARCH_COLUMNS, token_cache=None):
+        self.row_count = len(df)
+        # Lowest tf part an exact hit can have (one occurrence in the lightest column)
+        lightest = min(columns.values()) if columns else 1.0
+        self._exact_floor = lightest * (_K1 + 1) / (lightest + _K1)
+        token_cache = token_cache if token_cache is not None else {}
+        vocabulary = {}
+        term_ids, rows, weights = [], [], []
+        for col, weight in columns.items():
+            if col in df.columns:
+                col_terms, col_rows = self._column_postings(df[col], vocabulary, token_cache)
+                term_ids.append(col_terms)
+                rows.append(col_rows)
+                weights.append(np.full(len(col_rows), weight, dtype=np.float32))
+
+        self.terms = list(vocabulary)  # Term id -> term
+        self._vocabulary = vocabulary
+        self._sorted_terms = sorted(vocabulary)
+        self._alphabet = ''.join(sorted(set(''.join(self.terms))))
+        if term_ids:
+            self._build_postings(np.concatenate(term_ids), np.concatenate(rows), np.concatenate(weights))
+        else:
+            self._offsets = np.zeros(1, dtype=np.int64)
+            self._rows = np.zeros(0, dtype=np.int32)
+            self._tf = np.zeros(0, dtype=np.float32)
+            self._document_counts = np.zeros(0, dtype=np.int64)
+            self._idf = np.zeros(0, dtype=np.float32)
+
+    def _column_postings(self, series, vocabulary, token_cache):
+        """(term id, row) pairs of one column; each distinct value is tokenized once"""
+        codes, uniques = pd.factorize(series.astype(object), use_na_sentinel=True)
+        unique_terms, lengths = [], np.zeros(len(uniques), dtype=np.int64)
+        for i, value in enumerate(uniques):
+            text = str(value)
+            tokens = token_cache.get(text)
+            if tokens is None:
+                tokens = tuple(dict.fromkeys(tokenize(text)))
+                token_cache[text] = tokens
+            ids = [vocabulary.setdefault(token, len(vocabulary)) for token in tokens]
+            unique_terms.extend(ids)
+            lengths[i] = len(ids)
+        unique_terms = np.asarray(unique_terms, dtype=np.int64)
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1])) if len(lengths) else lengths
+
+        present = np.flatnonzero(codes >= 0)
+        row_lengths = lengths[codes[present]]
+        total = int(row_lengths.sum())
+        rows = np.repeat(present, row_lengths)
+        # Position of each pair inside its row's token list, then the matching term of that unique value
+        within = np.arange(total) - np.repeat(np.cumsum(row_lengths) - row_lengths, row_lengths)
+        terms = unique_terms[np.repeat(starts[codes[present]], row_lengths) + within]
+        return terms, rows
+
+    def _build_postings(self, term_ids, rows, weights):
+        """Sum weights per (term, row) and lay the postings out term by term with BM25 tf parts"""
+        keys = term_ids * max(self.row_count, 1) + rows
+        unique_keys, inverse = np.unique(keys, return_inverse=True)
+        frequencies = np.bincount(inverse, weights=weights).astype(np.float32)
+        terms = unique_keys // max(self.row_count, 1)
+        self._rows = (unique_keys % max(self.row_count, 1)).astype(np.int32)
+        self._offsets = np.searchsorted(terms, np.arange(len(self.terms) + 1))
+        self._document_counts = np.diff(self._offsets)
+        self._idf = self._inverse_frequency(self._document_counts).astype(np.float32)
+        self._tf = (frequencies * (_K1 + 1) / (frequencies + _K1)).astype(np.float32)
+
+    def _inverse_frequency(self, document_counts):
+        return np.log1p((self.row_count - document_counts + 0.5) / (document_counts + 0.5))
+
+    def __len__(self):
+        return len(self.terms)
+
+    def search(self, query, positions=None, limit=None):
+        """Row positions matching `query`, best first, and their scores
+
+        `positions` restricts the result to those rows (e.g. the sidebar
+        filter selection). An empty query returns no rows.
+        """
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+
+        total = np.zeros(self.row_count, dtype=np.float32)
+        matched = None
+        for token in tokens:
+            token_scores = np.zeros(self.row_count, dtype=np.float32)
+            exact, expansions = self._expand(token)
+            # An unknown token is as rare as a term can be
+            idf = self._idf[exact] if exact is not None else self._inverse_frequency(0)
+            if exact is not None:
+                start, stop = self._offsets[exact], self._offsets[exact + 1]
+                token_scores[self._rows[start:stop]] = idf * self._tf[start:stop]
+            for term_id, weight in expansions:
+                start, stop = self._offsets[term_id], self._offsets[term_id + 1]
+                # tf part scaled into (0, exact floor), so no expansion reaches an exact hit
+                scores = (idf * weight * self._exact_floor / (_K1 + 1)) * self._tf[start:stop]
+                np.maximum.at(token_scores, self._rows[start:stop], scores.astype(np.float32))
+            hit = token_scores > 0
+            matched = hit if matched is None else matched & hit
+            if not matched.any():
+                return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+            total += token_scores
+
+        if positions is not None:
+            allowed = np.zeros(self.row_count, dtype=bool)
+            allowed[positions] = True
+            matched &= allowed
+        hits = np.flatnonzero(matched)
+        order = np.argsort(-total[hits], kind='stable')
+        if limit is not None:
+            order = order[:limit]
+        return hits[order], total[hits[order]]
+
+    def _expand(self, token):
+        """Exact term id of a query token (or None) and the (term id, weight) pairs it expands to"""
+        matches = {}
+        exact = self._vocabulary.get(token)
+        if len(token) >= MIN_PREFIX_LENGTH:
+            start = bisect.bisect_left(self._sorted_terms, token)
+            stop = bisect.bisect_left(self._sorted_terms, token + '\U0010ffff')
+            extensions = [self._vocabulary[term] for term in self._sorted_terms[start:stop] if term != token]
+            for term_id in self._most_frequent(extensions):
+                matches.setdefault(term_id, PREFIX_WEIGHT)
+        if exact is None and len(token) >= MIN_FUZZY_LENGTH:
+            neighbours = [self._vocabulary[term] for term in _edits1(token, self._alphabet) if term in self._vocabulary]
+            for term_id in self._most_frequent(neighbours):
+                matches.setdefault(term_id, FUZZY_WEIGHT)
+        return exact, matches.items()
+
+    def _most_frequent(self, term_ids):
+        if len(term_ids) <= MAX_EXPANSIONS:
+            return term_ids
+        counts = self._document_counts[term_ids]
+        keep = np.argpartition(-counts, MAX_EXPANSIONS - 1)[:MAX_EXPANSIONS]
+        return [term_ids[i] for i in keep]
+
+
+def _edits1(word, alphabet):
+    """Strings one deletion, transposition, substitution or insertion away from `word`"""
+    splits = [(word[:i], word[i:]) for i in range(len(word) + 1)]
+    edits = {left + right[1:] for left, right in splits if right}
+    edits.update(left + right[1] + right[0] + right[2:] for left, right in splits if len(right) > 1)
+    edits.update(left + c + right[1:] for left, right in splits if right for c in alphabet)
+    edits.update(left + c + right for left, right in splits for c in alphabet)
+    edits.discard(word)
+    return edits
+
+
+class SearchEngine:
+    """Keeps one SearchIndex per data version (small LRU) and answers sidebar searches
+
+    A new data version gets a fresh index rather than having the row delta
+    applied to the old postings: postings are keyed by row position, which
+    shifts on every insert or delete. What carries over between versions is
+    the tokenized cell values, so a new snapshot only tokenizes text that
+    changed since the previous one and the rest of the build is vectorized
+    numpy over the existing tokens.
+    """
+
+    def __init__(self, columns=SEARCH_COLUMNS, max_versions=2, max_cached_values=500_000):
+        self.columns = columns
+        self.max_versions = max_versions
+        self.max_cached_values = max_cached_values
+        self._indexes = OrderedDict()
+        self._token_cache = {}
+        self._lock = threading.Lock()
+
+    def index(self, df, data_version):
+        """SearchIndex for a snapshot, built on first use of its data version"""
+        with self._lock:
+            if data_version in self._indexes:
+                self._indexes.move_to_end(data_version)
+                return self._indexes[data_version]
+            if len(self._token_cache) > self.max_cached_values:
+                self._token_cache = {}
+            token_cache = self._token_cache
+
+        index = SearchIndex(df, self.columns, token_cache)
+        logger.info(f"Built search index for {data_version[:12]} ({len(df)} rows, {len(index)} terms)")
+        with self._lock:
+            self._indexes[data_version] = index
+            self._indexes.move_to_end(data_version)
+            while len(self._indexes) > self.max_versions:
+                self._indexes.popitem(last=False)
+        return index
+
+    def search(self, df, data_version, query, positions=None, limit=None):
+        """Ranked row positions of a snapshot matching `query` (within `positions` if given)"""
+        return self.index(df, data_version).search(query, positions, limit)[0]
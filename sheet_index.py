@@ -0,0 +1,194 @@
+import hashlib
+import json
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def _checksum(values):
+    """Cheap content checksum for a list of cell values"""
+    return hashlib.sha1("\n".join(values).encode("utf-8")).hexdigest()
+
+
+class TaskRowIndex:
+    """Task ID -> sheet row map for one worksheet, maintained incrementally
+
+    Row numbers are 1-based sheet rows; the header occupies row 1, so the
+    first task lives on row 2. When several rows share a Task ID the first
+    one wins, matching the old linear scan over `col_values(1)`.
+
+    Appends extend a running checksum instead of re-hashing every ID, and
+    mutations only mark the index dirty: `flush()` writes it to disk at most
+    every `save_interval` seconds. A persisted index that is behind the sheet
+    is still self-consistent, and the row checks in the data manager catch
+    the drift and rebuild it.
+    """
+
+    def __init__(self, path=None, save_interval=5.0):
+        self.path = path
+        self.save_interval = save_interval
+        self.ids = []
+        self.rows = {}
+        self.built = False
+        self.dirty = False
+        self._hasher = None  # Running sha1 of the IDs; None when it has to be recomputed
+        self._saved_at = 0.0
+
+    @property
+    def checksum(self):
+        """Checksum of the indexed Task IDs in row order, or None when not built"""
+        if not self.built:
+            return None
+        if self._hasher is None:
+            self._hasher = hashlib.sha1("\n".join(self.ids).encode("utf-8"))
+        return self._hasher.hexdigest()
+
+    def build(self, task_id_col):
+        """Rebuild the index from a full `col_values(1)` download (header included)"""
+        self.ids = [str(value) for value in task_id_col[1:]]
+        self._reindex()
+        self.built = True
+        self.save()
+        logger.info(f"Built task row index with {len(self.ids)} rows")
+
+    def get(self, task_id):
+        """Return the sheet row for a Task ID, or None if unknown"""
+        return self.rows.get(str(task_id))
+
+    def append(self, task_id):
+        """Record a row appended at the bottom of the sheet and return its row number"""
+        task_id = str(task_id)
+        if self._hasher is not None:
+            self._hasher.update((("\n" if self.ids else "") + task_id).encode("utf-8"))
+        self.ids.append(task_id)
+        row = len(self.ids) + 1
+        self.rows.setdefault(task_id, row)
+        self.dirty = True
+        return row
+
+    def remove(self, task_id):
+        """Forget a deleted row and shift every row below it up by one"""
+        task_id = str(task_id)
+        row = self.get(task_id)
+        if row is None:
+            return None
+        del self.ids[row - 2]
+        del self.rows[task_id]
+        # Only rows below the deleted one move; the first later copy of its ID takes over
+        for i in range(row - 2, len(self.ids)):
+            current = self.rows.get(self.ids[i])
+            if current is None or current > i + 2:
+                self.rows[self.ids[i]] = i + 2
+        self._hasher = None
+        self.dirty = True
+        return row
+
+    def matches(self, row, observed_id):
+        """Check an observed Task ID cell against what the index expects at that row"""
+        return 2 <= row <= len(self.ids) + 1 and self.ids[row - 2] == str(observed_id)
+
+    def verify(self, task_id_col):
+        """Full drift check against a `col_values(1)` download"""
+        return self.checksum == _checksum([str(value) for value in task_id_col[1:]])
+
+    def invalidate(self):
+        """Drop the in-memory state so the next lookup rebuilds from the sheet"""
+        self.ids = []
+        self.rows = {}
+        self.built = False
+        self.dirty = False
+        self._hasher = None
+
+    def flush(self, force=False):
+        """Persist pending changes, at most once per `save_interval` unless forced"""
+        if self.dirty and (force or time.monotonic() - self._saved_at >= self.save_interval):
+            self.save()
+
+    def save(self):
+        """Persist the index to disk when a path is configured"""
+        if not self.path:
+            self.dirty = False
+            return
+        try:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"ids": self.ids, "checksum": self.checksum}, f)
+            os.replace(tmp_path, self.path)
+            self.dirty = False
+            self._saved_at = time.monotonic()
+        except Exception as e:
+            logger.error(f"Failed to save task row index: {str(e)}")
+
+    def load(self):
+        """Load a persisted index from disk; returns True if one was usable"""
+        if not self.path or not os.path.exists(self.path):
+            return False
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            ids = [str(value) for value in data["ids"]]
+            if _checksum(ids) != data.get("checksum"):
+                logger.warning("Persisted task row index is corrupt, ignoring it")
+                return False
+            self.ids = ids
+            self._reindex()
+            self.built = True
+            return True
+        except Exception as e:
+            logger.error(f"Failed to load task row index: {str(e)}")
+            return False
+
+    def _reindex(self):
+        self.rows = {}
+        for i, task_id in enumerate(self.ids, start=2):
+            self.rows.setdefault(task_id, i)
+        self._hasher = None
+        self.dirty = False
+
+
+class WorksheetSchema:
+    """Cached header row of a worksheet, mapping column names to 1-based indices
+
+    `version` increases every time a different header is observed, so callers
+    can tell when column positions have moved underneath them. `observed_at`
+    is the monotonic time of the last header read.
+    """
+
+    def __init__(self):
+        self.headers = []
+        self.columns = {}
+        self.version = 0
+        self.loaded = False
+        self.observed_at = None
+
+    def observe(self, headers):
+        """Record a freshly read header row; returns True if it differs from the cached one"""
+        headers = [str(h).strip() for h in headers]
+        while headers and not headers[-1]:
+            headers.pop()
+        self.loaded = True
+        self.observed_at = time.monotonic()
+        if headers == self.headers:
+            return False
+        self.headers = headers
+        self.columns = {}
+        for i, name in enumerate(headers, start=1):
+            if name:
+                self.columns.setdefault(name, i)
+        self.version += 1
+        logger.info(f"Worksheet schema changed (version {self.version}, {len(headers)} columns)")
+        return True
+
+    def index(self, column_name):
+        """Return the 1-based column index for a column name, or None if absent"""
+        return self.columns.get(column_name)
+
+    def row_for(self, record):
+        """Lay out a {column name: value} record in header order, '' for missing columns"""
+        return [record.get(name, '') if name else '' for name in self.headers]
+
+    def invalidate(self):
+        """Forget the cached header so the next access re-reads it"""
+        self.loaded = False
@@ -0,0 +1,119 @@
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SNAPSHOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".snapshots")
+
+
+class SnapshotStore:
+    """Last-known-good DataFrames on local disk, one Parquet file per (sheet ID, worksheet)
+
+    Reads come straight from disk, so startup and Google outages no longer
+    depend on the network. `read_through` serves the snapshot immediately and
+    refreshes it on a background thread once it is older than `max_age`.
+    """
+
+    def __init__(self, directory=DEFAULT_SNAPSHOT_DIR):
+        self.directory = directory
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+    def path(self, sheet_id, worksheet_name):
+        """Parquet file holding the snapshot for one worksheet"""
+        safe_name = re.sub(r"[^A-Za-z0-9_.-]", "_", f"{sheet_id}_{worksheet_name}")
+        return os.path.join(self.directory, f"{safe_name}.parquet")
+
+    def save(self, sheet_id, worksheet_name, df):
+        """Atomically replace the snapshot for a worksheet; returns True on success"""
+        path = self.path(sheet_id, worksheet_name)
+        tmp_path = None
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            # Each save writes its own temp file, so concurrent saves never replace with a partial file
+            with tempfile.NamedTemporaryFile(dir=self.directory, prefix=f"{os.path.basename(path)}.",
+                                             suffix=".tmp", delete=False) as tmp:
+                tmp_path = tmp.name
+                df.to_parquet(tmp, index=False)
+            os.replace(tmp_path, path)
+            return True
+        except Exception as e:
+            logger.error(f"Failed to save snapshot for {worksheet_name}: {str(e)}")
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False
+
+    def load(self, sheet_id, worksheet_name):
+        """Return (DataFrame, saved_at epoch seconds) or (None, None) when no snapshot exists"""
+        path = self.path(sheet_id, worksheet_name)
+        if not os.path.exists(path):
+            return None, None
+        try:
+            saved_at = os.path.getmtime(path)
+            return pd.read_parquet(path), saved_at
+        except Exception as e:
+            logger.error(f"Failed to read snapshot for {worksheet_name}: {str(e)}")
+            return None, None
+
+    def touch(self, sheet_id, worksheet_name):
+        """Mark an existing snapshot as fresh without rewriting it (the source was unchanged)"""
+        path = self.path(sheet_id, worksheet_name)
+        if os.path.exists(path):
+            os.utime(path)
+
+    def age(self, sheet_id, worksheet_name):
+        """Seconds since the snapshot was written, or None if there is none"""
+        path = self.path(sheet_id, worksheet_name)
+        if not os.path.exists(path):
+            return None
+        return time.time() - os.path.getmtime(path)
+
+    def read_through(self, sheet_id, worksheet_name, fetch, max_age=60):
+        """Serve a worksheet from its snapshot, refreshing it from `fetch()` as needed
+
+        With a snapshot on disk it is returned immediately; if it is older than
+        `max_age` seconds a background refresh is started (at most one per
+        worksheet). Without a snapshot `fetch()` runs synchronously and its
+        errors propagate to the caller. `fetch()` may return None to signal
+        that the source is unchanged since the snapshot was taken.
+        """
+        df, saved_at = self.load(sheet_id, worksheet_name)
+        if df is None:
+            df = fetch()
+            self.save(sheet_id, worksheet_name, df)
+            return df
+
+        if time.time() - saved_at > max_age:
+            self.refresh_in_background(sheet_id, worksheet_name, fetch)
+        return df
+
+    def refresh_in_background(self, sheet_id, worksheet_name, fetch):
+        """Re-fetch a worksheet on a daemon thread and store the result; returns False if already running"""
+        key = (sheet_id, worksheet_name)
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+
+        def _refresh():
+            try:
+                df = fetch()
+                if df is None:
+                    self.touch(sheet_id, worksheet_name)
+                else:
+                    self.save(sheet_id, worksheet_name, df)
+                    logger.info(f"Refreshed snapshot for {worksheet_name}")
+            except Exception as e:
+                logger.error(f"Background refresh of {worksheet_name} failed, keeping last snapshot: {str(e)}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=_refresh, name=f"snapshot-{worksheet_name}", daemon=True).start()
+        return True
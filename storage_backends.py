@@ -0,0 +1,393 @@
+import csv
+import logging
+import os
+import re
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+
+import pandas as pd
+
+from task_schema import DEFAULT_TASK_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+# Columns the SQLite backend indexes for lookups, filters and analytics
+INDEXED_COLUMNS = ['Task ID', 'Executor', 'Status', 'Company', 'Date']
+
+_TRUE_SQL = "('yes', 'y', 'true', '1')"
+
+
+class StorageBackend(ABC):
+    """Where EnhancedDataManager keeps task rows
+
+    Rows are plain dicts of column name -> text, exactly as they would appear
+    in the sheet. Write methods raise on I/O errors so callers (bulk imports,
+    the write-behind queue) can decide whether to retry.
+    """
+
+    name = "base"
+
+    def is_ready(self):
+        """True when the backend can serve reads and writes"""
+        return True
+
+    def revision(self, worksheet_name="Tasks"):
+        """Cheap marker that changes whenever the stored rows change, or None when there is none"""
+        return None
+
+    @abstractmethod
+    def load_tasks(self, worksheet_name="Tasks"):
+        """All rows of a worksheet as an all-text DataFrame"""
+
+    def existing_task_ids(self, worksheet_name="Tasks"):
+        """Set of Task IDs currently stored, read fresh from the backend"""
+        df = self.load_tasks(worksheet_name)
+        return set(df['Task ID'].astype(str)) if 'Task ID' in df.columns else set()
+
+    @abstractmethod
+    def append_tasks(self, worksheet_name, records):
+        """Store new rows"""
+
+    @abstractmethod
+    def update_tasks(self, worksheet_name, updates):
+        """Apply {task_id: {column: value}}; returns {task_id: written}
+
+        A task is not written (False) when its Task ID is missing or none of
+        the changed columns exist; unknown columns next to known ones are
+        logged and skipped.
+        """
+
+    @abstractmethod
+    def delete_task(self, worksheet_name, task_id):
+        """Remove the first row with a Task ID; returns False if there is none"""
+
+    def query_tasks(self, worksheet_name="Tasks", filters=None):
+        """Rows whose columns match `filters` ({column: list of allowed values})"""
+        df = self.load_tasks(worksheet_name)
+        for col, values in (filters or {}).items():
+            if values and col in df.columns:
+                df = df[df[col].isin([str(value) for value in values])]
+        return df
+
+    def task_analytics(self, worksheet_name="Tasks"):
+        """Aggregates computed by the backend itself, or None to compute them from a loaded frame"""
+        return None
+
+
+class GoogleSheetsBackend(StorageBackend):
+    """Google Sheets through an EnhancedDataManager's authenticated gspread client
+
+    The manager owns the worksheet handles, Task ID row indexes and header
+    schemas (its write-behind queues share them), so this class only adapts
+    those internals to the StorageBackend interface.
+    """
+
+    name = "google_sheets"
+
+    def __init__(self, manager):
+        self.manager = manager
+
+    def is_ready(self):
+        return bool(self.manager.gc and self.manager.sheet)
+
+    def revision(self, worksheet_name="Tasks"):
+        return self.manager._sheet_revision()  # Spreadsheet-wide last update time
+
+    def load_tasks(self, worksheet_name="Tasks"):
+        return self.manager._read_worksheet(worksheet_name)
+
+    def existing_task_ids(self, worksheet_name="Tasks"):
+        return self.manager._existing_task_ids(worksheet_name)
+
+    def append_tasks(self, worksheet_name, records):
+        self.manager._append_task_rows(worksheet_name, records)
+
+    def update_tasks(self, worksheet_name, updates):
+        return self.manager._write_updates(worksheet_name, updates)
+
+    def delete_task(self, worksheet_name, task_id):
+        return self.manager._delete_task_row(worksheet_name, task_id)
+
+
+class CsvBackend(StorageBackend):
+    """One CSV file per worksheet in `directory` (`<worksheet name>.csv`)
+
+    Appends go to the end of the file; updates and deletes rewrite it through
+    a temporary file that is renamed into place.
+    """
+
+    name = "csv"
+
+    def __init__(self, directory, columns=DEFAULT_TASK_COLUMNS):
+        self.directory = directory
+        self.columns = list(columns)
+        self._lock = threading.RLock()
+
+    def path(self, worksheet_name):
+        """CSV file holding a worksheet"""
+        safe_name = re.sub(r"[^A-Za-z0-9_.-]", "_", worksheet_name)
+        return os.path.join(self.directory, f"{safe_name}.csv")
+
+    def revision(self, worksheet_name="Tasks"):
+        path = self.path(worksheet_name)
+        with self._lock:
+            if not os.path.exists(path):
+                return "missing"
+            stat = os.stat(path)
+            return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+    def load_tasks(self, worksheet_name="Tasks"):
+        path = self.path(worksheet_name)
+        with self._lock:
+            if not os.path.exists(path):
+                return pd.DataFrame(columns=self.columns)
+            return pd.read_csv(path, dtype=str, keep_default_na=False)
+
+    def append_tasks(self, worksheet_name, records):
+        path = self.path(worksheet_name)
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            header = self._header(path)
+            with open(path, "a", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                if not os.path.getsize(path):
+                    writer.writerow(header)
+                writer.writerows([[record.get(name, '') for name in header] for record in records])
+
+    def update_tasks(self, worksheet_name, updates):
+        results = {task_id: False for task_id in updates}
+        with self._lock:
+            df = self.load_tasks(worksheet_name)
+            positions = self._first_positions(df)
+            for task_id, changes in updates.items():
+                position = positions.get(str(task_id))
+                if position is None:
+                    logger.warning(f"Task ID {task_id} not found")
+                    continue
+                known = _known_changes(task_id, changes, df.columns)
+                if changes and not known:
+                    continue
+                for col_name, new_value in known.items():
+                    df.iat[position, df.columns.get_loc(col_name)] = str(new_value)
+                results[task_id] = True
+            if any(results.values()):
+                self._rewrite(worksheet_name, df)
+        return results
+
+    def delete_task(self, worksheet_name, task_id):
+        with self._lock:
+            df = self.load_tasks(worksheet_name)
+            position = self._first_positions(df).get(str(task_id))
+            if position is None:
+                logger.warning(f"Task ID {task_id} not found")
+                return False
+            self._rewrite(worksheet_name, df.drop(index=df.index[position]))
+            return True
+
+    def _header(self, path):
+        if os.path.exists(path) and os.path.getsize(path):
+            with open(path, newline="", encoding="utf-8") as f:
+                return next(csv.reader(f), self.columns)
+        return self.columns
+
+    def _first_positions(self, df):
+        if 'Task ID' not in df.columns:
+            return {}
+        positions = {}
+        for position, task_id in enumerate(df['Task ID'].astype(str)):
+            positions.setdefault(task_id, position)
+        return positions
+
+    def _rewrite(self, worksheet_name, df):
+        path = self.path(worksheet_name)
+        tmp_path = f"{path}.tmp"
+        df.to_csv(tmp_path, index=False)
+        os.replace(tmp_path, path)
+
+
+class SQLiteBackend(StorageBackend):
+    """Local SQLite database, one table per worksheet
+
+    The database runs in WAL mode so readers never block the writer, and each
+    table is indexed on Task ID, Executor, Status, Company and Date. Filters
+    and analytics run as SQL aggregates instead of loading every row.
+    Triggers count the writes to each table, which serves as its revision.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path, columns=DEFAULT_TASK_COLUMNS):
+        self.path = path
+        self.columns = list(columns)
+        self._lock = threading.RLock()
+        self._tables = set()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
+
+    def revision(self, worksheet_name="Tasks"):
+        self._table(worksheet_name)
+        with self._lock:
+            row = self._conn.execute("SELECT revision FROM _revisions WHERE worksheet = ?",
+                                     (worksheet_name,)).fetchone()
+        return row[0] if row else 0
+
+    def load_tasks(self, worksheet_name="Tasks"):
+        table = self._table(worksheet_name)
+        with self._lock:
+            return pd.read_sql_query(f"SELECT {self._select_list()} FROM {table} ORDER BY rowid", self._conn)
+
+    def existing_task_ids(self, worksheet_name="Tasks"):
+        table = self._table(worksheet_name)
+        with self._lock:
+            return {row[0] for row in self._conn.execute(f'SELECT "Task ID" FROM {table}')}
+
+    def append_tasks(self, worksheet_name, records):
+        table = self._table(worksheet_name)
+        unknown = sorted({name for record in records for name in record if name not in self.columns})
+        if unknown:
+            logger.warning(f"Ignoring fields not present in table columns: {unknown}")
+        placeholders = ", ".join("?" for _ in self.columns)
+        rows = [[_text(record.get(name, '')) for name in self.columns] for record in records]
+        with self._lock, self._conn:
+            self._conn.executemany(f"INSERT INTO {table} ({self._select_list()}) VALUES ({placeholders})", rows)
+
+    def update_tasks(self, worksheet_name, updates):
+        table = self._table(worksheet_name)
+        results = {task_id: False for task_id in updates}
+        with self._lock, self._conn:
+            for task_id, requested in updates.items():
+                changes = _known_changes(task_id, requested, self.columns)
+                rowid = self._first_rowid(table, task_id)
+                if rowid is None:
+                    logger.warning(f"Task ID {task_id} not found")
+                    continue
+                if requested and not changes:
+                    continue
+                if changes:
+                    assignments = ", ".join(f"{_quote(col)} = ?" for col in changes)
+                    self._conn.execute(f"UPDATE {table} SET {assignments} WHERE rowid = ?",
+                                       [_text(value) for value in changes.values()] + [rowid])
+                results[task_id] = True
+        return results
+
+    def delete_task(self, worksheet_name, task_id):
+        table = self._table(worksheet_name)
+        with self._lock, self._conn:
+            rowid = self._first_rowid(table, task_id)
+            if rowid is None:
+                logger.warning(f"Task ID {task_id} not found")
+                return False
+            self._conn.execute(f"DELETE FROM {table} WHERE rowid = ?", (rowid,))
+            return True
+
+    def query_tasks(self, worksheet_name="Tasks", filters=None):
+        table = self._table(worksheet_name)
+        clauses, params = [], []
+        for col, values in (filters or {}).items():
+            if values and col in self.columns:
+                clauses.append(f"{_quote(col)} IN ({', '.join('?' for _ in values)})")
+                params.extend(str(value) for value in values)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            return pd.read_sql_query(f"SELECT {self._select_list()} FROM {table}{where} ORDER BY rowid",
+                                     self._conn, params=params)
+
+    def task_analytics(self, worksheet_name="Tasks"):
+        """The EnhancedDataManager.get_task_analytics dict, computed with GROUP BY queries"""
+        table = self._table(worksheet_name)
+        sent = f'lower(trim("Reminder Sent")) IN {_TRUE_SQL}'
+        read = f'lower(trim("Reminder Read")) IN {_TRUE_SQL}'
+        with self._lock:
+            totals = self._conn.execute(f"""
+                SELECT COUNT(*),
+                       COUNT(DISTINCT NULLIF("Executor", '')),
+                       COUNT(DISTINCT NULLIF("Company", '')),
+                       SUM({sent}),
+                       SUM({read}),
+                       SUM("Priority" LIKE '%high%'),
+                       SUM("Status" LIKE '%completed%' OR "Status" LIKE '%done%')
+                FROM {table}
+            """).fetchone()
+            distributions = {
+                key: self._counts(table, col)
+                for key, col in [('status_distribution', 'Status'), ('priority_distribution', 'Priority'),
+                                 ('executor_task_count', 'Executor'), ('company_task_count', 'Company')]
+            }
+        total, executors, companies, reminders_sent, reminders_read, high, completed = [v or 0 for v in totals]
+        return {
+            'total_tasks': total,
+            'unique_executors': executors,
+            'unique_companies': companies,
+            **distributions,
+            'reminders_sent': reminders_sent,
+            'reminders_read': reminders_read,
+            'high_priority_tasks': high,
+            'completed_tasks': completed
+        }
+
+    def _counts(self, table, col):
+        rows = self._conn.execute(
+            f"SELECT {_quote(col)}, COUNT(*) AS n FROM {table} "
+            f"WHERE {_quote(col)} != '' GROUP BY {_quote(col)} ORDER BY n DESC"
+        )
+        return {value: count for value, count in rows}
+
+    def _first_rowid(self, table, task_id):
+        row = self._conn.execute(f'SELECT MIN(rowid) FROM {table} WHERE "Task ID" = ?', (str(task_id),)).fetchone()
+        return row[0] if row else None
+
+    def _select_list(self):
+        return ", ".join(_quote(col) for col in self.columns)
+
+    def _table(self, worksheet_name):
+        """Quoted table name for a worksheet, creating the table and its indexes on first use"""
+        table = _quote(worksheet_name)
+        if worksheet_name in self._tables:
+            return table
+        with self._lock, self._conn:
+            columns = ", ".join(f"{_quote(col)} TEXT NOT NULL DEFAULT ''" for col in self.columns)
+            self._conn.execute(f"CREATE TABLE IF NOT EXISTS {table} ({columns})")
+            for col in INDEXED_COLUMNS:
+                if col in self.columns:
+                    index_name = _quote(f"idx_{worksheet_name}_{col}".replace(" ", "_").lower())
+                    self._conn.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON {table} ({_quote(col)})")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS _revisions (worksheet TEXT PRIMARY KEY, revision INTEGER NOT NULL)")
+            self._conn.execute("INSERT OR IGNORE INTO _revisions VALUES (?, 0)", (worksheet_name,))
+            bump = f"UPDATE _revisions SET revision = revision + 1 WHERE worksheet = {_literal(worksheet_name)}"
+            for event in ("INSERT", "UPDATE", "DELETE"):
+                trigger = _quote(f"rev_{worksheet_name}_{event}".replace(" ", "_").lower())
+                self._conn.execute(f"CREATE TRIGGER IF NOT EXISTS {trigger} AFTER {event} ON {table} BEGIN {bump}; END")
+            self._tables.add(worksheet_name)
+        return table
+
+
+def _quote(identifier):
+    """SQL identifier quoting"""
+    return '"' + str(identifier).replace('"', '""') + '"'
+
+
+def _known_changes(task_id, changes, columns):
+    """The changes whose column exists, logging the others"""
+    unknown = [col for col in changes if col not in columns]
+    if unknown:
+        logger.warning(f"Task ID {task_id}: columns not in table: {unknown}")
+    return {col: value for col, value in changes.items() if col not in unknown}
+
+
+def _literal(value):
+    """SQL string literal, for the trigger bodies that cannot take parameters"""
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def _text(value):
+    """Store every cell as text, like the sheet does"""
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return ''
+    return str(value)
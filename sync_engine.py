@@ -0,0 +1,353 @@
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+from task_schema import DEFAULT_TASK_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+LAST_WRITER_WINS = "last_writer_wins"
+FIELD_MERGE = "field_merge"
+
+
+@dataclass
+class SyncReport:
+    """What one sync pass changed on each side"""
+    pushed_adds: list = field(default_factory=list)
+    pushed_updates: list = field(default_factory=list)
+    pushed_deletes: list = field(default_factory=list)
+    pulled_adds: list = field(default_factory=list)
+    pulled_updates: list = field(default_factory=list)
+    pulled_deletes: list = field(default_factory=list)
+    conflicts: list = field(default_factory=list)  # (task_id, resolution) pairs
+    remote_pulled: bool = False
+    seconds: float = 0.0
+    lag_seconds: float = 0.0  # Longest a change synced in this pass may have waited
+
+
+class SyncEngine:
+    """Two-way sync between a local StorageBackend and the manager's Google Sheet
+
+    The engine remembers the last synced version of every row (its base),
+    keyed by Task ID, with a content hash and a version counter. Each `sync()`
+    first reads the cheap revision marker of both sides
+    (StorageBackend.revision()); a side whose marker has not moved since the
+    last pass is not read at all. A side that did move is loaded and hashed
+    in full, so that costs O(rows) for that side, and only rows whose hash
+    moved since the base are looked at further: writes, conflict handling
+    and bookkeeping scale with the number of changed rows. After writing to
+    a side the engine records its new marker, so its own pushes do not cause
+    a re-download on the next pass (an edit that lands between the push and
+    that read waits for the next marker change).
+
+    The base only advances for rows the backend reported as written. Rows
+    that failed keep their old base and both sides are reloaded on the next
+    pass, which retries them.
+
+    Rows changed on one side are copied to the other in batches (one
+    append, one batch update, and row deletes). Rows changed on both sides
+    are conflicts, resolved by `policy`:
+      - LAST_WRITER_WINS: the side whose change was seen last wins the row;
+        the remote side is timed by the sheet's last update time;
+      - FIELD_MERGE: fields changed on one side only are merged, and fields
+        changed on both sides fall back to last-writer-wins.
+    """
+
+    def __init__(self, manager, local, worksheet_name="Tasks", policy=LAST_WRITER_WINS,
+                 columns=DEFAULT_TASK_COLUMNS, key="Task ID", state_path=None):
+        if policy not in (LAST_WRITER_WINS, FIELD_MERGE):
+            raise ValueError(f"Unknown conflict policy: {policy}")
+        self.manager = manager
+        self.local = local
+        self.worksheet_name = worksheet_name
+        self.policy = policy
+        self.columns = list(columns)
+        self.key = key
+        self.state_path = state_path
+
+        self._base = {}  # task_id -> (hash, row dict, version)
+        # Revision marker per side as of the last pass; while it holds, that side equals the base
+        self._revisions = {"local": None, "remote": None}
+        self._local_edits = {}  # task_id -> time of the local edit, when the writer reported it
+        self._lock = threading.Lock()
+
+        self.syncs = 0
+        self.last_sync_at = None
+        self.last_report = None
+        self.totals = {"pushed": 0, "pulled": 0, "conflicts": 0}
+        self._load_state()
+
+    @property
+    def remote(self):
+        return self.manager.storage
+
+    def version(self, task_id):
+        """Sync version of a row (0 if it was never synced)"""
+        entry = self._base.get(str(task_id))
+        return entry[2] if entry else 0
+
+    def staleness(self):
+        """Seconds since the last successful sync, or None before the first one"""
+        return None if self.last_sync_at is None else time.time() - self.last_sync_at
+
+    def stats(self):
+        """Sync counters and lag metrics"""
+        report = self.last_report
+        return {
+            "syncs": self.syncs,
+            "rows_tracked": len(self._base),
+            "staleness_seconds": self.staleness(),
+            "last_duration_seconds": report.seconds if report else None,
+            "last_lag_seconds": report.lag_seconds if report else None,
+            **self.totals,
+        }
+
+    def note_local_change(self, task_id, at=None):
+        """Record when a row was edited locally, so last-writer-wins can use the real edit time
+
+        Changes that were not reported are timed when sync first sees them.
+        """
+        with self._lock:
+            self._local_edits[str(task_id)] = at if at is not None else time.time()
+
+    def sync(self):
+        """Run one two-way sync pass and return its SyncReport"""
+        with self._lock:
+            return self._sync()
+
+    def _sync(self):
+        started = time.time()
+        report = SyncReport()
+
+        local_df, local_revision = self._load_side("local", self.local)
+        remote_df, remote_revision = self._load_side("remote", self.remote)
+        report.remote_pulled = remote_df is not None
+        remote_at = None
+        if remote_df is not None:
+            remote_at = _parse_time(remote_revision) if remote_revision is not None else time.time()
+
+        local_changed = self._changed(local_df)
+        remote_changed = self._changed(remote_df)
+        local_at = {task_id: self._local_edits.get(task_id, started) for task_id in local_changed}
+
+        local_rows = self._rows(local_df, local_changed | remote_changed)
+        remote_rows = self._rows(remote_df, local_changed | remote_changed)
+
+        to_remote, to_local, merged = {}, {}, {}
+        for task_id in local_changed | remote_changed:
+            base = self._base.get(task_id, (None, None, 0))[1]
+            # A side that was not reloaded still holds the base row
+            local_row = local_rows.get(task_id) if local_df is not None else base
+            remote_row = remote_rows.get(task_id) if remote_df is not None else base
+            if task_id in local_changed and task_id in remote_changed and local_row != remote_row:
+                result, resolution = self._resolve(base, local_row, remote_row, local_at[task_id], remote_at)
+                report.conflicts.append((task_id, resolution))
+            elif task_id in local_changed:
+                result = local_row
+            else:
+                result = remote_row
+            merged[task_id] = result
+            if result != local_row:
+                to_local[task_id] = (local_row, result)
+            if result != remote_row:
+                to_remote[task_id] = (remote_row, result)
+
+        failed = self._apply(self.remote, to_remote, report, pushed=True)
+        failed |= self._apply(self.local, to_local, report, pushed=False)
+        if failed:
+            logger.warning(f"{len(failed)} row(s) could not be synced, retrying them next pass")
+            self._revisions = {"local": None, "remote": None}
+        else:
+            # Our own writes moved the markers; record them so the next pass does not reload for them
+            self._revisions = {
+                "local": self._revision(self.local) if to_local else local_revision,
+                "remote": self._revision(self.remote) if to_remote else remote_revision,
+            }
+
+        finished = time.time()
+        waited = [finished - edited_at for edited_at in local_at.values()]
+        if report.remote_pulled and remote_changed and remote_at is not None:
+            waited.append(finished - remote_at)
+
+        # The merged rows that reached both sides are the new common base
+        merged = {task_id: row for task_id, row in merged.items() if task_id not in failed}
+        kept = {task_id: row for task_id, row in merged.items() if row is not None}
+        hashes = self._hashes(self._frame(pd.DataFrame(list(kept.values()), columns=self.columns))) if kept else {}
+        for task_id, row in merged.items():
+            version = self._base.get(task_id, (None, None, 0))[2] + 1
+            if row is None:
+                self._base.pop(task_id, None)
+            else:
+                self._base[task_id] = (hashes[task_id], row, version)
+            self._local_edits.pop(task_id, None)
+
+        report.seconds = finished - started
+        report.lag_seconds = max(waited, default=0.0)
+        self._record(report, finished)
+        return report
+
+    def _load_side(self, side, backend):
+        """(frame, revision) of one side; the frame is None when its revision has not moved"""
+        revision = self._revision(backend)
+        if revision is not None and revision == self._revisions[side]:
+            return None, revision
+        # Read after the marker, so an edit in between shows up as a moved marker next pass
+        return self._frame(backend.load_tasks(self.worksheet_name)), revision
+
+    def _revision(self, backend):
+        try:
+            return backend.revision(self.worksheet_name)
+        except Exception as e:
+            logger.warning(f"Could not read {backend.name} revision, reloading: {str(e)}")
+            return None
+
+    def _changed(self, df):
+        """Task IDs of a freshly loaded side that differ from the base (none when it was not reloaded)"""
+        if df is None:
+            return set()
+        hashes = self._hashes(df)
+        changed = {task_id for task_id, value in hashes.items()
+                   if task_id not in self._base or self._base[task_id][0] != value}
+        changed.update(task_id for task_id in self._base if task_id not in hashes)
+        return changed
+
+    def _resolve(self, base, local_row, remote_row, local_at, remote_at):
+        """Pick the surviving row for a conflict; returns (row, resolution label)"""
+        local_wins = remote_at is None or local_at > remote_at
+        if self.policy == LAST_WRITER_WINS or base is None or local_row is None or remote_row is None:
+            return (local_row, "local") if local_wins else (remote_row, "remote")
+
+        merged = dict(base)
+        clashed = False
+        for col in self.columns:
+            local_value, remote_value, base_value = local_row.get(col, ''), remote_row.get(col, ''), base.get(col, '')
+            if local_value == remote_value:
+                merged[col] = local_value
+            elif local_value == base_value:
+                merged[col] = remote_value
+            elif remote_value == base_value:
+                merged[col] = local_value
+            else:
+                clashed = True
+                merged[col] = local_value if local_wins else remote_value
+        return merged, "merged with field clash" if clashed else "merged"
+
+    def _apply(self, backend, changes, report, pushed):
+        """Write {task_id: (current row, wanted row)} to one side in batches; returns the Task IDs not written"""
+        adds, updates, deletes = {}, {}, []
+        for task_id, (current, wanted) in changes.items():
+            if wanted is None:
+                deletes.append(task_id)
+            elif current is None:
+                adds[task_id] = wanted
+            else:
+                updates[task_id] = {col: value for col, value in wanted.items() if current.get(col) != value}
+
+        failed = set()
+        if updates:
+            try:
+                results = backend.update_tasks(self.worksheet_name, updates)
+                failed.update(task_id for task_id in updates if not results.get(task_id, False))
+            except Exception as e:
+                logger.error(f"Failed to sync {len(updates)} update(s) to {backend.name}: {str(e)}")
+                failed.update(updates)
+        deleted = []
+        for task_id in deletes:
+            try:
+                backend.delete_task(self.worksheet_name, task_id)  # False means it is already gone
+                deleted.append(task_id)
+            except Exception as e:
+                logger.error(f"Failed to sync delete of {task_id} to {backend.name}: {str(e)}")
+                failed.add(task_id)
+        if adds:
+            try:
+                backend.append_tasks(self.worksheet_name, list(adds.values()))
+            except Exception as e:
+                logger.error(f"Failed to sync {len(adds)} new row(s) to {backend.name}: {str(e)}")
+                failed.update(adds)
+
+        added = [task_id for task_id in adds if task_id not in failed]
+        updated = [task_id for task_id in updates if task_id not in failed]
+        if pushed:
+            report.pushed_adds, report.pushed_updates, report.pushed_deletes = added, updated, deleted
+        else:
+            report.pulled_adds, report.pulled_updates, report.pulled_deletes = added, updated, deleted
+        return failed
+
+    def _frame(self, df):
+        """All-text frame with the engine's columns, one row per Task ID"""
+        df = df.reindex(columns=self.columns).astype(object).where(lambda d: d.notna(), '').astype(str)
+        duplicated = df[self.key].duplicated()
+        if duplicated.any():
+            logger.warning(f"Ignoring {int(duplicated.sum())} duplicate Task ID row(s) during sync")
+            df = df[~duplicated]
+        df.index = df[self.key].to_numpy()
+        return df
+
+    def _hashes(self, df):
+        values = pd.util.hash_pandas_object(df, index=False).to_numpy()
+        return dict(zip(df.index, (int(value) for value in values)))
+
+    def _rows(self, df, task_ids):
+        """Row dicts for the requested Task IDs only"""
+        if df is None:
+            return {}
+        present = [task_id for task_id in task_ids if task_id in df.index]
+        return {task_id: row for task_id, row in zip(present, df.loc[present].to_dict('records'))}
+
+    def _record(self, report, finished):
+        self.syncs += 1
+        self.last_sync_at = finished
+        self.last_report = report
+        pushed = len(report.pushed_adds) + len(report.pushed_updates) + len(report.pushed_deletes)
+        pulled = len(report.pulled_adds) + len(report.pulled_updates) + len(report.pulled_deletes)
+        self.totals["pushed"] += pushed
+        self.totals["pulled"] += pulled
+        self.totals["conflicts"] += len(report.conflicts)
+        if pushed or pulled:
+            logger.info(
+                f"Sync pushed {pushed}, pulled {pulled} row(s), {len(report.conflicts)} conflict(s) "
+                f"in {report.seconds:.3f}s (lag {report.lag_seconds:.1f}s)"
+            )
+            self._save_state()
+
+    def _save_state(self):
+        """Persist the base rows and versions when a state path is configured"""
+        if not self.state_path:
+            return
+        try:
+            tmp_path = f"{self.state_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({task_id: [row, version] for task_id, (_, row, version) in self._base.items()}, f)
+            os.replace(tmp_path, self.state_path)
+        except Exception as e:
+            logger.error(f"Failed to save sync state: {str(e)}")
+
+    def _load_state(self):
+        if not self.state_path or not os.path.exists(self.state_path):
+            return
+        try:
+            with open(self.state_path, encoding="utf-8") as f:
+                data = json.load(f)
+            # Hashes are recomputed the same way live rows are hashed
+            rows = pd.DataFrame([row for row, _ in data.values()], columns=self.columns)
+            hashes = self._hashes(self._frame(rows)) if len(rows) else {}
+            self._base = {task_id: (hashes[task_id], row, version) for task_id, (row, version) in data.items()}
+        except Exception as e:
+            logger.error(f"Failed to load sync state: {str(e)}")
+            self._base = {}
+
+
+def _parse_time(token):
+    """Epoch seconds from a Drive modifiedTime / lastUpdateTime string, or now for other markers"""
+    if not isinstance(token, str):
+        return time.time()
+    try:
+        return pd.Timestamp(token).timestamp()
+    except Exception:
+        return time.time()
@@ -0,0 +1,83 @@
+import pandas as pd
+
+CARD_PAGE_SIZES = [10, 25, 50, 100]
+
+
+def page_bounds(total, page, page_size):
+    """(start, stop) row positions of a 1-based page"""
+    start = max(0, (page - 1) * page_size)
+    return start, min(start + page_size, total)
+
+
+def page_count(total, page_size):
+    """Number of pages needed for `total` rows (at least one)"""
+    return max(1, -(-total // page_size))
+
+
+def render_cards_html(df):
+    """HTML for one page of task cards, assembled column-wise instead of row by row
+
+    Every field is turned into an escaped text Series first and the cards are
+    then concatenated as whole columns, so the cost is a handful of vectorized
+    string operations per page regardless of which rows are on it.
+    """
+    if df.empty:
+        return ''
+
+    priority = _text(df, 'Priority', 'medium')
+    status = _text(df, 'Status', 'todo')
+    priority_class = 'priority-' + _css_token(priority)
+    status_class = 'status-' + _css_token(status)
+
+    cards = (
+        '<div class="task-card ' + priority_class + ' ' + status_class + '">'
+        '<div style="display: flex; justify-content: between; align-items: center;">'
+        '<h4 style="margin: 0; color: #1976d2;">🆔 ' + _text(df, 'Task ID') + ' - '
+        + _text(df, 'Task Description', 'No description') + '</h4>'
+        '<span style="background: #e3f2fd; padding: 5px 10px; border-radius: 15px; font-size: 12px; color: #1976d2;">'
+        + _text(df, 'Priority') + '</span>'
+        '</div>'
+        '<p style="margin: 10px 0; color: #666;">'
+        '<strong>👤 Executor:</strong> ' + _text(df, 'Executor') + ' | '
+        '<strong>🏢 Company:</strong> ' + _text(df, 'Company') + ' | '
+        '<strong>📅 Date:</strong> ' + _text(df, 'Date') +
+        '</p>'
+        '<p style="margin: 10px 0; color: #666;">'
+        '<strong>📍 Section:</strong> ' + _text(df, 'Section') + ' | '
+        '<strong>🎯 Object:</strong> ' + _text(df, 'Object') + ' | '
+        '<strong>📊 Status:</strong> ' + _text(df, 'Status') +
+        '</p>'
+        '<p style="margin: 10px 0; color: #666;">'
+        '<strong>⏰ Reminder:</strong> ' + _text(df, 'Reminder Time') + ' | '
+        '<strong>📧 Sent:</strong> ' + _text(df, 'Reminder Sent') + ' | '
+        '<strong>👁️ Read:</strong> ' + _text(df, 'Reminder Read') +
+        '</p>'
+        '<p style="margin: 10px 0; color: #666;">'
+        '<strong>💬 Comment:</strong> ' + _text(df, 'Comment', 'No comment') +
+        '</p>'
+        '</div>'
+    )
+    return '\n'.join(cards.tolist())
+
+
+def _text(df, col, default='N/A'):
+    """Display text for a column as an HTML-escaped Series, with `default` for missing values"""
+    if col not in df.columns:
+        return pd.Series(default, index=df.index, dtype=object)
+    series = df[col]
+    if pd.api.types.is_datetime64_any_dtype(series):
+        text = series.dt.strftime('%Y-%m-%d')
+    elif pd.api.types.is_bool_dtype(series):
+        text = series.map({True: 'Yes', False: 'No'})
+    else:
+        text = series.astype('string')
+    text = text.astype('string').fillna(default).astype(object)
+    return (text.str.replace('&', '&amp;', regex=False)
+                .str.replace('<', '&lt;', regex=False)
+                .str.replace('>', '&gt;', regex=False)
+                .str.replace('"', '&quot;', regex=False))
+
+
+def _css_token(text):
+    """Lower-case class-name fragment with spaces and unsafe characters removed"""
+    return text.str.lower().str.replace(r'[^a-z0-9-]', '', regex=True)
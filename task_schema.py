@@ -0,0 +1,260 @@
+import hashlib
+import logging
+import time
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Column order used when a worksheet or table has no header row yet
+DEFAULT_TASK_COLUMNS = [
+    'Task ID', 'Executor', 'Date', 'Reminder Time', 'Task Description', 'Object',
+    'Section', 'Priority', 'Executor ID', 'Company', 'Reminder Sent',
+    'Reminder Sent Date', 'Reminder Read', 'Read Time', 'Reminder Count',
+    'Reminder Interval if No Report', 'Status', 'Comment', 'Report Date'
+]
+
+# Single source of truth for how Tasks sheet columns are typed at load time
+CATEGORY_COLUMNS = ['Priority', 'Status', 'Company', 'Executor', 'Section']
+DATE_COLUMNS = ['Date', 'Reminder Sent Date', 'Report Date']
+BOOLEAN_COLUMNS = ['Reminder Sent', 'Reminder Read']
+INTEGER_COLUMNS = ['Reminder Count']
+
+# Typed columns whose sheet text cannot be rebuilt from the parsed value ('2 times' -> 2);
+# apply_task_schema keeps the original text, as a categorical, in the named column
+SHEET_TEXT_COLUMNS = {'Reminder Count': 'reminder_count_text'}
+
+# Boolean flag columns derived once per data version by add_task_flags
+FLAG_COLUMNS = ['is_completed', 'is_in_progress', 'is_high_priority', 'reminder_sent', 'reminder_read', 'is_unread']
+
+_TRUE_VALUES = {'yes', 'y', 'true', '1'}
+_FALSE_VALUES = {'no', 'n', 'false', '0'}
+
+
+def apply_task_schema(df):
+    """Return a copy of a raw task frame with compact, parsed column types
+
+    Low-cardinality text becomes categorical, dates become datetime64,
+    Reminder Count becomes a nullable integer and Yes/No columns become
+    nullable booleans. Columns that are missing are skipped and columns that
+    already have their target type are left alone, so the call is idempotent.
+    """
+    typed = df.copy()
+    for col in CATEGORY_COLUMNS:
+        if col in typed.columns and not isinstance(typed[col].dtype, pd.CategoricalDtype):
+            typed[col] = typed[col].astype('category')
+
+    for col in DATE_COLUMNS:
+        if col in typed.columns and not pd.api.types.is_datetime64_any_dtype(typed[col]):
+            typed[col] = pd.to_datetime(typed[col], errors='coerce', format='mixed')
+
+    for col in BOOLEAN_COLUMNS:
+        if col in typed.columns and not pd.api.types.is_bool_dtype(typed[col]):
+            typed[col] = _to_boolean(typed[col])
+
+    for col in INTEGER_COLUMNS:
+        if col in typed.columns and not pd.api.types.is_integer_dtype(typed[col]):
+            if col in SHEET_TEXT_COLUMNS:
+                typed[SHEET_TEXT_COLUMNS[col]] = _text(typed[col]).astype('category')
+            digits = typed[col].astype(str).str.extract(r'(\d+)', expand=False)
+            typed[col] = pd.to_numeric(digits, errors='coerce').astype('Int32')
+
+    return typed
+
+
+def add_task_flags(df):
+    """Return a copy of a typed task frame with the FLAG_COLUMNS masks precomputed
+
+    Pattern matching on categorical columns runs once per category rather than
+    once per row, so the cost is one regex pass over the distinct values plus a
+    vectorized lookup. Frames that already carry the flags are returned as-is.
+    """
+    if all(col in df.columns for col in FLAG_COLUMNS):
+        return df
+    flagged = df.copy()
+    flagged['is_completed'] = _pattern_mask(df, 'Status', 'Completed|Done')
+    flagged['is_in_progress'] = _pattern_mask(df, 'Status', 'Progress|Doing')
+    flagged['is_high_priority'] = _pattern_mask(df, 'Priority', 'High')
+    flagged['reminder_sent'] = is_true(df['Reminder Sent']) if 'Reminder Sent' in df.columns else False
+    flagged['reminder_read'] = is_true(df['Reminder Read']) if 'Reminder Read' in df.columns else False
+    read_false = is_false(df['Reminder Read']) if 'Reminder Read' in df.columns else False
+    flagged['is_unread'] = flagged['reminder_sent'] & read_false
+    return flagged
+
+
+def normalize_tasks(df):
+    """Type a raw task frame and precompute its flag columns"""
+    return add_task_flags(apply_task_schema(df))
+
+
+def frame_version(df):
+    """Content hash of a frame, used as the cache key for everything derived from it"""
+    hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    digest = hashlib.sha1(hashes.tobytes())
+    digest.update('\x1f'.join(map(str, df.columns)).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def without_flags(df):
+    """Drop the derived flag and kept-text columns, e.g. before displaying a frame"""
+    return df.drop(columns=FLAG_COLUMNS + list(SHEET_TEXT_COLUMNS.values()), errors='ignore')
+
+
+def to_sheet_text(df):
+    """Render a typed task frame back as the text the sheet holds, for exports and write-backs
+
+    Yes/No columns become 'Yes'/'No', dates YYYY-MM-DD and categoricals plain
+    text, with '' for missing values. Reminder Count keeps its original text
+    (e.g. '2 times') unless the count itself was changed. Derived columns are
+    dropped, so the result has the sheet's columns only.
+    """
+    text = without_flags(df)
+    for col in BOOLEAN_COLUMNS:
+        if col in text.columns and pd.api.types.is_bool_dtype(text[col]):
+            values = text[col]
+            text[col] = np.where(is_true(values), 'Yes', np.where(is_false(values), 'No', ''))
+    for col in DATE_COLUMNS:
+        if col in text.columns and pd.api.types.is_datetime64_any_dtype(text[col]):
+            text[col] = text[col].dt.strftime('%Y-%m-%d').astype(object).fillna('')
+    for col in INTEGER_COLUMNS:
+        if col in text.columns and pd.api.types.is_integer_dtype(text[col]):
+            counts = text[col].astype(object).where(text[col].notna(), '').astype(str)
+            kept = SHEET_TEXT_COLUMNS.get(col)
+            if kept in df.columns:
+                original = _text(df[kept])
+                unchanged = original.str.extract(r'(\d+)', expand=False).fillna('').eq(counts)
+                counts = original.where(unchanged, counts)
+            text[col] = counts.to_numpy(dtype=object)
+    for col in CATEGORY_COLUMNS:
+        if col in text.columns and isinstance(text[col].dtype, pd.CategoricalDtype):
+            text[col] = _text(text[col]).to_numpy(dtype=object)
+    return text
+
+
+def _text(series):
+    """Cell values as plain strings, '' for missing"""
+    return series.astype(object).where(series.notna(), '').astype(str)
+
+
+def _pattern_mask(df, col, pattern):
+    """Case-insensitive regex match of a column as a numpy mask, evaluated per category"""
+    if col not in df.columns:
+        return np.zeros(len(df), dtype=bool)
+    series = df[col]
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        hits = series.cat.categories.astype(str).str.contains(pattern, case=False, regex=True)
+        lookup = np.append(np.asarray(hits, dtype=bool), False)  # code -1 (missing) maps to the trailing False
+        return lookup[series.cat.codes.to_numpy()]
+    return series.astype(str).str.contains(pattern, case=False, na=False).to_numpy(dtype=bool)
+
+
+def _to_boolean(series):
+    """Map Yes/No style text to a nullable boolean; anything else becomes <NA>"""
+    text = series.astype(str).str.strip().str.lower()
+    result = pd.Series(pd.NA, index=series.index, dtype='boolean')
+    result[text.isin(_TRUE_VALUES)] = True
+    result[text.isin(_FALSE_VALUES)] = False
+    return result
+
+
+def is_true(series):
+    """Plain numpy mask of rows where a boolean column is True (NA counts as False)"""
+    return series.eq(True).fillna(False).to_numpy(dtype=bool)
+
+
+def is_false(series):
+    """Plain numpy mask of rows where a boolean column is False (NA counts as False)"""
+    return series.eq(False).fillna(False).to_numpy(dtype=bool)
+
+
+def value_counts(series):
+    """value_counts without the zero-count rows a categorical reports for unused categories"""
+    counts = series.value_counts()
+    return counts[counts > 0]
+
+
+def format_yes_no(value):
+    """Render a boolean cell back as the Yes/No text used in the sheet"""
+    if pd.isna(value):
+        return 'N/A'
+    return 'Yes' if value else 'No'
+
+
+def format_date(value):
+    """Render a datetime cell as YYYY-MM-DD for display"""
+    if pd.isna(value):
+        return 'N/A'
+    return value.strftime('%Y-%m-%d') if hasattr(value, 'strftime') else str(value)
+
+
+def _synthetic_tasks(n_rows, seed=0):
+    """Raw, all-text task frame shaped like the Tasks sheet export"""
+    rng = np.random.default_rng(seed)
+    dates = pd.Timestamp('2025-01-01') + pd.to_timedelta(rng.integers(0, 365, n_rows), unit='D')
+    date_text = dates.strftime('%Y-%m-%d').to_numpy(dtype=object)
+    return pd.DataFrame({
+        'Task ID': [f'ID{i}' for i in range(n_rows)],
+        'Executor': rng.choice([f'Executor {i}' for i in range(50)], n_rows).astype(object),
+        'Date': date_text,
+        'Task Description': [f'Task description {i}' for i in range(n_rows)],
+        'Section': rng.choice([f'Section {c}' for c in 'ABCDEFGH'], n_rows).astype(object),
+        'Priority': rng.choice(['High', 'Medium', 'Low'], n_rows).astype(object),
+        'Company': rng.choice([f'Company {i}' for i in range(20)], n_rows).astype(object),
+        'Reminder Sent': rng.choice(['Yes', 'No'], n_rows).astype(object),
+        'Reminder Sent Date': date_text,
+        'Reminder Read': rng.choice(['Yes', 'No'], n_rows).astype(object),
+        'Reminder Count': rng.integers(0, 5, n_rows).astype(str).astype(object),
+        'Status': rng.choice(['Pending', 'In Progress', 'Completed'], n_rows).astype(object),
+        'Report Date': date_text,
+    })
+
+
+def schema_report(n_rows=100_000, repeat=5):
+    """Compare memory footprint and typical query times of a raw vs typed task frame
+
+    Returns a DataFrame with one row per measurement; run this module as a
+    script to print it.
+    """
+    raw = _synthetic_tasks(n_rows)
+    started = time.perf_counter()
+    typed = apply_task_schema(raw)
+    convert_seconds = time.perf_counter() - started
+
+    def timed(func):
+        best = float('inf')
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            best = min(best, time.perf_counter() - started)
+        return best * 1000
+
+    rows = [
+        ('Memory (MB)',
+         raw.memory_usage(deep=True).sum() / 1e6,
+         typed.memory_usage(deep=True).sum() / 1e6),
+        ('Completed count (ms)',
+         timed(lambda: raw['Status'].str.contains('Completed|Done', case=False, na=False).sum()),
+         timed(lambda: _pattern_mask(typed, 'Status', 'Completed|Done').sum())),
+        ('Reminders sent (ms)',
+         timed(lambda: raw['Reminder Sent'].str.contains('Yes', case=False, na=False).sum()),
+         timed(lambda: is_true(typed['Reminder Sent']).sum())),
+        ('Status value_counts (ms)',
+         timed(lambda: raw['Status'].value_counts()),
+         timed(lambda: value_counts(typed['Status']))),
+        ('Daily timeline (ms)',
+         timed(lambda: pd.to_datetime(raw['Date']).dt.date.value_counts()),
+         timed(lambda: typed['Date'].dt.normalize().value_counts())),
+        ('Avg reminder count (ms)',
+         timed(lambda: raw['Reminder Count'].astype(str).str.extract(r'(\d+)').astype(float).mean().iloc[0]),
+         timed(lambda: typed['Reminder Count'].mean())),
+    ]
+    report = pd.DataFrame(rows, columns=['Measurement', 'Raw', 'Typed'])
+    report['Ratio'] = report['Raw'] / report['Typed']
+    logger.info(f"Typed {n_rows} rows in {convert_seconds * 1000:.1f} ms")
+    return report
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    print(schema_report().to_string(index=False, float_format=lambda v: f'{v:.2f}'))
@@ -0,0 +1,115 @@
+import gspread
+
+from data_manager import EnhancedDataManager
+from snapshot_cache import SnapshotStore
+from task_schema import DEFAULT_TASK_COLUMNS
+
+
+class FakeWorksheet:
+    """In-memory stand-in for a gspread Worksheet that records every API call"""
+
+    def __init__(self, rows, title="Tasks"):
+        self.rows = [list(row) for row in rows]
+        self.title = title
+        self.id = 0
+        self.calls = []
+
+    def col_values(self, col):
+        self.calls.append('col_values')
+        return [row[col - 1] if len(row) >= col else '' for row in self.rows]
+
+    def row_values(self, row):
+        self.calls.append('row_values')
+        return list(self.rows[row - 1]) if row <= len(self.rows) else []
+
+    def get_all_values(self):
+        self.calls.append('get_all_values')
+        return [list(row) for row in self.rows]
+
+    def batch_get(self, ranges, **kwargs):
+        self.calls.append('batch_get')
+        values = []
+        for cell_range in ranges:
+            if cell_range == '1:1':
+                values.append([list(self.rows[0])] if self.rows else [])
+                continue
+            row, col = gspread.utils.a1_to_rowcol(cell_range)
+            value = self.rows[row - 1][col - 1] if row <= len(self.rows) and col <= len(self.rows[row - 1]) else ''
+            values.append([[value]] if value != '' else [])
+        return values
+
+    def batch_update(self, data, **kwargs):
+        self.calls.append('batch_update')
+        for entry in data:
+            row, col = gspread.utils.a1_to_rowcol(entry['range'].split(':')[0])
+            for i, values in enumerate(entry['values']):
+                for j, value in enumerate(values):
+                    self._set(row + i, col + j, value)
+
+    def append_rows(self, rows, **kwargs):
+        self.calls.append('append_rows')
+        self.rows.extend(list(row) for row in rows)
+
+    def delete_rows(self, start, end=None):
+        self.calls.append('delete_rows')
+        del self.rows[start - 1:end or start]
+
+    def _set(self, row, col, value):
+        while len(self.rows) < row:
+            self.rows.append([])
+        cells = self.rows[row - 1]
+        while len(cells) < col:
+            cells.append('')
+        cells[col - 1] = value
+
+
+class FakeSheet:
+    """Spreadsheet holding one FakeWorksheet; bump() moves its last-update time"""
+
+    def __init__(self, worksheet):
+        self.ws = worksheet
+        self.updates = 0
+
+    def worksheet(self, name):
+        return self.ws
+
+    def get_lastUpdateTime(self):
+        return f"2026-01-01T00:00:{self.updates:02d}Z"
+
+    def bump(self):
+        self.updates += 1
+
+
+def task_row(i, **values):
+    """One sheet row for task ID<i>, overriding columns by name"""
+    row = {
+        'Task ID': f'ID{i}', 'Executor': 'John', 'Date': '2025-08-05', 'Reminder Time': '09:00',
+        'Task Description': f'desc {i}', 'Object': 'O', 'Section': 'S', 'Priority': 'High',
+        'Executor ID': '1', 'Company': 'C', 'Reminder Sent': 'No', 'Reminder Sent Date': '',
+        'Reminder Read': 'No', 'Read Time': '', 'Reminder Count': '0',
+        'Reminder Interval if No Report': '24h', 'Status': 'Pending', 'Comment': '', 'Report Date': '',
+    }
+    row.update(values)
+    return [row[col] for col in DEFAULT_TASK_COLUMNS]
+
+
+def make_worksheet(n=5):
+    """Worksheet with the default header and tasks ID1..ID<n>"""
+    return FakeWorksheet([DEFAULT_TASK_COLUMNS] + [task_row(i) for i in range(1, n + 1)])
+
+
+def make_manager(worksheet, snapshot_dir):
+    """EnhancedDataManager writing to `worksheet` as if it were authenticated"""
+    manager = EnhancedDataManager(snapshot_store=SnapshotStore(str(snapshot_dir)))
+    manager.gc = object()
+    manager.sheet = FakeSheet(worksheet)
+    return manager
+
+
+def cell(worksheet, task_id, column):
+    """Current value of one cell, looked up by Task ID and header name"""
+    header = worksheet.rows[0]
+    for row in worksheet.rows[1:]:
+        if row[header.index('Task ID')] == task_id:
+            return row[header.index(column)]
+    return None
@@ -0,0 +1,139 @@
+import pytest
+
+from data_manager import UPDATE_NOT_WRITTEN
+from tests.fake_sheet import cell, make_manager, make_worksheet, task_row
+
+
+class RecordingWebhooks:
+    """Stands in for a WebhookDispatcher and keeps what was published"""
+
+    def __init__(self):
+        self.events = []
+
+    def publish_task(self, kind, task_id, data=None):
+        self.events.append((kind, task_id))
+
+
+@pytest.fixture
+def worksheet():
+    return make_worksheet(5)
+
+
+@pytest.fixture
+def manager(worksheet, tmp_path):
+    manager = make_manager(worksheet, tmp_path)
+    yield manager
+    manager.disable_write_behind()
+
+
+def new_task(task_id):
+    return {'Task ID': task_id, 'Executor': 'Jane', 'Task Description': 'new'}
+
+
+def test_update_task_writes_all_fields_in_one_request(manager, worksheet):
+    assert manager.update_task('ID3', {'Status': 'Done', 'Comment': 'ok', 'Priority': 'Low'})
+    assert worksheet.calls.count('batch_update') == 1
+    assert 'update_cell' not in worksheet.calls
+    assert [cell(worksheet, 'ID3', col) for col in ('Status', 'Comment', 'Priority')] == ['Done', 'ok', 'Low']
+
+    # A warm row index only reads back the resolved cells, never the whole column
+    worksheet.calls.clear()
+    manager.bulk_update_tasks({'ID1': {'Status': 'Done'}, 'ID5': {'Status': 'Done'}})
+    assert worksheet.calls == ['batch_get', 'batch_update']
+
+
+def test_bulk_update_reports_unknown_ids(manager, worksheet):
+    results = manager.bulk_update_tasks({'ID2': {'Status': 'Done'}, 'NOPE': {'Status': 'Done'}})
+    assert results == {'ID2': True, 'NOPE': False}
+    assert cell(worksheet, 'ID2', 'Status') == 'Done'
+
+
+def test_update_skips_unknown_columns(manager, worksheet):
+    results = manager.bulk_update_tasks({'ID1': {'Statuss': 'Done'}, 'ID2': {'Status': 'Done', 'Colour': 'red'}})
+    assert results == {'ID1': False, 'ID2': True}
+    assert cell(worksheet, 'ID1', 'Status') == 'Pending'
+    assert cell(worksheet, 'ID2', 'Status') == 'Done'
+    assert len(worksheet.rows[0]) == 19
+
+
+def test_delete_task_keeps_row_index_in_step(manager, worksheet):
+    assert manager.delete_task('ID2')
+    worksheet.rows.append(task_row(9))
+    assert manager.update_task('ID9', {'Status': 'Done'})  # Unknown ID rebuilds the index
+    assert manager.update_task('ID4', {'Status': 'Done'})
+    assert cell(worksheet, 'ID4', 'Status') == 'Done'
+    assert cell(worksheet, 'ID9', 'Status') == 'Done'
+    assert cell(worksheet, 'ID3', 'Status') == 'Pending'
+
+
+
+def test_update_follows_reordered_header(manager, worksheet):
+    manager.update_task('ID1', {'Status': 'Seen'})  # Caches the header
+    header = worksheet.rows[0]
+    status, comment = header.index('Status'), header.index('Comment')
+    for row in worksheet.rows:
+        row[status], row[comment] = row[comment], row[status]
+
+    manager.update_task('ID2', {'Status': 'Done'})
+    assert cell(worksheet, 'ID2', 'Status') == 'Done'
+    assert cell(worksheet, 'ID2', 'Comment') == ''
+
+
+def test_write_behind_coalesces_per_task(manager, worksheet):
+    queue = manager.enable_write_behind(flush_interval=60)
+    manager.update_task('ID1', {'Status': 'In Progress'})
+    manager.update_task('ID1', {'Status': 'Done', 'Comment': 'finished'})
+    manager.add_task(new_task('TMP'))
+    manager.delete_task('TMP')  # Cancels the queued add
+    manager.add_task(new_task('N1'))
+    assert queue.depth == 2
+
+    assert queue.flush(timeout=10)
+    assert worksheet.calls.count('batch_update') == 1
+    assert worksheet.calls.count('append_rows') == 1
+    assert 'delete_rows' not in worksheet.calls
+    assert cell(worksheet, 'ID1', 'Status') == 'Done'
+    assert cell(worksheet, 'ID1', 'Comment') == 'finished'
+    assert cell(worksheet, 'TMP', 'Status') is None
+    assert cell(worksheet, 'N1', 'Executor') == 'Jane'
+
+
+def test_write_behind_dead_letters_unwritable_mutations(manager, worksheet):
+    queue = manager.enable_write_behind(flush_interval=60)
+    manager.update_task('NOPE', {'Status': 'Done'})
+    manager.update_task('ID2', {'Status': 'Done'})
+    assert queue.flush(timeout=10)
+
+    stats = queue.stats()
+    assert stats['dropped'] == 1
+    assert [(entry['task_id'], entry['error']) for entry in stats['dead_letters']] == [('NOPE', UPDATE_NOT_WRITTEN)]
+    assert cell(worksheet, 'ID2', 'Status') == 'Done'
+
+
+def test_add_tasks_skips_existing_and_repeated_ids(manager, worksheet):
+    report = manager.add_tasks([new_task('ID1'), new_task('N1'), new_task('N1'), {'Task ID': 'N2'}])
+    assert report['added'] == ['N1']
+    assert report['skipped'] == ['ID1', 'N1']
+    assert [entry['row'] for entry in report['failed']] == [3]
+    assert len(worksheet.rows) == 7
+
+
+def test_add_tasks_skips_ids_waiting_in_write_behind_queue(manager, worksheet):
+    queue = manager.enable_write_behind(flush_interval=60)
+    manager.add_task(new_task('N1'))
+    report = manager.add_tasks([new_task('N1'), new_task('N2')])
+    assert report['skipped'] == ['N1']
+
+    assert queue.flush(timeout=10)
+    assert [row[0] for row in worksheet.rows].count('N1') == 1
+
+
+def test_write_behind_publishes_events_after_flush(manager):
+    manager.webhooks = RecordingWebhooks()
+    queue = manager.enable_write_behind(flush_interval=60)
+    manager.update_task('ID1', {'Status': 'Done'})
+    manager.update_task('NOPE', {'Status': 'Done'})
+    assert manager.webhooks.events == []
+
+    assert queue.flush(timeout=10)
+    assert manager.webhooks.events == [('update', 'ID1')]
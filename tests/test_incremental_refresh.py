@@ -0,0 +1,75 @@
+import io
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+from incremental_refresh import IncrementalTaskLoader
+from task_schema import DEFAULT_TASK_COLUMNS
+from tests.fake_sheet import make_worksheet
+
+
+class FakeTransport:
+    """Serves the worksheet as a CSV export and parses it the way HttpTransport does"""
+
+    def __init__(self, worksheet):
+        self.worksheet = worksheet
+        self.downloads = 0
+
+    def get(self, url, headers=None, stream=False):
+        self.downloads += 1
+        body = pd.DataFrame(self.worksheet.rows[1:], columns=self.worksheet.rows[0]).to_csv(index=False)
+        return SimpleNamespace(status_code=200, headers={}, body=body, raise_for_status=lambda: None)
+
+    def release(self, response):
+        pass
+
+    def parse_csv(self, response, **read_csv_options):
+        return pd.read_csv(io.StringIO(response.body), **read_csv_options)
+
+
+@pytest.fixture
+def worksheet():
+    worksheet = make_worksheet(5)
+    for i, row in enumerate(worksheet.rows[1:]):
+        row[DEFAULT_TASK_COLUMNS.index('Reminder Count')] = str(i)  # Reads as an int column
+    return worksheet
+
+
+@pytest.fixture
+def loader(worksheet):
+    revision = iter(range(1000))
+    loader = IncrementalTaskLoader("https://example.invalid/export.csv", change_token=lambda: next(revision),
+                                   transport=FakeTransport(worksheet))
+    loader.refresh()
+    return loader
+
+
+def set_cell(worksheet, row, column, value):
+    worksheet.rows[row][DEFAULT_TASK_COLUMNS.index(column)] = value
+
+
+def test_cell_that_no_longer_parses_as_a_number_is_merged(loader, worksheet):
+    set_cell(worksheet, 3, 'Reminder Count', '3 times')
+    result = loader.refresh()
+    assert result.updated == ['ID3']
+    assert result.df.loc[result.df['Task ID'] == 'ID3', 'Reminder Count'].tolist() == ['3 times']
+
+    # The marker was recorded, so an unchanged sheet is not merged again
+    assert loader.refresh().updated == []
+
+
+def test_clearing_a_cell_only_updates_its_row(loader, worksheet):
+    set_cell(worksheet, 2, 'Reminder Count', '')
+    result = loader.refresh()
+    assert (result.added, result.updated, result.removed) == ([], ['ID2'], [])
+    assert result.df['Reminder Count'].tolist() == ['0', '', '2', '3', '4']
+
+
+def test_added_and_removed_rows(loader, worksheet):
+    del worksheet.rows[1]
+    worksheet.rows.append(list(worksheet.rows[-1]))
+    set_cell(worksheet, len(worksheet.rows) - 1, 'Task ID', 'ID9')
+    result = loader.refresh()
+    assert (result.added, result.updated, result.removed) == (['ID9'], [], ['ID1'])
+    assert result.df['Task ID'].tolist() == ['ID2', 'ID3', 'ID4', 'ID5', 'ID9']
@@ -0,0 +1,105 @@
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+from ingestion_api import MAX_BODY_BYTES, SKIPPED, WRITTEN, create_app
+from tests.fake_sheet import cell, make_manager, make_worksheet
+
+
+def post(app, body):
+    """POST /tasks through the ASGI app; returns (status, JSON body)"""
+    messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(app({'type': 'http', 'method': 'POST', 'path': '/tasks'}, receive, send))
+    return sent[0]['status'], json.loads(sent[1]['body'])
+
+
+def post_json(app, payload):
+    return post(app, json.dumps(payload).encode('utf-8'))
+
+
+def update(task_id, **changes):
+    return {'action': 'update', 'task_id': task_id, 'changes': changes}
+
+
+@pytest.fixture
+def worksheet():
+    return make_worksheet(5)
+
+
+@pytest.fixture
+def manager(worksheet, tmp_path):
+    return make_manager(worksheet, tmp_path)
+
+
+@pytest.fixture
+def app(manager):
+    app = create_app(manager, batch_window=0.01)
+    yield app
+    app.service.close(timeout=5)
+
+
+def test_commands_are_written_in_batches(app, worksheet):
+    status, body = post_json(app, [
+        {'action': 'create', 'task': {'Task ID': 'N1', 'Executor': 'Jane', 'Task Description': 'new'}},
+        {'action': 'create', 'task': {'Task ID': 'ID1', 'Executor': 'Jane', 'Task Description': 'dup'}},
+        update('ID2', Status='Done'),
+        {'action': 'bogus'},
+    ])
+    assert status == 202
+    assert body['receipt_ids'][3] is None
+    assert body['errors'] == [{'index': 3, 'error': 'Unknown action: bogus'}]
+
+    assert app.service.flush(timeout=5)
+    states = [app.service.receipt(receipt_id)['status'] for receipt_id in body['receipt_ids'][:3]]
+    assert states == [WRITTEN, SKIPPED, WRITTEN]
+    assert cell(worksheet, 'ID2', 'Status') == 'Done'
+    assert cell(worksheet, 'N1', 'Executor') == 'Jane'
+
+
+def test_oversized_body_is_413(app):
+    status, _ = post(app, b' ' * (MAX_BODY_BYTES + 1))
+    assert status == 413
+
+
+def test_update_with_unknown_column_is_422(app):
+    status, body = post_json(app, update('ID1', Statuss='Done'))
+    assert status == 422
+    assert 'Statuss' in body['errors'][0]['error']
+
+
+def test_list_that_does_not_fit_is_not_queued_at_all(manager):
+    release = threading.Event()
+    write = manager.bulk_update_tasks
+
+    def blocked_write(*args, **kwargs):
+        release.wait(5)
+        return write(*args, **kwargs)
+
+    manager.bulk_update_tasks = blocked_write
+    app = create_app(manager, batch_window=0.0, max_queue=3)
+    try:
+        assert post_json(app, update('ID1', Status='a'))[0] == 202
+        deadline = time.monotonic() + 5
+        while app.service.stats()['queue_depth'] and time.monotonic() < deadline:
+            time.sleep(0.01)  # Wait until the writer holds it
+
+        assert post_json(app, [update('ID2', Status='b')] * 2)[0] == 202
+        status, body = post_json(app, [update('ID3', Status='c')] * 2)
+        assert status == 503
+        assert 'receipt_ids' not in body
+        assert app.service.stats()['queue_depth'] == 2
+    finally:
+        release.set()
+        app.service.close(timeout=5)
+    assert app.service.stats()['accepted'] == 3
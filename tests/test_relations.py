@@ -0,0 +1,37 @@
+import os
+
+import pandas as pd
+import pytest
+
+from relations import RelationalModel
+from tests.fake_sheet import make_worksheet, task_row
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def frames():
+    return {name: pd.read_csv(os.path.join(REPO, f"{name.lower()}.csv"), dtype=str, keep_default_na=False)
+            for name in ('Projects', 'Tasks', 'Clients', 'Teams')}
+
+
+def test_csv_layout_links_tasks_to_projects(frames):
+    model = RelationalModel(frames)
+    assert model.layout == 'csv'
+    assert model.violations.empty
+    assert model.member('John Doe')['tasks'] == 2
+    assert model.task_view['Project Client Name'].iloc[0] == 'Client X'
+
+
+def test_sheet_layout_links_tasks_through_executor(frames):
+    worksheet = make_worksheet(2)
+    worksheet.rows[1][1] = 'John Doe'
+    worksheet.rows.append(task_row(3, Executor='Jane Smith', Status='Completed'))
+    frames['Tasks'] = pd.DataFrame(worksheet.rows[1:], columns=worksheet.rows[0])
+
+    model = RelationalModel(frames)
+    assert model.layout == 'sheet'
+    # Only the executor missing from Teams is a problem; no project column is expected
+    assert model.violations[['Row', 'Column', 'Value']].values.tolist() == [[1, 'Executor', 'John']]
+    assert model.member('John Doe')['open_tasks'] == 1
+    assert model.member('Jane Smith')['completed_tasks'] == 1
@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+
+from search_index import SearchEngine, SearchIndex
+
+
+def descriptions(df, rows):
+    return df['Task Description'].iloc[rows].tolist()
+
+
+def test_exact_token_outranks_prefix_expansions():
+    df = pd.DataFrame({'Task Description': ['Fix reporting bug', 'Write report', 'Weekly reports', 'Misc'],
+                       'Comment': ['', '', '', 'report']})
+    rows, scores = SearchIndex(df).search('report')
+    assert descriptions(df, rows)[:2] == ['Write report', 'Misc']
+    assert set(descriptions(df, rows[2:])) == {'Fix reporting bug', 'Weekly reports'}
+    assert (np.diff(scores) <= 0).all()
+
+
+def test_prefix_and_fuzzy_matches():
+    df = pd.DataFrame({'Task Description': ['Database migration', 'Invoice client', 'Security audit']})
+    index = SearchIndex(df)
+    assert descriptions(df, index.search('migr')[0]) == ['Database migration']
+    assert descriptions(df, index.search('databse')[0]) == ['Database migration']
+    assert descriptions(df, index.search('invoice audit')[0]) == []
+
+
+def test_search_is_restricted_to_positions():
+    df = pd.DataFrame({'Task Description': ['report one', 'report two', 'report three'],
+                       'Executor': ['Ann', 'Bob', 'Ann']})
+    engine = SearchEngine()
+    rows = engine.search(df, 'v1', 'report', positions=np.array([1, 2]))
+    assert sorted(rows.tolist()) == [1, 2]
+    assert engine.search(df, 'v1', 'ann').tolist() == [0, 2]
+    assert engine.search(df, 'v1', '').tolist() == []
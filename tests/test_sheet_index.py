@@ -0,0 +1,43 @@
+import random
+
+from sheet_index import TaskRowIndex
+
+
+def column(ids):
+    return ['Task ID'] + list(ids)
+
+
+def test_incremental_checksum_matches_a_rebuild():
+    rng = random.Random(0)
+    index = TaskRowIndex()
+    index.build(column(f'ID{i}' for i in range(50)))
+    ids = list(index.ids)
+    for step in range(500):
+        if ids and rng.random() < 0.3:
+            task_id = rng.choice(ids)
+            index.remove(task_id)
+            ids.remove(task_id)
+        else:
+            task_id = f'ID{rng.randrange(80)}'  # Repeats exercise duplicate IDs
+            index.append(task_id)
+            ids.append(task_id)
+
+        assert index.verify(column(ids))
+    rebuilt = TaskRowIndex()
+    rebuilt.build(column(ids))
+    assert index.rows == rebuilt.rows
+
+
+def test_saves_are_batched(tmp_path):
+    path = str(tmp_path / 'rows.json')
+    index = TaskRowIndex(path, save_interval=60)
+    index.build(column(['A', 'B']))
+    index.append('C')
+    index.flush()  # Within save_interval of the build's save
+    assert index.dirty
+
+    index.flush(force=True)
+    loaded = TaskRowIndex(path)
+    loaded.load()
+    assert loaded.get('C') == 4
+    assert loaded.checksum == index.checksum
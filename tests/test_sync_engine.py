@@ -0,0 +1,129 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from storage_backends import SQLiteBackend
+from sync_engine import FIELD_MERGE, LAST_WRITER_WINS, SyncEngine
+
+
+class CountingBackend(SQLiteBackend):
+    """SQLite backend that counts full loads and can be told to fail writes"""
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.loads = 0
+        self.reject_updates = set()
+        self.fail_appends = False
+
+    def load_tasks(self, worksheet_name="Tasks"):
+        self.loads += 1
+        return super().load_tasks(worksheet_name)
+
+    def update_tasks(self, worksheet_name, updates):
+        results = super().update_tasks(
+            worksheet_name, {task_id: changes for task_id, changes in updates.items()
+                             if task_id not in self.reject_updates})
+        results.update({task_id: False for task_id in updates if task_id in self.reject_updates})
+        return results
+
+    def append_tasks(self, worksheet_name, rows):
+        if self.fail_appends:
+            raise RuntimeError("append rejected")
+        return super().append_tasks(worksheet_name, rows)
+
+
+@pytest.fixture
+def local(tmp_path):
+    backend = CountingBackend(str(tmp_path / "local.db"))
+    backend.append_tasks("Tasks", [{'Task ID': f'T{i}', 'Status': 'Open', 'Comment': ''} for i in range(5)])
+    return backend
+
+
+@pytest.fixture
+def remote(tmp_path):
+    return CountingBackend(str(tmp_path / "remote.db"))
+
+
+def make_engine(local, remote, policy=LAST_WRITER_WINS):
+    engine = SyncEngine(SimpleNamespace(storage=remote), local, policy=policy)
+    engine.sync()
+    return engine
+
+
+def field(backend, task_id, column):
+    return backend.query_tasks("Tasks", {'Task ID': [task_id]})[column].tolist()[0]
+
+
+def test_first_pass_copies_rows_and_idle_pass_reads_nothing(local, remote):
+    engine = make_engine(local, remote)
+    assert len(remote.load_tasks()) == 5
+
+    local.loads = remote.loads = 0
+    report = engine.sync()
+    assert (local.loads, remote.loads) == (0, 0)
+    assert not report.remote_pulled
+    assert report.pushed_updates == report.pulled_updates == report.conflicts == []
+
+
+def test_one_sided_changes_flow_both_ways(local, remote):
+    engine = make_engine(local, remote)
+    local.update_tasks("Tasks", {'T1': {'Status': 'Done'}})
+    remote.update_tasks("Tasks", {'T2': {'Comment': 'from sheet'}})
+    remote.delete_task("Tasks", 'T3')
+
+    report = engine.sync()
+    assert report.pushed_updates == ['T1']
+    assert report.pulled_updates == ['T2']
+    assert report.pulled_deletes == ['T3']
+    assert field(remote, 'T1', 'Status') == 'Done'
+    assert field(local, 'T2', 'Comment') == 'from sheet'
+    assert len(local.load_tasks()) == 4
+
+
+@pytest.mark.parametrize("local_edit_offset, winner", [(-3600, 'remote'), (3600, 'local')])
+def test_last_writer_wins_conflict(local, remote, local_edit_offset, winner):
+    engine = make_engine(local, remote)
+    local.update_tasks("Tasks", {'T1': {'Status': 'Local'}})
+    engine.note_local_change('T1', time.time() + local_edit_offset)
+    remote.update_tasks("Tasks", {'T1': {'Status': 'Remote'}})
+
+    report = engine.sync()
+    assert report.conflicts == [('T1', winner)]
+    expected = 'Local' if winner == 'local' else 'Remote'
+    assert field(local, 'T1', 'Status') == field(remote, 'T1', 'Status') == expected
+    assert engine.version('T1') == 2
+
+
+def test_field_merge_conflict_keeps_both_edits(local, remote):
+    engine = make_engine(local, remote, policy=FIELD_MERGE)
+    local.update_tasks("Tasks", {'T1': {'Status': 'Done'}})
+    remote.update_tasks("Tasks", {'T1': {'Comment': 'checked'}})
+
+    report = engine.sync()
+    assert report.conflicts == [('T1', 'merged')]
+    for backend in (local, remote):
+        assert field(backend, 'T1', 'Status') == 'Done'
+        assert field(backend, 'T1', 'Comment') == 'checked'
+
+
+def test_rows_a_backend_did_not_write_are_retried(local, remote):
+    remote.fail_appends = True
+    engine = SyncEngine(SimpleNamespace(storage=remote), local)
+    report = engine.sync()
+    assert report.pushed_adds == []
+    assert engine.version('T0') == 0
+
+    remote.fail_appends = False
+    report = engine.sync()
+    assert sorted(report.pushed_adds) == [f'T{i}' for i in range(5)]
+
+    local.update_tasks("Tasks", {'T1': {'Status': 'Done'}, 'T2': {'Status': 'Done'}})
+    remote.reject_updates = {'T1'}
+    report = engine.sync()
+    assert report.pushed_updates == ['T2']
+
+    remote.reject_updates = set()
+    report = engine.sync()
+    assert report.pushed_updates == ['T1']
+    assert field(remote, 'T1', 'Status') == 'Done'
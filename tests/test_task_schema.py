@@ -0,0 +1,32 @@
+import pandas as pd
+
+from task_schema import DEFAULT_TASK_COLUMNS, apply_task_schema, normalize_tasks, to_sheet_text
+from tests.fake_sheet import make_worksheet, task_row
+
+
+def sheet_frame():
+    worksheet = make_worksheet(3)
+    worksheet.rows.append(task_row(4, **{'Reminder Sent': 'Yes', 'Reminder Sent Date': '2025-08-06',
+                                         'Reminder Count': '2 times', 'Status': 'Completed'}))
+    return pd.DataFrame(worksheet.rows[1:], columns=worksheet.rows[0])
+
+
+def test_sheet_text_round_trips_typed_frame():
+    raw = sheet_frame()
+    text = to_sheet_text(normalize_tasks(raw))
+    assert list(text.columns) == DEFAULT_TASK_COLUMNS
+    assert text.astype(str).to_numpy().tolist() == raw.to_numpy().tolist()
+
+
+def test_changed_count_replaces_kept_text():
+    typed = apply_task_schema(sheet_frame())
+    typed.loc[3, 'Reminder Count'] = 3
+    text = to_sheet_text(typed)
+    assert text['Reminder Count'].tolist() == ['0', '0', '0', '3']
+
+
+def test_schema_is_idempotent():
+    typed = apply_task_schema(sheet_frame())
+    again = apply_task_schema(typed)
+    assert (typed.dtypes == again.dtypes).all()
+    assert typed['Reminder Sent'].tolist() == [False, False, False, True]
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from task_schema import _synthetic_tasks, normalize_tasks
+from timeseries_rollups import GRANULARITIES, TimeSeriesRollups
+
+
+@pytest.fixture
+def tasks():
+    df = _synthetic_tasks(2000)
+    df['Reminder Time'] = '09:00'
+    df['Read Time'] = np.random.default_rng(2).choice(['09:30', '11:17', '', '08:00'], len(df))
+    return df
+
+
+def assert_same_cubes(rollups, df):
+    fresh = TimeSeriesRollups()
+    fresh.update(df)
+    for granularity in GRANULARITIES:
+        expected = fresh.cube(granularity).sort_index()
+        actual = rollups.cube(granularity).sort_index()
+        assert actual.index.equals(expected.index)
+        assert (actual.to_numpy() == expected.to_numpy()).all()
+
+
+def test_timeline_matches_a_groupby_over_the_frame(tasks):
+    rollups = TimeSeriesRollups()
+    rollups.update(tasks, 'v1')
+    filters = (('Priority', ('High',)), ('Status', ()))
+    timeline = rollups.timeline('W', filters)
+
+    flagged = normalize_tasks(tasks)
+    selected = flagged[flagged['Priority'].astype(str).eq('High') & flagged['Date'].notna()]
+    period = selected['Date'].dt.to_period('W').dt.start_time
+    assert timeline['Tasks'].tolist() == selected.groupby(period).size().tolist()
+    assert np.allclose(timeline['Completion Rate'], selected.groupby(period)['is_completed'].mean())
+
+
+def test_incremental_updates_equal_a_fresh_build(tasks):
+    rollups = TimeSeriesRollups()
+    rollups.update(tasks, 'v0')
+    current = tasks
+    rng = np.random.default_rng(5)
+    for version in range(1, 40):
+        current = current.copy()
+        rows = current.index[rng.integers(0, len(current), 5)]
+        current.loc[rows, 'Read Time'] = rng.choice(['09:31', '10:07', '23:59', ''], 5)
+        current.loc[rows, 'Status'] = rng.choice(['Completed', 'Pending'], 5)
+        if version % 10 == 0:
+            current = current.drop(index=current.index[:3])
+            extra = _synthetic_tasks(4, seed=version).assign(**{'Task ID': [f'NEW{version}-{i}' for i in range(4)]})
+            current = pd.concat([current, extra], ignore_index=True)
+        rollups.update(current, f'v{version}')
+
+    assert_same_cubes(rollups, current)
+
+
+def test_update_only_counts_changed_rows(tasks):
+    rollups = TimeSeriesRollups()
+    assert rollups.update(tasks, 'v1') == len(tasks)
+    assert rollups.update(tasks, 'v1') == 0
+    assert rollups.update(tasks.copy(), 'v2') == 0
+
+    edited = tasks.copy()
+    edited.loc[edited.index[:3], 'Status'] = 'Archived'
+    assert rollups.update(edited, 'v3') == 3
+    assert_same_cubes(rollups, edited)
+
+
+def test_measures_stay_integers(tasks):
+    rollups = TimeSeriesRollups()
+    rollups.update(tasks, 'v1')
+    rollups.update(tasks.iloc[10:], 'v2')
+    rollups.update(tasks, 'v3')
+    for granularity in GRANULARITIES:
+        assert (rollups.cube(granularity).dtypes == 'int64').all()
+    assert_same_cubes(rollups, tasks)
@@ -0,0 +1,72 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from webhook_dispatcher import TASK_CREATED, TASK_STATUS_CHANGED, TASK_UPDATED, WebhookDispatcher, task_events
+
+
+class RecordingSession:
+    """requests.Session stand-in that answers every POST with `status`"""
+
+    def __init__(self, status=200):
+        self.status = status
+        self.bodies = []
+
+    def post(self, url, json=None, headers=None, timeout=None):
+        self.bodies.append(json)
+        return SimpleNamespace(status_code=self.status, close=lambda: None)
+
+
+@pytest.fixture
+def session():
+    return RecordingSession()
+
+
+@pytest.fixture
+def dispatcher(session, tmp_path):
+    dispatcher = WebhookDispatcher(transport=SimpleNamespace(session=session, timeout=1), flush_interval=0.01,
+                                   dead_letter_path=str(tmp_path / 'dead.jsonl'))
+    yield dispatcher
+    dispatcher.close(timeout=5)
+
+
+def test_status_change_raises_a_specific_event():
+    types = [event.type for event in task_events('update', 'ID1', {'Status': 'Done'})]
+    assert types == [TASK_UPDATED, TASK_STATUS_CHANGED]
+    assert [event.type for event in task_events('add', 'ID1')] == [TASK_CREATED]
+
+
+def test_flush_waits_for_an_event_the_worker_has_taken(dispatcher, session):
+    waiting, taken = threading.Event(), threading.Event()
+    get = dispatcher._queue.get
+
+    def slow_get(*args, **kwargs):
+        waiting.set()
+        event = get(*args, **kwargs)
+        taken.set()
+        time.sleep(0.2)  # Held by the worker, not yet counted as in flight
+        return event
+
+    dispatcher._queue.get = slow_get
+    assert waiting.wait(5)  # The worker is blocked in the patched get
+    dispatcher.publish_task('add', 'ID1', {'Task ID': 'ID1'})
+    assert taken.wait(5)
+    assert dispatcher.depth == 1
+    assert dispatcher.flush(timeout=5)
+    assert dispatcher.stats()['delivered'] == 1
+    assert [event['task_id'] for event in session.bodies[0]['events']] == ['ID1']
+
+
+def test_rejected_batch_is_dead_lettered_and_replayed(dispatcher, session):
+    session.status = 400
+    dispatcher.publish_task('delete', 'ID1')
+    assert dispatcher.flush(timeout=5)
+    assert dispatcher.stats()['dead_lettered'] == 1
+
+    session.status = 200
+    assert dispatcher.replay_dead_letters() == 1
+    assert dispatcher.flush(timeout=5)
+    assert dispatcher.stats()['delivered'] == 1
+    assert session.bodies[0]['events'][0]['event_id'] == session.bodies[1]['events'][0]['event_id']
@@ -0,0 +1,231 @@
+import logging
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from task_schema import normalize_tasks
+
+logger = logging.getLogger(__name__)
+
+GRANULARITIES = {'D': 'Daily', 'W': 'Weekly', 'M': 'Monthly'}
+DIMENSIONS = ['Status', 'Priority', 'Executor', 'Company']
+MEASURES = ['tasks', 'completed', 'read_latency_seconds', 'reads']  # Integers, so add/subtract never drifts
+
+TIMELINE_COLUMNS = ['Tasks', 'Completed', 'Completion Rate', 'Avg Read Latency (h)']
+
+
+def task_cells(df, dimensions=DIMENSIONS, keys=None):
+    """One row per dated task: its day, dimension values and measure contributions
+
+    Rows are keyed by Task ID (repeated IDs get an occurrence suffix, so no
+    row is lost); pass `keys` to reuse keys already computed for `df`. Read
+    latency is the whole seconds from the reminder being sent to it being
+    read, counted only for read reminders.
+    """
+    keys = row_keys(df) if keys is None else keys
+    flagged = normalize_tasks(df)
+    n = len(flagged)
+    day = (flagged['Date'].dt.normalize() if 'Date' in flagged.columns
+           else pd.Series(pd.NaT, index=flagged.index, dtype='datetime64[ns]'))
+
+    cells = pd.DataFrame({'day': day.to_numpy()})
+    for dim in dimensions:
+        values = flagged[dim].astype(object) if dim in flagged.columns else pd.Series([''] * n, dtype=object)
+        cells[dim] = values.where(values.notna(), '').astype(str).to_numpy()
+    latency = _read_latency_seconds(flagged)
+    cells['tasks'] = 1
+    cells['completed'] = flagged['is_completed'].to_numpy(dtype=np.int64)
+    cells['reads'] = latency.notna().to_numpy(dtype=np.int64)
+    cells['read_latency_seconds'] = latency.fillna(0).to_numpy(dtype=np.int64)
+    cells.index = keys
+    return cells[cells['day'].notna()]
+
+
+def row_keys(df):
+    """Task ID of each row, with an occurrence suffix so repeated IDs stay distinct"""
+    ids = (df['Task ID'].astype(str).to_numpy() if 'Task ID' in df.columns
+           else np.arange(len(df)).astype(str))
+    ids = pd.Series(ids, dtype=object)
+    occurrence = np.zeros(len(ids), dtype=np.int64)
+    repeated = ids.duplicated(keep=False).to_numpy()
+    if repeated.any():
+        occurrence[repeated] = ids[repeated].groupby(ids[repeated]).cumcount().to_numpy()
+    return pd.Index(ids + '#' + pd.Series(occurrence.astype(str), dtype=object))
+
+
+def _read_latency_seconds(flagged):
+    """Whole seconds from Reminder Sent Date (+ Reminder Time when the date has no time) to Read Time"""
+    if 'Reminder Sent Date' not in flagged.columns or 'Read Time' not in flagged.columns:
+        return pd.Series(np.nan, index=flagged.index)
+    sent = flagged['Reminder Sent Date']
+    if 'Reminder Time' in flagged.columns:
+        clock = _parse_datetimes(flagged['Reminder Time'])
+        date_only = sent.notna() & sent.eq(sent.dt.normalize())
+        sent = sent.where(~date_only, sent + (clock - clock.dt.normalize()).fillna(pd.Timedelta(0)))
+
+    read_text = flagged['Read Time'].astype(object).where(flagged['Read Time'].notna(), '').astype(str).str.strip()
+    read = _parse_datetimes(read_text)
+    time_only = read_text.str.fullmatch(r'\d{1,2}:\d{2}(:\d{2})?')
+    read_on_sent_day = sent.dt.normalize() + (read - read.dt.normalize())
+    read = read.where(~time_only, read_on_sent_day)
+    read = read.where(~(time_only & (read < sent)), read + pd.Timedelta(days=1))  # Read after midnight
+
+    seconds = (read - sent).dt.total_seconds().round()
+    valid = flagged['reminder_read'].to_numpy(dtype=bool) & seconds.notna().to_numpy() & (seconds >= 0).to_numpy()
+    return seconds.where(valid)
+
+
+def _parse_datetimes(series):
+    text = series.astype(object).where(series.notna(), '').astype(str)
+    return pd.to_datetime(text, errors='coerce', format='mixed')
+
+
+class TimeSeriesRollups:
+    """Daily, weekly and monthly task counts per Status/Priority/Executor/Company
+
+    Each granularity is a cube: one row per (period, dimension values) with
+    summed measures (tasks, completed, read latency and reads), all kept as
+    integers so repeated add/subtract never drifts. `update()` hashes the
+    raw rows of a new snapshot and compares them with the hashes it last
+    saw, as IncrementalTaskLoader does. Only rows whose hash moved are
+    normalized and turned into cells, and the cubes only change by the
+    cells of tasks that were added, removed or edited. Hashing is one
+    vectorized pass over the frame; everything after it scales with the
+    changed rows. Timeline queries sum the matching cells per period and
+    never touch the task frame; results are memoized per (version,
+    granularity, filters).
+    """
+
+    def __init__(self, dimensions=DIMENSIONS, max_memo=64):
+        self.dimensions = list(dimensions)
+        self.max_memo = max_memo
+        self.version = None
+        self._tasks = None  # Cells of the last snapshot
+        self._row_hashes = None  # Row key -> hash of the raw row
+        self._columns = None
+        self._cubes = {granularity: self._empty_cube() for granularity in GRANULARITIES}
+        self._memo = OrderedDict()
+        self._lock = threading.RLock()
+
+    def update(self, df, data_version=None):
+        """Bring the cubes up to date with a task snapshot; returns the number of tasks that changed"""
+        with self._lock:
+            if data_version is not None and data_version == self.version:
+                return 0
+            keys = row_keys(df)
+            hashes = pd.Series(pd.util.hash_pandas_object(df, index=False).to_numpy(), index=keys)
+            if self._tasks is None or self._columns != list(df.columns):
+                # Hashes over other columns cannot be compared; start over
+                self._cubes = {granularity: self._empty_cube() for granularity in GRANULARITIES}
+                self._tasks = task_cells(df, self.dimensions, keys)
+                delta, changed = self._tasks, len(df)
+            else:
+                delta, changed = self._delta(df, hashes)
+            if len(delta):
+                for granularity in GRANULARITIES:
+                    self._cubes[granularity] = self._merge(self._cubes[granularity], self._aggregate(delta, granularity))
+            self._row_hashes = hashes
+            self._columns = list(df.columns)
+            self.version = data_version
+            self._memo.clear()
+        if changed:
+            logger.info(f"Time-series rollups updated with {changed} changed task(s)")
+        return changed
+
+    def cube(self, granularity='D'):
+        """The pre-aggregated cells of one granularity"""
+        with self._lock:
+            return self._cubes[granularity]
+
+    def timeline(self, granularity='D', filters=()):
+        """Per-period Tasks, Completed, Completion Rate and Avg Read Latency (h)
+
+        `filters` is a tuple of (dimension, values) pairs, like the sidebar
+        filter selections; empty value tuples match everything.
+        """
+        key = (self.version, granularity, filters)
+        with self._lock:
+            if key in self._memo:
+                self._memo.move_to_end(key)
+                return self._memo[key]
+            cube = self._cubes[granularity]
+
+        mask = np.ones(len(cube), dtype=bool)
+        for dim, values in filters:
+            if values and dim in self.dimensions:
+                mask &= cube.index.get_level_values(dim).isin([str(value) for value in values])
+        totals = cube[mask].groupby(level='period').sum()
+        result = _timeline_frame(totals)
+
+        with self._lock:
+            self._memo[key] = result
+            while len(self._memo) > self.max_memo:
+                self._memo.popitem(last=False)
+        return result
+
+    def completion_rate(self, granularity='D', filters=()):
+        """Share of tasks completed per period"""
+        return self.timeline(granularity, filters)['Completion Rate']
+
+    def read_latency(self, granularity='D', filters=()):
+        """Average hours from reminder sent to read per period (NaN where nothing was read)"""
+        return self.timeline(granularity, filters)['Avg Read Latency (h)']
+
+    def _delta(self, df, hashes):
+        """Cells to add (new contributions) and subtract (old contributions, negated); updates _tasks"""
+        old = self._row_hashes
+        if hashes.index.equals(old.index):
+            # Same rows in the same order, the usual case between refreshes
+            added = removed = hashes.index[:0]
+            updated = hashes.index[hashes.to_numpy() != old.to_numpy()]
+        else:
+            added = hashes.index.difference(old.index)
+            removed = old.index.difference(hashes.index)
+            common = hashes.index.intersection(old.index)
+            updated = common[hashes.loc[common].to_numpy() != old.loc[common].to_numpy()]
+        fresh, stale = added.append(updated), removed.append(updated)
+        if not len(fresh) and not len(stale):
+            return self._tasks.iloc[:0], 0
+
+        rows = hashes.index.isin(fresh)
+        cells = task_cells(df[rows], self.dimensions, hashes.index[rows])
+        retracted = self._tasks.loc[self._tasks.index.intersection(stale)].copy()  # Undated rows have no cells
+        retracted[MEASURES] = -retracted[MEASURES]
+        self._tasks = pd.concat([self._tasks.drop(index=retracted.index), cells])
+        return pd.concat([cells, retracted]), len(fresh) + len(removed)
+
+    def _aggregate(self, cells, granularity):
+        period = cells['day'].dt.to_period(granularity).dt.start_time.rename('period')
+        return cells.groupby([period] + [cells[dim] for dim in self.dimensions], sort=False)[MEASURES].sum()
+
+    def _merge(self, cube, delta):
+        """Add delta cells into a cube, touching only the cells it names"""
+        delta = delta.astype('int64')
+        if not len(cube):
+            return delta[delta['tasks'] != 0].sort_index()
+        positions = cube.index.get_indexer(delta.index)
+        known = positions >= 0
+        values = cube.to_numpy(copy=True)
+        np.add.at(values, positions[known], delta.to_numpy()[known])
+        merged = pd.DataFrame(values, index=cube.index, columns=cube.columns)
+        if not known.all():
+            merged = pd.concat([merged, delta[~known]]).sort_index()
+        emptied = merged['tasks'].to_numpy() == 0
+        return merged[~emptied] if emptied.any() else merged
+
+    def _empty_cube(self):
+        index = pd.MultiIndex.from_arrays([pd.DatetimeIndex([])] + [[] for _ in self.dimensions],
+                                          names=['period'] + self.dimensions)
+        return pd.DataFrame({measure: pd.Series(dtype='int64') for measure in MEASURES}, index=index)
+
+
+def _timeline_frame(totals):
+    """Turn summed measures per period into the timeline columns"""
+    timeline = pd.DataFrame(index=totals.index.rename('Period'))
+    timeline['Tasks'] = totals['tasks'].astype(int)
+    timeline['Completed'] = totals['completed'].astype(int)
+    timeline['Completion Rate'] = totals['completed'] / totals['tasks']
+    timeline['Avg Read Latency (h)'] = totals['read_latency_seconds'] / 3600 / totals['reads'].where(totals['reads'] > 0)
+    return timeline
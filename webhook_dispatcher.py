@@ -0,0 +1,259 @@
+import hashlib
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+
+import requests
+
+from http_transport import RETRYABLE_STATUS, shared_transport
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WEBHOOK_URL = "http://localhost:5678/webhook/task-events"  # Local n8n webhook
+DEFAULT_DEAD_LETTER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "webhook_dead_letters.jsonl")
+
+TASK_CREATED = "task.created"
+TASK_UPDATED = "task.updated"
+TASK_STATUS_CHANGED = "task.status_changed"
+TASK_ASSIGNED = "task.assigned"
+TASK_DELETED = "task.deleted"
+
+# Columns whose change also raises a more specific event
+_ASSIGNMENT_COLUMNS = ('Executor', 'Executor ID')
+
+
+@dataclass
+class WebhookEvent:
+    """One outbound notification; `event_id` doubles as its idempotency key"""
+    type: str
+    task_id: str
+    data: dict = field(default_factory=dict)
+    event_id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    created_at: str = field(default_factory=lambda: datetime.now().isoformat(timespec='seconds'))
+
+
+def task_events(kind, task_id, data=None):
+    """Events for one task mutation (kind is 'add', 'update' or 'delete')"""
+    data = dict(data or {})
+    if kind == 'add':
+        return [WebhookEvent(TASK_CREATED, str(task_id), data)]
+    if kind == 'delete':
+        return [WebhookEvent(TASK_DELETED, str(task_id))]
+    events = [WebhookEvent(TASK_UPDATED, str(task_id), data)]
+    if 'Status' in data:
+        events.append(WebhookEvent(TASK_STATUS_CHANGED, str(task_id), {'Status': data['Status']}))
+    assignment = {col: data[col] for col in _ASSIGNMENT_COLUMNS if col in data}
+    if assignment:
+        events.append(WebhookEvent(TASK_ASSIGNED, str(task_id), assignment))
+    return events
+
+
+class WebhookDispatcher:
+    """Background sender of task events to an n8n webhook
+
+    `publish()` only puts events on a bounded in-memory queue and never
+    blocks, so saving a task never waits on the endpoint. A daemon thread
+    collects events for `flush_interval` seconds (or until `max_batch` are
+    waiting) and POSTs them as one JSON batch over the shared pooled HTTP
+    session. Every event carries an `event_id`, and each batch is sent with
+    an Idempotency-Key header that stays the same across retries, so the
+    receiver can drop duplicates of this at-least-once delivery.
+
+    Connection errors, timeouts and 429/5xx responses are retried with
+    jittered exponential backoff. Batches that still fail, batches rejected
+    with another 4xx, and events that arrive while the queue is full are
+    appended to the dead-letter file (JSON lines) and can be re-sent with
+    `replay_dead_letters()`.
+    """
+
+    def __init__(self, url=DEFAULT_WEBHOOK_URL, transport=None, max_queue=10000, flush_interval=1.0,
+                 max_batch=200, max_retries=5, backoff_base=0.5, backoff_max=30.0,
+                 dead_letter_path=DEFAULT_DEAD_LETTER_PATH):
+        self.url = url
+        self.transport = transport or shared_transport()
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.dead_letter_path = dead_letter_path
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._in_flight = 0
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+        self._file_lock = threading.Lock()
+
+        self.delivered = 0
+        self.batches = 0
+        self.retries = 0
+        self.dead_lettered = 0
+        self.last_latency = 0.0
+
+        self._thread = threading.Thread(target=self._run, name="webhook-dispatcher", daemon=True)
+        self._thread.start()
+
+    def publish(self, events):
+        """Queue events for delivery without blocking; overflow goes to the dead-letter file"""
+        overflow = []
+        for event in events:
+            if self._stopped.is_set():
+                overflow.append(event)
+                continue
+            try:
+                self._queue.put_nowait(event)
+            except queue.Full:
+                overflow.append(event)
+        if overflow:
+            logger.warning(f"Webhook queue full or closed, dead-lettering {len(overflow)} event(s)")
+            self._dead_letter(overflow, "queue full")
+
+    def publish_task(self, kind, task_id, data=None):
+        """Queue the events for one task mutation"""
+        self.publish(task_events(kind, task_id, data))
+
+    @property
+    def depth(self):
+        """Events waiting to be sent, including the batch in flight
+
+        Counted by the queue itself (put() until task_done()), so an event
+        the worker has just taken off the queue is never missed.
+        """
+        return self._queue.unfinished_tasks
+
+    def stats(self):
+        """Queue depth and delivery counters for monitoring"""
+        with self._lock:
+            return {
+                'queue_depth': self._queue.qsize(),
+                'in_flight': self._in_flight,
+                'delivered': self.delivered,
+                'batches': self.batches,
+                'retries': self.retries,
+                'dead_lettered': self.dead_lettered,
+                'last_latency': self.last_latency,
+            }
+
+    def flush(self, timeout=30):
+        """Wait until every queued event has been sent or dead-lettered; returns True if it drained"""
+        deadline = time.monotonic() + timeout
+        while self.depth:
+            if time.monotonic() >= deadline or not self._thread.is_alive():
+                return False
+            time.sleep(0.05)
+        return True
+
+    def close(self, timeout=30):
+        """Send what is queued and stop the background thread"""
+        drained = self.flush(timeout)
+        self._stopped.set()
+        self._thread.join(timeout)
+        return drained
+
+    def replay_dead_letters(self):
+        """Re-queue every dead-lettered event (same event_id) and clear the file; returns the count"""
+        with self._file_lock:
+            if not os.path.exists(self.dead_letter_path):
+                return 0
+            replay_path = f"{self.dead_letter_path}.replay"
+            os.replace(self.dead_letter_path, replay_path)
+        events = []
+        with open(replay_path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    record.pop('reason', None)
+                    events.append(WebhookEvent(**record))
+        os.remove(replay_path)
+        self.publish(events)
+        return len(events)
+
+    def _run(self):
+        while not self._stopped.is_set():
+            batch = self._collect()
+            if not batch:
+                continue
+            started = time.monotonic()
+            try:
+                self._send(batch)
+            except Exception as e:
+                logger.error(f"Webhook dispatch failed: {str(e)}")
+                self._dead_letter(batch, str(e))
+            finally:
+                with self._lock:
+                    self._in_flight = 0
+                    self.last_latency = time.monotonic() - started
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _collect(self):
+        """Block for the first event, then gather more until the flush window closes or the batch is full"""
+        try:
+            first = self._queue.get(timeout=0.5)
+        except queue.Empty:
+            return []
+        batch = [first]
+        with self._lock:
+            self._in_flight = 1
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                event = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(event)
+            with self._lock:
+                self._in_flight = len(batch)
+        return batch
+
+    def _send(self, batch):
+        """POST one batch with retries; dead-letters it if it cannot be delivered"""
+        body = {'events': [asdict(event) for event in batch]}
+        key = hashlib.sha1(''.join(event.event_id for event in batch).encode('utf-8')).hexdigest()
+        headers = {'Idempotency-Key': key}
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self.transport.session.post(self.url, json=body, headers=headers,
+                                                       timeout=self.transport.timeout)
+                response.close()
+                if response.status_code < 400:
+                    with self._lock:
+                        self.delivered += len(batch)
+                        self.batches += 1
+                    return
+                if response.status_code not in RETRYABLE_STATUS:
+                    self._dead_letter(batch, f"HTTP {response.status_code}")
+                    return
+                error = f"HTTP {response.status_code}"
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                error = str(e)
+            if attempt == self.max_retries:
+                break
+            delay = min(self.backoff_max, self.backoff_base * (2 ** attempt)) * random.uniform(0.5, 1.0)
+            with self._lock:
+                self.retries += 1
+            logger.warning(f"Webhook POST failed ({error}), retry {attempt + 1}/{self.max_retries} in {delay:.2f}s")
+            if self._stopped.wait(delay):
+                break
+        self._dead_letter(batch, error)
+
+    def _dead_letter(self, events, reason):
+        try:
+            with self._file_lock, open(self.dead_letter_path, "a", encoding="utf-8") as f:
+                for event in events:
+                    f.write(json.dumps({**asdict(event), 'reason': reason}) + "\n")
+            with self._lock:
+                self.dead_lettered += len(events)
+            logger.error(f"Dead-lettered {len(events)} webhook event(s): {reason}")
+        except Exception as e:
+            logger.error(f"Failed to write webhook dead letters, {len(events)} event(s) lost: {str(e)}")